@@ -1,13 +1,20 @@
-pip install requests
-import requests
+# pip install requests
+import os
+import sys
 
-# Базовый URL API
-BASE_URL = "https://jsonplaceholder.typicode.com"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.api_client import ApiClient, BASE_URL
 
 def main():
+    # Одна сессия на все три запроса: соединение с сервером переиспользуется
+    with ApiClient(BASE_URL) as client:
+        run_tasks(client)
+
+def run_tasks(client):
     print("=== Задание 1: GET-запрос с чётными ID ===\n")
     
-    response = requests.get(f"{BASE_URL}/posts")
+    response = client.get("/posts")
     
     if response.status_code == 200:
         posts = response.json()
@@ -32,7 +39,7 @@ def main():
         "userId": 1
     }
     
-    post_response = requests.post(f"{BASE_URL}/posts", json=new_post)
+    post_response = client.post("/posts", json=new_post)
     
     if post_response.status_code == 201:
         created_post = post_response.json()
@@ -53,7 +60,7 @@ def main():
         "userId": 1
     }
     
-    put_response = requests.put(f"{BASE_URL}/posts/{created_post_id}", json=updated_post)
+    put_response = client.put(f"/posts/{created_post_id}", json=updated_post)
     
     if put_response.status_code == 200:
         updated_data = put_response.json()
@@ -0,0 +1,100 @@
+import struct
+
+# Кадр: 4 байта длины (big-endian) + полезная нагрузка
+HEADER = struct.Struct('!I')
+HEADER_SIZE = HEADER.size
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_frame(payload):
+    return HEADER.pack(len(payload)) + payload
+
+
+def encode_frames(payloads):
+    # Несколько кадров одним буфером - один sendall на пачку
+    buffer = bytearray()
+    for payload in payloads:
+        buffer += HEADER.pack(len(payload))
+        buffer += payload
+    return buffer
+
+
+def send_frame(sock, payload):
+    sock.sendall(encode_frame(payload))
+
+
+class FrameReader:
+    # Буферизованное чтение кадров из блокирующего сокета.
+    # recv_into пишет прямо в заранее выделенный bytearray через memoryview,
+    # буфер растёт только если кадр в него не помещается.
+
+    def __init__(self, sock, buffer_size=65536):
+        self.sock = sock
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+    def _reserve(self, need):
+        # Гарантирует, что от self.start в буфере помещается need байт
+        if self.start + need <= len(self.buffer):
+            return
+        pending = self.end - self.start
+        if need <= len(self.buffer):
+            self.view[:pending] = self.view[self.start:self.end]
+        else:
+            size = len(self.buffer)
+            while size < need:
+                size *= 2
+            new_buffer = bytearray(size)
+            new_buffer[:pending] = self.view[self.start:self.end]
+            self.view.release()
+            self.buffer = new_buffer
+            self.view = memoryview(new_buffer)
+        self.start = 0
+        self.end = pending
+
+    def _fill(self, need):
+        self._reserve(need)
+        while self.end - self.start < need:
+            n = self.sock.recv_into(self.view[self.end:])
+            if n == 0:
+                if self.end == self.start:
+                    return False
+                raise ConnectionError("Соединение закрыто посреди кадра")
+            self.end += n
+        return True
+
+    def read_frame(self):
+        if not self._fill(HEADER_SIZE):
+            return None
+        (length,) = HEADER.unpack_from(self.buffer, self.start)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f"Слишком большой кадр: {length} байт")
+        if not self._fill(HEADER_SIZE + length):
+            return None
+        begin = self.start + HEADER_SIZE
+        payload = bytes(self.view[begin:begin + length])
+        self.start = begin + length
+        if self.start == self.end:
+            self.start = self.end = 0
+        return payload
+
+
+async def read_frame_async(reader):
+    # Вариант для asyncio.StreamReader (он сам буферизует поток).
+    # Обрыв посреди кадра - ConnectionError, как у FrameReader
+    # (asyncio.IncompleteReadError наружу не выходит)
+    try:
+        header = await reader.readexactly(HEADER_SIZE)
+    except EOFError as e:
+        if e.partial:
+            raise ConnectionError("Соединение закрыто посреди кадра") from e
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Слишком большой кадр: {length} байт")
+    try:
+        return await reader.readexactly(length)
+    except EOFError as e:
+        raise ConnectionError("Соединение закрыто посреди кадра") from e
@@ -0,0 +1,181 @@
+import os
+import time
+import random
+import struct
+import socket
+from collections import OrderedDict
+
+# Пакет: тип, идентификатор потока, номер пакета + данные
+DATA = 1
+ACK = 2
+FIN = 3
+HEADER = struct.Struct('!BII')
+MAX_PAYLOAD = 1200
+
+
+class LossySocket:
+    # Обёртка над сокетом для проверки на localhost:
+    # теряет и переставляет исходящие пакеты с заданной вероятностью
+
+    def __init__(self, sock, loss=0.0, reorder=0.0, seed=None):
+        self.sock = sock
+        self.loss = loss
+        self.reorder = reorder
+        self.random = random.Random(seed)
+        self.held = None
+        self.dropped = 0
+        self.reordered = 0
+
+    def sendto(self, data, addr):
+        if self.random.random() < self.loss:
+            self.dropped += 1
+            return len(data)
+        if self.held is None and self.random.random() < self.reorder:
+            # Придерживаем пакет и отправляем его после следующего
+            self.held = (bytes(data), addr)
+            self.reordered += 1
+            return len(data)
+        sent = self.sock.sendto(data, addr)
+        if self.held is not None:
+            self.sock.sendto(*self.held)
+            self.held = None
+        return sent
+
+    def __getattr__(self, name):
+        return getattr(self.sock, name)
+
+
+class ReliableSender:
+    # Скользящее окно с выборочным повтором: каждый пакет подтверждается
+    # отдельно, по таймауту переотправляются только неподтверждённые
+
+    def __init__(self, sock, addr, window=32, timeout=0.2, max_retries=50):
+        self.sock = sock
+        self.addr = addr
+        self.window = window
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.packets_sent = 0
+        self.retransmissions = 0
+
+    def send(self, data):
+        stream = int.from_bytes(os.urandom(4), 'big')
+        view = memoryview(data)
+        packets = [
+            HEADER.pack(DATA, stream, seq) + view[offset:offset + MAX_PAYLOAD]
+            for seq, offset in enumerate(range(0, len(data), MAX_PAYLOAD))
+        ]
+        packets.append(HEADER.pack(FIN, stream, len(packets)))
+        total = len(packets)
+
+        acked = bytearray(total)
+        retries = bytearray(total)
+        # Порядок вставки = порядок отправки, поэтому самый старый таймер всегда первый
+        in_flight = OrderedDict()
+        base = 0
+        next_seq = 0
+        buffer = bytearray(64)
+
+        while base < total:
+            while next_seq < total and next_seq < base + self.window:
+                self._transmit(packets[next_seq])
+                in_flight[next_seq] = time.perf_counter()
+                next_seq += 1
+
+            oldest = next(iter(in_flight.values()))
+            wait = max(oldest + self.timeout - time.perf_counter(), 0.0005)
+            self.sock.settimeout(wait)
+            try:
+                while True:
+                    n, addr = self.sock.recvfrom_into(buffer)
+                    if n >= HEADER.size:
+                        kind, ack_stream, seq = HEADER.unpack_from(buffer)
+                        if kind == ACK and ack_stream == stream and seq < total and not acked[seq]:
+                            acked[seq] = 1
+                            in_flight.pop(seq, None)
+                    self.sock.settimeout(0)
+            except (socket.timeout, BlockingIOError):
+                pass
+
+            while base < total and acked[base]:
+                base += 1
+
+            now = time.perf_counter()
+            while in_flight:
+                seq, sent_at = next(iter(in_flight.items()))
+                if now - sent_at < self.timeout:
+                    break
+                if retries[seq] >= self.max_retries:
+                    raise TimeoutError(f"Пакет {seq} не подтверждён после {self.max_retries} попыток")
+                retries[seq] += 1
+                self.retransmissions += 1
+                self._transmit(packets[seq])
+                in_flight[seq] = now
+                in_flight.move_to_end(seq)
+
+        self.sock.settimeout(None)
+        return total
+
+    def _transmit(self, packet):
+        self.sock.sendto(packet, self.addr)
+        self.packets_sent += 1
+
+
+class ReliableReceiver:
+    # Собирает потоки от разных отправителей, переупорядочивает пакеты
+    # в пределах окна и отдаёт сообщение целиком после FIN
+
+    def __init__(self, sock, window=1024, keep_finished=1024):
+        self.sock = sock
+        self.window = window
+        self.keep_finished = keep_finished
+        self.sessions = OrderedDict()
+        self.duplicates = 0
+
+    def handle(self, data, addr):
+        if len(data) < HEADER.size:
+            return None
+        kind, stream, seq = HEADER.unpack_from(data)
+        if kind not in (DATA, FIN):
+            return None
+
+        key = (addr, stream)
+        session = self.sessions.get(key)
+        if session is None:
+            session = {'expected': 0, 'pending': {}, 'chunks': [], 'done': False}
+            self.sessions[key] = session
+            while len(self.sessions) > self.keep_finished:
+                self.sessions.popitem(last=False)
+
+        if seq >= session['expected'] + self.window:
+            return None  # вне окна: без подтверждения, отправитель повторит
+        self.sock.sendto(HEADER.pack(ACK, stream, seq), addr)
+
+        if seq < session['expected'] or seq in session['pending']:
+            self.duplicates += 1
+            return None
+        session['pending'][seq] = (kind, bytes(data[HEADER.size:]))
+
+        while session['expected'] in session['pending']:
+            kind, payload = session['pending'].pop(session['expected'])
+            session['expected'] += 1
+            if kind == FIN:
+                session['done'] = True
+                message = b''.join(session['chunks'])
+                session['chunks'] = []
+                return addr, message
+            session['chunks'].append(payload)
+        return None
+
+    def serve(self, on_message, stop=None):
+        buffer = bytearray(65535)
+        view = memoryview(buffer)
+        self.sock.settimeout(0.2)
+        while stop is None or not stop.is_set():
+            try:
+                n, addr = self.sock.recvfrom_into(buffer)
+            except socket.timeout:
+                continue
+            result = self.handle(view[:n], addr)
+            if result is not None:
+                on_message(*result)
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+
+from tcp_client import HOST, PORT, FramedClient
+
+
+def start_server(mode, port):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tcp_server.py')
+    process = subprocess.Popen(
+        [sys.executable, script, '--mode', mode, '--port', str(port)],
+        stdout=subprocess.DEVNULL
+    )
+    # Ждём, пока сервер начнёт принимать подключения
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"Сервер {mode} не запустился на порту {port}")
+
+
+def recv_exactly(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Сервер закрыл соединение")
+        received += n
+    return buffer
+
+
+def bench_connect_per_message(port, messages, payload):
+    # Текущая схема: connect, send, recv, close на каждое сообщение
+    start = time.perf_counter()
+    for _ in range(messages):
+        sock = socket.create_connection((HOST, port))
+        sock.sendall(payload)
+        recv_exactly(sock, len(payload))
+        sock.close()
+    return time.perf_counter() - start
+
+
+def bench_framed(port, messages, payload, depth):
+    with FramedClient(HOST, port) as client:
+        start = time.perf_counter()
+        if depth <= 1:
+            for _ in range(messages):
+                client.request(payload)
+        else:
+            responses = client.pipeline([payload] * messages, depth=depth)
+            assert len(responses) == messages
+        return time.perf_counter() - start
+
+
+def report(name, messages, size, elapsed):
+    mb = messages * size / (1024 * 1024)
+    print(f"{name:<28} {messages / elapsed:>12.0f} сообщ/с {mb / elapsed:>10.2f} МБ/с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение connect-per-message и кадров на одном соединении")
+    parser.add_argument('-n', '--messages', type=int, default=5000)
+    parser.add_argument('-s', '--size', type=int, default=256)
+    parser.add_argument('-d', '--depth', type=int, default=32, help="глубина конвейера")
+    parser.add_argument('--port', type=int, default=PORT + 100)
+    args = parser.parse_args()
+
+    payload = b'x' * args.size
+    echo_server = start_server('async', args.port)
+    framed_server = start_server('framed', args.port + 1)
+    try:
+        print(f"[TCP Bench] {args.messages} сообщений по {args.size} байт")
+        report("connect-per-message", args.messages, args.size,
+               bench_connect_per_message(args.port, args.messages, payload))
+        report("кадры, запрос-ответ", args.messages, args.size,
+               bench_framed(args.port + 1, args.messages, payload, 1))
+        report(f"кадры, конвейер x{args.depth}", args.messages, args.size,
+               bench_framed(args.port + 1, args.messages, payload, args.depth))
+    finally:
+        echo_server.terminate()
+        framed_server.terminate()
+        echo_server.wait()
+        framed_server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 import socket
+import argparse
+import threading
 
-def tcp_client():
+from framing import FrameReader, send_frame, encode_frames
+
+HOST = '127.0.0.1'
+PORT = 65432
+
+
+def tcp_client(host=HOST, port=PORT):
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    
-    HOST = '127.0.0.1'
-    PORT = 65432
-    client_socket.connect((HOST, PORT))
-    print(f"[TCP Client] Подключено к серверу {HOST}:{PORT}")
+
+    client_socket.connect((host, port))
+    print(f"[TCP Client] Подключено к серверу {host}:{port}")
 
     message = input("Введите сообщение: ")
     client_socket.sendall(message.encode('utf-8'))
@@ -17,5 +23,107 @@ def tcp_client():
     client_socket.close()
     print("[TCP Client] Соединение закрыто.")
 
+
+class FramedClient:
+    # Одно постоянное соединение для многих запросов (сервер в режиме --mode framed)
+
+    def __init__(self, host=HOST, port=PORT):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = FrameReader(self.sock)
+
+    def request(self, payload):
+        send_frame(self.sock, payload)
+        response = self.reader.read_frame()
+        if response is None:
+            raise ConnectionError("Сервер закрыл соединение")
+        return response
+
+    def pipeline(self, payloads, depth=32):
+        # Запросы отправляет отдельный поток, ответы читаются одновременно с отправкой:
+        # иначе при depth * размер сообщения больше буферов сокетов клиент висит в
+        # sendall, а сервер - в записи ответов, которые никто не читает.
+        # В полёте не больше depth кадров; отправитель ждёт, пока освободится хотя бы
+        # половина окна, и отправляет всё, что окно позволяет, одним sendall.
+        # Сервер отвечает по порядку, так что i-й ответ соответствует i-му запросу.
+        payloads = list(payloads)
+        window = threading.Semaphore(depth)
+        stop = threading.Event()
+        send_errors = []
+
+        def send():
+            i = 0
+            try:
+                while i < len(payloads):
+                    batch = []
+                    for _ in range(min(len(payloads) - i, max(1, depth // 2))):
+                        window.acquire()
+                        batch.append(payloads[i])
+                        i += 1
+                    while i < len(payloads) and window.acquire(blocking=False):
+                        batch.append(payloads[i])
+                        i += 1
+                    if stop.is_set():
+                        return
+                    self.sock.sendall(encode_frames(batch))
+            except OSError as e:
+                send_errors.append(e)
+
+        sender = threading.Thread(target=send, name='framed-send', daemon=True)
+        sender.start()
+        responses = []
+        try:
+            for _ in payloads:
+                response = self.reader.read_frame()
+                if response is None:
+                    raise ConnectionError("Сервер закрыл соединение")
+                responses.append(response)
+                window.release()
+        finally:
+            if sender.is_alive():
+                stop.set()
+                for _ in range(depth):
+                    window.release()  # будим отправителя, если он ждёт окна
+            sender.join()
+        if send_errors:
+            raise ConnectionError(f"Ошибка отправки: {send_errors[0]}")
+        return responses
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def framed_tcp_client(host=HOST, port=PORT):
+    with FramedClient(host, port) as client:
+        print(f"[TCP Client] Подключено к серверу {host}:{port} (кадры). Пустая строка - выход.")
+        while True:
+            message = input("Введите сообщение: ")
+            if not message:
+                break
+            data = client.request(message.encode('utf-8'))
+            print(f"[TCP Client] Ответ от сервера: {data.decode('utf-8')}")
+    print("[TCP Client] Соединение закрыто.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TCP клиент")
+    parser.add_argument('--framed', action='store_true',
+                        help="постоянное соединение с кадрами (сервер --mode framed)")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    if args.framed:
+        framed_tcp_client(args.host, args.port)
+    else:
+        tcp_client(args.host, args.port)
+
+
 if __name__ == "__main__":
-    tcp_client()
+    main()
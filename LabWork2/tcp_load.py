@@ -0,0 +1,87 @@
+import asyncio
+import argparse
+import time
+
+from tcp_client import HOST, PORT
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def load_connection(host, port, requests_count, payload, latencies, errors):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        errors.append(1)
+        return
+
+    try:
+        for _ in range(requests_count):
+            start = time.perf_counter()
+            writer.write(payload)
+            await writer.drain()
+            # Эхо-сервер возвращает ровно столько байт, сколько отправлено
+            await reader.readexactly(len(payload))
+            latencies.append(time.perf_counter() - start)
+    except (OSError, asyncio.IncompleteReadError):
+        errors.append(1)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def tcp_load(host=HOST, port=PORT, connections=100, requests_count=100, size=64):
+    payload = b'x' * size
+    latencies = []
+    errors = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        load_connection(host, port, requests_count, payload, latencies, errors)
+        for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'connections': connections,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'elapsed': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный клиент для TCP эхо-сервера")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-c', '--connections', type=int, default=100,
+                        help="число одновременных соединений")
+    parser.add_argument('-n', '--requests', type=int, default=100,
+                        help="число запросов на одно соединение")
+    parser.add_argument('-s', '--size', type=int, default=64,
+                        help="размер сообщения в байтах")
+    args = parser.parse_args()
+
+    print(f"[TCP Load] {args.connections} соединений x {args.requests} запросов "
+          f"по {args.size} байт на {args.host}:{args.port}")
+    result = asyncio.run(tcp_load(args.host, args.port, args.connections,
+                                  args.requests, args.size))
+
+    print(f"[TCP Load] Выполнено запросов: {result['requests']}, ошибок: {result['errors']}")
+    print(f"[TCP Load] Время: {result['elapsed']:.2f} с, {result['rps']:.0f} запросов/с")
+    print(f"[TCP Load] Задержка p50: {result['p50_ms']:.3f} мс, p99: {result['p99_ms']:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
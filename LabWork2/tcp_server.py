@@ -1,14 +1,27 @@
+import os
+import sys
+import time
 import socket
+import asyncio
+import signal
+import argparse
 
-def tcp_server():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common import metrics
+from framing import encode_frame, read_frame_async
+
+HOST = '127.0.0.1'
+PORT = 65432
+
+
+def tcp_server(host=HOST, port=PORT):
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    
-    HOST = '127.0.0.1'  
-    PORT = 65432        
-    server_socket.bind((HOST, PORT))
-    
+
+    server_socket.bind((host, port))
+
     server_socket.listen(1)
-    print(f"[TCP Server] Ожидание подключения на {HOST}:{PORT}...")
+    print(f"[TCP Server] Ожидание подключения на {host}:{port}...")
 
     while True:
         conn, addr = server_socket.accept()
@@ -18,9 +31,132 @@ def tcp_server():
         if data:
             print(f"[TCP Server] Получено: {data.decode('utf-8')}")
             conn.sendall(data)
-        
+
         conn.close()
         print(f"[TCP Server] Соединение с {addr} закрыто.\n")
 
+
+def track_connection(connections, task):
+    connections.add(task)
+    metrics.inc('tcp_connections_total')
+    metrics.set_value('tcp_connections_active', len(connections))
+
+
+def untrack_connection(connections, task):
+    connections.discard(task)
+    metrics.set_value('tcp_connections_active', len(connections))
+
+
+async def handle_echo(reader, writer, connections):
+    task = asyncio.current_task()
+    track_connection(connections, task)
+    try:
+        # Эхо всего потока до EOF: соединение остаётся открытым сколько угодно долго
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            metrics.inc('tcp_bytes_total', len(data), {'direction': 'in'})
+            writer.write(data)
+            await writer.drain()
+            metrics.inc('tcp_bytes_total', len(data), {'direction': 'out'})
+    except (ConnectionResetError, BrokenPipeError):
+        metrics.inc('tcp_connection_errors_total')
+    except asyncio.CancelledError:
+        pass  # остановка сервера: задача завершается штатно, без трассировки в логе
+    finally:
+        untrack_connection(connections, task)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+
+
+async def handle_framed(reader, writer, connections):
+    task = asyncio.current_task()
+    track_connection(connections, task)
+    try:
+        # Кадры обрабатываются строго по порядку, поэтому ответы на
+        # конвейерные запросы приходят клиенту в том же порядке
+        while True:
+            payload = await read_frame_async(reader)
+            if payload is None:
+                break
+            start = time.perf_counter()
+            writer.write(encode_frame(payload))
+            await writer.drain()
+            # Время от получения кадра до отправки ответа (включая ожидание drain)
+            metrics.observe('tcp_frame_seconds', time.perf_counter() - start)
+            metrics.observe('tcp_frame_bytes', len(payload), buckets=metrics.SIZE_BUCKETS)
+    except (ConnectionError, ValueError):
+        metrics.inc('tcp_connection_errors_total')
+    except asyncio.CancelledError:
+        pass  # остановка сервера
+    finally:
+        untrack_connection(connections, task)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+
+
+async def async_tcp_server(host=HOST, port=PORT, backlog=4096, handler=handle_echo):
+    connections = set()
+    stop = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: остаётся KeyboardInterrupt
+
+    server = await asyncio.start_server(
+        lambda r, w: handler(r, w, connections),
+        host, port, backlog=backlog, reuse_address=True
+    )
+    print(f"[TCP Server] (async) Ожидание подключений на {host}:{port}...")
+
+    async with server:
+        await stop.wait()
+        print("[TCP Server] Остановка: новые подключения не принимаются.")
+        server.close()
+        # Сначала закрываются соединения: с Python 3.12 wait_closed ждёт
+        # и активные соединения, и простаивающий клиент задержал бы остановку
+        for task in list(connections):
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+        await server.wait_closed()
+
+    print("[TCP Server] Сервер остановлен.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TCP эхо-сервер")
+    parser.add_argument('--mode', choices=['simple', 'async', 'framed'], default='simple',
+                        help="simple - по одному клиенту, async - много соединений (asyncio), "
+                             "framed - asyncio, кадры с префиксом длины")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    metrics.add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    export = metrics.start_metrics(args)
+    try:
+        if args.mode in ('async', 'framed'):
+            handler = handle_framed if args.mode == 'framed' else handle_echo
+            try:
+                asyncio.run(async_tcp_server(args.host, args.port, handler=handler))
+            except KeyboardInterrupt:
+                pass
+        else:
+            tcp_server(args.host, args.port)
+    finally:
+        if export is not None:
+            export.close()
+
+
 if __name__ == "__main__":
-    tcp_server()
+    main()
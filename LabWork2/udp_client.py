@@ -1,20 +1,64 @@
 import socket
+import argparse
 
-def udp_client():
+from reliable_udp import ReliableSender
+
+HOST = '127.0.0.1'
+PORT = 65433
+
+
+def udp_client(host=HOST, port=PORT, timeout=2.0, retries=3):
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    
-    HOST = '127.0.0.1'
-    PORT = 65433
+    client_socket.settimeout(timeout)
 
     message = input("Введите сообщение: ")
-    client_socket.sendto(message.encode('utf-8'), (HOST, PORT))
-    print(f"[UDP Client] Сообщение отправлено на {HOST}:{PORT}")
+    for attempt in range(1, retries + 1):
+        client_socket.sendto(message.encode('utf-8'), (host, port))
+        print(f"[UDP Client] Сообщение отправлено на {host}:{port} (попытка {attempt})")
 
-    data, server_addr = client_socket.recvfrom(1024)
-    print(f"[UDP Client] Ответ от сервера {server_addr}: {data.decode('utf-8')}")
+        try:
+            data, server_addr = client_socket.recvfrom(1024)
+        except socket.timeout:
+            continue
+        print(f"[UDP Client] Ответ от сервера {server_addr}: {data.decode('utf-8')}")
+        break
+    else:
+        print(f"[UDP Client] Нет ответа после {retries} попыток.")
 
     client_socket.close()
     print("[UDP Client] Сокет закрыт.")
 
+
+def reliable_udp_client(host=HOST, port=PORT, window=32):
+    client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    message = input("Введите сообщение: ")
+    sender = ReliableSender(client_socket, (host, port), window=window)
+    try:
+        sender.send(message.encode('utf-8'))
+        print(f"[UDP Client] Сообщение доставлено на {host}:{port}, "
+              f"пакетов: {sender.packets_sent}, повторов: {sender.retransmissions}")
+    except TimeoutError as e:
+        print(f"[UDP Client] Ошибка доставки: {e}")
+
+    client_socket.close()
+    print("[UDP Client] Сокет закрыт.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP клиент")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--reliable', action='store_true',
+                        help="надёжная доставка (сервер --reliable)")
+    parser.add_argument('--window', type=int, default=32, help="размер окна отправки")
+    args = parser.parse_args()
+
+    if args.reliable:
+        reliable_udp_client(args.host, args.port, args.window)
+    else:
+        udp_client(args.host, args.port)
+
+
 if __name__ == "__main__":
-    udp_client()
+    main()
@@ -0,0 +1,99 @@
+import socket
+import struct
+import time
+import argparse
+import threading
+import selectors
+
+from udp_client import HOST, PORT
+
+SEQ = struct.Struct('!Q')
+
+
+def receive_replies(sockets, received, stop):
+    selector = selectors.DefaultSelector()
+    for sock in sockets:
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+    buffer = bytearray(65535)
+
+    while not stop.is_set():
+        for key, _ in selector.select(timeout=0.1):
+            while True:
+                try:
+                    key.fileobj.recv_into(buffer)
+                except (BlockingIOError, ConnectionRefusedError):
+                    break
+                received[0] += 1
+    selector.close()
+
+
+def udp_flood(host=HOST, port=PORT, packets=100000, size=64, sockets_count=8, rate=0, wait=1.0):
+    # Несколько сокетов = разные порты источника, ядро раскидывает их
+    # по процессам сервера с SO_REUSEPORT
+    sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(sockets_count)]
+    for sock in sockets:
+        sock.connect((host, port))
+
+    received = [0]
+    stop = threading.Event()
+    receiver = threading.Thread(target=receive_replies, args=(sockets, received, stop), daemon=True)
+    receiver.start()
+
+    payload = bytearray(max(size, SEQ.size))
+    sent = 0
+    errors = 0
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+    for seq in range(packets):
+        SEQ.pack_into(payload, 0, seq)
+        try:
+            sockets[seq % sockets_count].send(payload)
+            sent += 1
+        except (BlockingIOError, ConnectionRefusedError):
+            errors += 1
+        if interval:
+            delay = start + (seq + 1) * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    send_elapsed = time.perf_counter() - start
+
+    # Даём ответам долететь
+    time.sleep(wait)
+    stop.set()
+    receiver.join()
+    for sock in sockets:
+        sock.close()
+
+    lost = sent - received[0]
+    return {
+        'sent': sent,
+        'errors': errors,
+        'received': received[0],
+        'send_pps': sent / send_elapsed if send_elapsed else 0.0,
+        'loss_percent': lost / sent * 100 if sent else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP флуд-клиент для измерения пропускной способности")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-n', '--packets', type=int, default=100000)
+    parser.add_argument('-s', '--size', type=int, default=64, help="размер пакета в байтах")
+    parser.add_argument('--sockets', type=int, default=8, help="число сокетов-источников")
+    parser.add_argument('--rate', type=int, default=0, help="пакетов/с (0 - без ограничения)")
+    parser.add_argument('--wait', type=float, default=1.0, help="ожидание ответов после отправки, с")
+    args = parser.parse_args()
+
+    print(f"[UDP Flood] {args.packets} пакетов по {args.size} байт на {args.host}:{args.port}")
+    result = udp_flood(args.host, args.port, args.packets, args.size,
+                       args.sockets, args.rate, args.wait)
+    print(f"[UDP Flood] Отправлено: {result['sent']} ({result['send_pps']:.0f} пакетов/с), "
+          f"ошибок отправки: {result['errors']}")
+    print(f"[UDP Flood] Получено ответов: {result['received']}, "
+          f"потеряно: {result['loss_percent']:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import time
+import socket
+import argparse
+import threading
+
+from reliable_udp import LossySocket, ReliableSender, ReliableReceiver
+
+
+def run_transfer(data, window, loss, reorder, timeout, seed):
+    receiver_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver_socket.bind(('127.0.0.1', 0))
+    addr = receiver_socket.getsockname()
+
+    # Потери и перестановки в обе стороны: и данные, и подтверждения
+    receiver = ReliableReceiver(LossySocket(receiver_socket, loss, reorder, seed))
+    received = []
+    stop = threading.Event()
+
+    def on_message(client_addr, message):
+        received.append(message)
+
+    thread = threading.Thread(target=receiver.serve, args=(on_message, stop), daemon=True)
+    thread.start()
+
+    sender_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender = ReliableSender(LossySocket(sender_socket, loss, reorder, seed + 1),
+                            addr, window=window, timeout=timeout)
+    start = time.perf_counter()
+    # Все пакеты подтверждены => получатель собрал сообщение целиком.
+    # Получатель работает до конца отправки: он должен повторять потерянные подтверждения.
+    sender.send(data)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    thread.join()
+    sender_socket.close()
+    receiver_socket.close()
+
+    if not received or received[0] != data:
+        raise RuntimeError("Данные доставлены с ошибкой")
+    return elapsed, sender
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Полезная скорость надёжного UDP в зависимости от окна")
+    parser.add_argument('-s', '--size', type=int, default=2 * 1024 * 1024, help="объём данных, байт")
+    parser.add_argument('--loss', type=float, default=0.01, help="вероятность потери пакета")
+    parser.add_argument('--reorder', type=float, default=0.01, help="вероятность перестановки")
+    parser.add_argument('--timeout', type=float, default=0.01, help="таймаут повтора, с")
+    parser.add_argument('--windows', default='1,4,16,64,256', help="размеры окна через запятую")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    data = os.urandom(args.size)
+    print(f"[UDP Bench] {args.size} байт, потери {args.loss:.1%}, перестановки {args.reorder:.1%}")
+    print(f"{'окно':>6} {'МБ/с':>10} {'пакетов':>10} {'повторов':>10}")
+    for window in (int(w) for w in args.windows.split(',')):
+        elapsed, sender = run_transfer(data, window, args.loss, args.reorder, args.timeout, args.seed)
+        goodput = args.size / elapsed / (1024 * 1024)
+        print(f"{window:>6} {goodput:>10.2f} {sender.packets_sent:>10} {sender.retransmissions:>10}")
+
+
+if __name__ == "__main__":
+    main()
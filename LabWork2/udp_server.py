@@ -1,12 +1,31 @@
+import os
+import sys
 import socket
+import select
+import time
+import signal
+import argparse
+import multiprocessing
 
-def udp_server():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common import metrics
+from reliable_udp import ReliableReceiver
+
+HOST = '127.0.0.1'
+PORT = 65433
+
+BUFFER_SIZE = 65535
+BATCH_SIZE = 64
+# Слоты в общем массиве счётчиков на каждый процесс: пакеты, байты
+COUNTER_SLOTS = 2
+
+
+def udp_server(host=HOST, port=PORT):
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    
-    HOST = '127.0.0.1'
-    PORT = 65433  
-    server_socket.bind((HOST, PORT))
-    print(f"[UDP Server] Ожидание пакетов на {HOST}:{PORT}...")
+
+    server_socket.bind((host, port))
+    print(f"[UDP Server] Ожидание пакетов на {host}:{port}...")
 
     while True:
         data, client_addr = server_socket.recvfrom(1024)
@@ -15,5 +34,172 @@ def udp_server():
         server_socket.sendto(data, client_addr)
         print(f"[UDP Server] Отправлено обратно клиенту {client_addr}\n")
 
+
+def reliable_udp_server(host=HOST, port=PORT):
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server_socket.bind((host, port))
+    print(f"[UDP Server] (надёжный режим) Ожидание пакетов на {host}:{port}...")
+
+    def on_message(client_addr, message):
+        metrics.inc('udp_messages_total')
+        metrics.observe('udp_message_bytes', len(message), buckets=metrics.SIZE_BUCKETS)
+        preview = message[:80].decode('utf-8', errors='replace')
+        print(f"[UDP Server] Получено от {client_addr}: {len(message)} байт: {preview}")
+
+    receiver = ReliableReceiver(server_socket)
+    try:
+        receiver.serve(on_message)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server_socket.close()
+        print("[UDP Server] Сервер остановлен.")
+
+
+def kernel_udp_drops():
+    # Счётчик пакетов, отброшенных ядром из-за переполнения буфера (только Linux)
+    try:
+        with open('/proc/net/snmp') as f:
+            lines = [line.split() for line in f if line.startswith('Udp:')]
+        header, values = lines[0], lines[1]
+        return int(values[header.index('RcvbufErrors')])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def udp_worker(host, port, worker_id, counters, stop, echo, sample_every):
+    # Ctrl+C обрабатывает родительский процесс и останавливает всех через stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if hasattr(socket, 'SO_REUSEPORT'):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.bind((host, port))
+    # Сокет неблокирующий: первый пакет ждём в select с таймаутом (чтобы видеть stop),
+    # пачка вычитывается без ожидания. С settimeout сокет внутри тоже ждёт таймаут,
+    # и recvfrom_into(..., MSG_DONTWAIT) на пустой очереди висел до 0.5 с.
+    sock.setblocking(False)
+
+    # Один заранее выделенный буфер на весь цикл, без аллокаций на пакет
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    slot = worker_id * COUNTER_SLOTS
+    packets = 0
+    total_bytes = 0
+
+    while not stop.is_set():
+        readable, _, _ = select.select([sock], [], [], 0.5)
+        if not readable:
+            continue
+
+        # Пачка: вычитываем очередь, пока она не опустеет или не наберётся BATCH_SIZE
+        for _ in range(BATCH_SIZE):
+            try:
+                n, addr = sock.recvfrom_into(buffer)
+            except BlockingIOError:
+                break
+            packets += 1
+            total_bytes += n
+            if echo:
+                try:
+                    sock.sendto(view[:n], addr)
+                except BlockingIOError:
+                    pass  # буфер отправки полон: ответ теряется, как потерянный пакет UDP
+            if sample_every and packets % sample_every == 0:
+                print(f"[UDP Server #{worker_id}] Пакет {packets} от {addr}: {n} байт")
+
+        counters[slot] = packets
+        counters[slot + 1] = total_bytes
+
+    sock.close()
+
+
+def multi_udp_server(host=HOST, port=PORT, workers=4, interval=1.0, echo=True, sample_every=0):
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        print("[UDP Server] SO_REUSEPORT недоступен, запускается один процесс.")
+        workers = 1
+
+    counters = multiprocessing.Array('q', workers * COUNTER_SLOTS, lock=False)
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(
+            target=udp_worker,
+            args=(host, port, i, counters, stop, echo, sample_every),
+            daemon=True
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"[UDP Server] {workers} процессов ожидают пакеты на {host}:{port}...")
+
+    last_packets = 0
+    last_bytes = 0
+    last_drops = kernel_udp_drops()
+    last_time = time.perf_counter()
+    try:
+        while True:
+            time.sleep(interval)
+            now = time.perf_counter()
+            packets = sum(counters[i * COUNTER_SLOTS] for i in range(workers))
+            total_bytes = sum(counters[i * COUNTER_SLOTS + 1] for i in range(workers))
+            drops = kernel_udp_drops()
+
+            elapsed = now - last_time
+            new_packets = packets - last_packets
+            # Процессы-обработчики пишут только в общий массив; в метрики
+            # приращения переносит родительский процесс раз в interval
+            metrics.inc('udp_packets_total', new_packets)
+            metrics.inc('udp_bytes_total', total_bytes - last_bytes)
+            if drops is not None:
+                metrics.set_value('udp_kernel_drops', drops)
+            line = (f"[UDP Server] {new_packets / elapsed:.0f} пакетов/с, "
+                    f"{(total_bytes - last_bytes) * 8 / elapsed / 1e6:.1f} Мбит/с, всего {packets}")
+            if drops is not None and last_drops is not None:
+                dropped = drops - last_drops
+                rate = dropped / (dropped + new_packets) * 100 if dropped + new_packets else 0.0
+                line += f", потеряно ядром {dropped} ({rate:.2f}%)"
+            print(line)
+
+            last_packets, last_bytes, last_drops, last_time = packets, total_bytes, drops, now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=2)
+        print("[UDP Server] Сервер остановлен.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP эхо-сервер")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('-w', '--workers', type=int, default=0,
+                        help="число процессов с SO_REUSEPORT (0 - простой режим)")
+    parser.add_argument('--interval', type=float, default=1.0, help="период отчёта, с")
+    parser.add_argument('--no-echo', action='store_true', help="не отправлять ответы")
+    parser.add_argument('--sample', type=int, default=0,
+                        help="печатать каждый N-й пакет (0 - не печатать)")
+    parser.add_argument('--reliable', action='store_true',
+                        help="надёжный режим: номера пакетов, подтверждения, повторы")
+    metrics.add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    export = metrics.start_metrics(args)
+    try:
+        if args.reliable:
+            reliable_udp_server(args.host, args.port)
+        elif args.workers > 0:
+            multi_udp_server(args.host, args.port, args.workers, args.interval,
+                             not args.no_echo, args.sample)
+        else:
+            udp_server(args.host, args.port)
+    finally:
+        if export is not None:
+            export.close()
+
+
 if __name__ == "__main__":
-    udp_server()
+    main()
@@ -1,7 +1,21 @@
+import os
+import sys
 import sqlite3
+import argparse
 import requests
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common import metrics
+from common.api_client import ApiClient
+from common.http_cache import HttpCache
+from common.post_columns import fetch_posts_cached
+from common.bulk_load import open_bulk_connection
+from common.post_sync import sync_posts
+from common.post_shards import ShardedPosts
+from common.posts_repository import PostsRepository
+
 def create_database():
     conn = sqlite3.connect('posts.db')
     cursor = conn.cursor()
@@ -19,44 +33,54 @@ def create_database():
     conn.close()
     print("База данных и таблица 'posts' успешно созданы.")
 
-def fetch_posts_from_api():
-    url = "https://jsonplaceholder.typicode.com/posts"
+def fetch_posts_from_api(client=None):
+    # Ответ кэшируется на диске: если он не изменился, посты читаются
+    # из двоичного столбцового кэша, JSON повторно не загружается и не разбирается
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Проверка на ошибки HTTP
-        posts = response.json()
+        if client is None:
+            with ApiClient(cache=HttpCache('.http_cache')) as client:
+                posts = fetch_posts_cached(client)  # raise_for_status внутри
+        else:
+            posts = fetch_posts_cached(client)
         print(f"Успешно получено {len(posts)} постов с сервера.")
         return posts
     except requests.exceptions.RequestException as e:
         print(f"Ошибка при запросе к API: {e}")
         return []
 
-def save_posts_to_db(posts):
-    conn = sqlite3.connect('posts.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM posts')
-    
-    for post in posts:
-        cursor.execute('''
-            INSERT INTO posts (id, userId, title, body)
-            VALUES (?, ?, ?, ?)
-        ''', (post['id'], post['userId'], post['title'], post['body']))
-    
-    conn.commit()
-    conn.close()
-    print(f"Успешно сохранено {len(posts)} постов в базу данных.")
+def save_posts_to_db(posts, shards=1):
+    with metrics.timer('save_posts_seconds', {'shards': shards}):
+        counts = _save_posts(posts, shards)
+    for result, count in counts.items():
+        metrics.inc('save_rows_total', count, {'result': result})
+    print(f"Успешно сохранено {len(posts)} постов в базу данных: "
+          f"добавлено {counts['inserted']}, обновлено {counts['updated']}, "
+          f"удалено {counts['deleted']}, без изменений {counts['unchanged']}.")
+    return counts
 
-def get_posts_by_user(user_id):
-    conn = sqlite3.connect('posts.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, title, body FROM posts WHERE userId = ?
-    ''', (user_id,))
-    
-    rows = cursor.fetchall()
-    conn.close()
+def _save_posts(posts, shards):
+    if shards > 1:
+        # Посты раскладываются по файлам posts.N-of-M.db по хэшу userId, шарды пишутся параллельно
+        with ShardedPosts('posts.db', shards) as storage:
+            counts = storage.sync_posts(posts, delete_missing=True)
+    else:
+        conn = open_bulk_connection('posts.db')
+
+        # Пишутся только изменившиеся строки; посты, которых больше нет в API, удаляются
+        counts = sync_posts(conn, posts, delete_missing=True)
+
+        conn.close()
+    return counts
+
+def get_posts_by_user(user_id, repository=None, shards=1):
+    if shards > 1:
+        with ShardedPosts('posts.db', shards) as storage:
+            rows = storage.get_posts_by_user(user_id)
+    elif repository is None:
+        with PostsRepository('posts.db') as repository:
+            rows = repository.get_posts_by_user(user_id)
+    else:
+        rows = repository.get_posts_by_user(user_id)
     
     if rows:
         print(f"\nПосты пользователя с userId = {user_id}:")
@@ -66,21 +90,39 @@ def get_posts_by_user(user_id):
             print(f"Содержание: {row[2]}")
             print("-" * 50)
     else:
-        print(f"Посты для user_id = {userId} не найдены.")
+        print(f"Посты для user_id = {user_id} не найдены.")
     
     return rows
 
 def main():
-    create_database()
+    parser = argparse.ArgumentParser(description="Загрузка постов в SQLite")
+    parser.add_argument('--shards', type=int, default=1, help="число файлов-шардов БД (по хэшу userId)")
+    metrics.add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    export = metrics.start_metrics(args)
+    try:
+        run(args)
+    finally:
+        if export is not None:
+            export.close()
+
+def run(args):
+    if args.shards == 1:
+        create_database()
     
     posts = fetch_posts_from_api()
     if not posts:
         return
     
-    save_posts_to_db(posts)
+    save_posts_to_db(posts, args.shards)
     
     print("\n" + "="*60)
-    get_posts_by_user(1)
+    if args.shards > 1:
+        get_posts_by_user(1, shards=args.shards)
+        return
+    with PostsRepository('posts.db') as repository:
+        get_posts_by_user(1, repository)
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,41 @@
+import os
 import sys
+import time
 import sqlite3
+import argparse
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTableView, QVBoxLayout, QHBoxLayout,
     QWidget, QPushButton, QLineEdit, QLabel, QDialog, QFormLayout,
     QSpinBox, QTextEdit, QMessageBox, QHeaderView
 )
-from PyQt5.QtCore import Qt, QSortFilterProxyModel
-from PyQt5.QtSql import QSqlDatabase, QSqlTableModel, QSqlQuery
+from PyQt5.QtCore import Qt, QTimer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common import metrics
+from common.posts_search import ensure_fts
+from common.posts_repository import INDEXES
+from common.schema_cache import ensure_schema
+from posts_model import PagedPostsModel
+
+# Поиск запускается, когда пользователь перестал печатать на это время
+SEARCH_DELAY_MS = 250
+REQUIRED_COLUMNS = ['id', 'userId', 'title', 'body']
+
+
+def prepare_schema(conn):
+    # Выполняется только при изменённой схеме (common.schema_cache), а не при каждом запуске
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(posts)')]
+    if not columns:
+        raise ValueError("Таблица 'posts' не найдена!")
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Отсутствуют колонки в таблице 'posts': {', '.join(missing)}\n"
+                         f"Доступные: {', '.join(columns)}")
+    # Полнотекстовый индекс, индексы для сортировки и триггеры синхронизации создаются один раз
+    conn.execute('PRAGMA journal_mode=WAL')
+    ensure_fts(conn)
+    conn.executescript(INDEXES)
 
 
 class AddRecordDialog(QDialog):
@@ -50,45 +79,41 @@ class AddRecordDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, db_path="posts.db"):
         super().__init__()
         self.setWindowTitle("Управление записями (SQLite + PyQt5)")
         self.resize(900, 600)
 
-        self.db = None
+        self.db_path = db_path
+        self.conn = None
         self.model = None
-        self.proxy_model = None
 
-        self.init_db()
+        # Замер поиска: от последнего нажатия до первых результатов
+        self.last_keystroke = None
+        self.search_latency_ms = None
+        self.skipped_keystrokes = 0
+
+        # Окно показывается сразу, БД открывается в первой итерации цикла событий
         self.init_ui()
+        self.set_controls_enabled(False)
+        self.statusBar().showMessage("Открытие БД...")
+        QTimer.singleShot(0, self.init_db)
 
     def init_db(self):
-        self.db = QSqlDatabase.addDatabase("QSQLITE")
-        self.db.setDatabaseName("posts.db") 
-
-        if not self.db.open():
-            error = self.db.lastError().text()
-            QMessageBox.critical(self, "Ошибка БД", f"Не удалось открыть БД:\n{error}")
-            sys.exit(1)
-
-        query = QSqlQuery(self.db)
-        if not query.exec_("PRAGMA table_info(posts);"):
-            QMessageBox.critical(self, "Ошибка", "Таблица 'posts' не найдена!")
-            sys.exit(1)
-
-        columns = []
-        while query.next():
-            columns.append(query.value(1)) 
-
-        required = ['id', 'userId', 'title', 'body']
-        missing = [col for col in required if col not in columns]
-        if missing:
-            QMessageBox.critical(
-                self, "Ошибка структуры",
-                f"Отсутствуют колонки в таблице 'posts': {', '.join(missing)}\n"
-                f"Доступные: {', '.join(columns)}"
-            )
-            sys.exit(1)
+        # Соединение для записи; схема проверяется, только если изменилась с прошлого запуска
+        try:
+            self.conn = sqlite3.connect(self.db_path)
+            ensure_schema(self.conn, self.db_path, 'LabWork4', prepare_schema)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            QMessageBox.critical(self, "Ошибка БД", f"Не удалось открыть БД:\n{e}")
+            QApplication.exit(1)
+            return
+        self.setup_model()
+        self.set_controls_enabled(True)
+
+    def set_controls_enabled(self, enabled):
+        for widget in (self.search_input, self.refresh_btn, self.add_btn, self.delete_btn):
+            widget.setEnabled(enabled)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -96,7 +121,7 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(central_widget)
 
         search_layout = QHBoxLayout()
-        search_layout.addWidget(QLabel("Поиск по заголовку:"))
+        search_layout.addWidget(QLabel("Поиск по заголовку и тексту:"))
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Введите текст...")
         search_layout.addWidget(self.search_input)
@@ -104,8 +129,10 @@ class MainWindow(QMainWindow):
 
         self.table_view = QTableView()
         self.table_view.setSelectionBehavior(QTableView.SelectRows)
-        self.table_view.setSelectionMode(QTableView.SingleSelection)
+        self.table_view.setSelectionMode(QTableView.ExtendedSelection)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.setSortingEnabled(True)
         layout.addWidget(self.table_view)
 
         buttons_layout = QHBoxLayout()
@@ -119,44 +146,62 @@ class MainWindow(QMainWindow):
         buttons_layout.addStretch()
         layout.addLayout(buttons_layout)
 
-        self.setup_model()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.filter_table)
 
-        self.search_input.textChanged.connect(self.filter_table)
+        self.search_input.textChanged.connect(self.on_search_edited)
+        self.search_input.returnPressed.connect(self.filter_table)
         self.refresh_btn.clicked.connect(self.refresh_table)
         self.add_btn.clicked.connect(self.add_record)
         self.delete_btn.clicked.connect(self.delete_record)
 
     def setup_model(self):
-        self.model = QSqlTableModel(self, self.db)
-        self.model.setTable("posts")
-        self.model.setEditStrategy(QSqlTableModel.OnManualSubmit)
-
-        # Устанавливаем заголовки вручную
-        self.model.setHeaderData(0, Qt.Horizontal, "ID")
-        self.model.setHeaderData(1, Qt.Horizontal, "User ID")
-        self.model.setHeaderData(2, Qt.Horizontal, "Title")
-        self.model.setHeaderData(3, Qt.Horizontal, "Body")
+        # Модель читает строки страницами по мере прокрутки, фильтр и сортировка - в SQL
+        self.model = PagedPostsModel(self.db_path, self)
+        self.model.count_changed.connect(self.on_count_changed)
+        self.model.query_failed.connect(self.on_query_failed)
+        self.model.first_results.connect(self.on_first_results)
+        self.table_view.setModel(self.model)
+        self.table_view.sortByColumn(0, Qt.AscendingOrder)
+
+    def on_count_changed(self, count):
+        message = f"Записей: {count}"
+        if self.search_latency_ms is not None:
+            message += (
+                f" | поиск: {self.search_latency_ms:.0f} мс"
+                f" | пропущено нажатий: {self.skipped_keystrokes}"
+                f" | отменено запросов: {self.model.cancelled_queries}"
+            )
+        self.statusBar().showMessage(message)
 
-        if not self.model.select():
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить данные:\n{self.model.lastError().text()}")
+    def on_search_edited(self):
+        # Каждое нажатие перезапускает таймер: запрос уходит один раз после паузы
+        self.last_keystroke = time.perf_counter()
+        if self.search_timer.isActive():
+            self.skipped_keystrokes += 1
+        self.search_timer.start()
 
-        # Прокси для фильтрации
-        self.proxy_model = QSortFilterProxyModel()
-        self.proxy_model.setSourceModel(self.model)
-        self.proxy_model.setFilterKeyColumn(2)  
-        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+    def on_first_results(self):
+        if self.last_keystroke is not None:
+            self.search_latency_ms = (time.perf_counter() - self.last_keystroke) * 1000
+            metrics.observe('search_latency_seconds', self.search_latency_ms / 1000)
+            self.last_keystroke = None
+            self.on_count_changed(self.model.rowCount())
 
-        self.table_view.setModel(self.proxy_model)
+    def on_query_failed(self, error):
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить данные:\n{error}")
 
     def filter_table(self):
+        self.search_timer.stop()
         text = self.search_input.text().strip()
-        self.proxy_model.setFilterFixedString(text)
+        if text == self.model.search_text:
+            return
+        self.model.set_search(text)
 
     def refresh_table(self):
-        self.model.select()
-        while self.model.canFetchMore():
-            self.model.fetchMore()
-        self.filter_table()
+        self.model.refresh()
 
     def add_record(self):
         dialog = AddRecordDialog(self)
@@ -168,61 +213,90 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Ошибка", "Title и Body обязательны!")
             return
 
-        # Создаём запись
-        record = self.model.record()
-        record.setValue("userId", user_id)
-        record.setValue("title", title)
-        record.setValue("body", body)
-
-        # Вставляем в конец
-        row = self.model.rowCount()
-        if self.model.insertRow(row):
-            self.model.setRecord(row, record)
-            if self.model.submitAll():
-                self.refresh_table()
-                QMessageBox.information(self, "Успех", "Запись добавлена!")
+        try:
+            with self.conn:
+                cursor = self.conn.execute(
+                    "INSERT INTO posts (userId, title, body) VALUES (?, ?, ?)", (user_id, title, body)
+                )
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Ошибка добавления", f"Не удалось сохранить:\n{e}")
+            return
+        # В модель добавляется одна строка с новым id, таблица не перечитывается
+        self.model.insert_posts(self.conn, [(cursor.lastrowid, user_id, title, body)])
+        QMessageBox.information(self, "Успех", "Запись добавлена!")
+
+    def selected_ranges(self):
+        # Выделение как диапазоны строк: без индекса на каждую выделенную строку
+        ranges = []
+        for first, last in sorted((r.top(), r.bottom()) for r in self.table_view.selectionModel().selection()):
+            if ranges and first <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], last)
             else:
-                self.model.revertAll()
-                error = self.model.lastError().text()
-                QMessageBox.critical(self, "Ошибка добавления", f"Не удалось сохранить:\n{error}")
-        else:
-            QMessageBox.critical(self, "Ошибка", "Не удалось вставить строку.")
+                ranges.append([first, last])
+        return ranges
 
     def delete_record(self):
-        indexes = self.table_view.selectionModel().selectedRows()
-        if not indexes:
-            QMessageBox.warning(self, "Ошибка", "Выберите запись для удаления!")
+        ranges = self.selected_ranges()
+        if not ranges:
+            QMessageBox.warning(self, "Ошибка", "Выберите записи для удаления!")
+            return
+
+        # Выделенные строки удаляются по ключам крайних строк диапазонов:
+        # страницы внутри большого выделения не загружаются
+        condition = self.model.rows_condition(ranges)
+        if condition is None:
+            QMessageBox.warning(self, "Ошибка", "Записи ещё загружаются, повторите попытку.")
             return
+        where, params = condition
+        count = sum(last - first + 1 for first, last in ranges)
 
         reply = QMessageBox.question(
             self, "Подтверждение",
-            "Удалить выбранную запись?",
+            f"Удалить выбранные записи ({count})?",
             QMessageBox.Yes | QMessageBox.No
         )
         if reply != QMessageBox.Yes:
             return
 
-        proxy_row = indexes[0].row()
-        source_row = self.proxy_model.mapToSource(self.proxy_model.index(proxy_row, 0)).row()
-
-        if self.model.removeRow(source_row):
-            if self.model.submitAll():
-                self.refresh_table()
-                QMessageBox.information(self, "Успех", "Запись удалена!")
-            else:
-                self.model.revertAll()
-                QMessageBox.critical(self, "Ошибка", f"Не удалось удалить:\n{self.model.lastError().text()}")
-        else:
-            QMessageBox.critical(self, "Ошибка", "Не удалось удалить строку.")
+        try:
+            # Все выбранные записи удаляются одним запросом в одной транзакции.
+            # Другое число строк - таблицу меняли в обход модели (например, загрузчик
+            # добавил посты внутрь диапазона): откат до фиксации, невидимые
+            # пользователю строки не удаляются
+            with self.conn:
+                deleted = self.conn.execute(f"DELETE FROM posts WHERE {where}", params).rowcount
+                if deleted != count:
+                    self.conn.rollback()
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось удалить:\n{e}")
+            return
+        self.table_view.clearSelection()
+        if deleted != count:
+            self.model.refresh()
+            QMessageBox.warning(self, "Ошибка", "Таблица изменилась после загрузки: записи не удалены, "
+                                                "список обновлён. Выберите записи заново.")
+            return
+        self.model.remove_ranges(ranges)
+        QMessageBox.information(self, "Успех", f"Удалено записей: {deleted}")
 
     def closeEvent(self, event):
-        if self.db and self.db.isOpen():
-            self.db.close()
+        self.search_timer.stop()
+        if self.model is not None:
+            self.model.cancel_all()
+            self.model.pool.waitForDone()
+        if self.conn is not None:
+            self.conn.close()
         super().closeEvent(event)
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = metrics.add_metrics_arguments(argparse.ArgumentParser(description="Посты (таблица)"))
+    args, qt_args = parser.parse_known_args()
+    export = metrics.start_metrics(args)
+    app = QApplication(sys.argv[:1] + qt_args)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    code = app.exec_()
+    if export is not None:
+        export.close()
+    sys.exit(code)
\ No newline at end of file
@@ -0,0 +1,461 @@
+import json
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Iterator
+
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+)
+
+from common import metrics
+from common.posts_search import iter_search_posts, build_match_query
+
+COLUMNS = ['id', 'userId', 'title', 'body']
+HEADERS = ['ID', 'User ID', 'Title', 'Body']
+# Сортировка только по индексированным колонкам: страница читается по индексу
+SORTABLE = {0: 'id', 1: 'userId'}
+PAGE_SIZE = 200
+MAX_PAGES = 64
+SEARCH_LIMIT = 1000
+SELECT_COLUMNS = 'SELECT id, userId, title, body FROM posts'
+
+
+class QuerySignals(QObject):
+    finished = pyqtSignal(object, str, object)
+    failed = pyqtSignal(object, str)
+    done = pyqtSignal(object)
+
+
+class QueryTask(QRunnable):
+    # Запрос к БД в пуле потоков; у каждой задачи своё соединение sqlite3.
+    # Запрос может вернуть генератор - тогда каждая порция отправляется сразу.
+
+    def __init__(self, db_path, generation, kind, query, signals):
+        super().__init__()
+        # Задачей владеет модель: её можно снять из очереди или отменить
+        self.setAutoDelete(False)
+        self.db_path = db_path
+        self.generation = generation
+        self.kind = kind
+        self.query = query
+        self.signals = signals
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        with metrics.timer('model_query_seconds', {'kind': self.kind}):
+            self.execute()
+        self.signals.done.emit(self)
+
+    def execute(self):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            # Отменённый запрос прерывается внутри SQLite, не дожидаясь результата
+            conn.set_progress_handler(lambda: self.cancelled, 1000)
+            try:
+                result = self.query(conn)
+                if isinstance(result, Iterator):
+                    for part in result:
+                        if self.cancelled:
+                            break
+                        self.signals.finished.emit(self, 'chunk', part)
+                    result = None
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            if not self.cancelled:
+                metrics.inc('model_query_errors_total', 1, {'kind': self.kind})
+                self.signals.failed.emit(self, str(e))
+        else:
+            if not self.cancelled:
+                self.signals.finished.emit(self, self.kind, result)
+        if self.cancelled:
+            metrics.inc('model_query_cancelled_total', 1, {'kind': self.kind})
+
+
+class PagedPostsModel(QAbstractTableModel):
+    # Модель без загрузки всей таблицы:
+    # - строки читаются страницами по PAGE_SIZE, когда представление их запрашивает;
+    # - следующая страница ищется по ключу последней строки предыдущей (keyset),
+    #   OFFSET только при переходе в произвольное место списка;
+    # - в памяти не больше MAX_PAGES страниц (LRU);
+    # - COUNT и страницы выполняются в фоне, GUI-поток не блокируется;
+    # - поиск (FTS5) и сортировка выполняются в SQL;
+    # - устаревшие запросы снимаются из очереди или прерываются, результаты
+    #   поиска приходят порциями по PAGE_SIZE.
+
+    count_changed = pyqtSignal(int)
+    query_failed = pyqtSignal(str)
+    # Первые данные после refresh(): для замера задержки поиска
+    first_results = pyqtSignal()
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.signals = QuerySignals()
+        self.signals.finished.connect(self.on_query_finished)
+        self.signals.failed.connect(self.on_query_failed)
+        self.signals.done.connect(self.on_task_done)
+
+        self.tasks = set()
+        self.cancelled_queries = 0
+        self.generation = 0
+        self.row_count = 0
+        self.counted = False
+        self.first_sent = False
+        self.pages = OrderedDict()
+        self.loading = set()
+        # Ключ (значение сортировки, id) последней строки каждой загруженной страницы
+        self.boundaries = {}
+        self.sort_column = 'id'
+        self.descending = False
+        self.search_text = ''
+        self.ranked_ids = None
+
+    # --- интерфейс QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        row = self.row_at(index.row())
+        if row is None:
+            return "…" if role == Qt.DisplayRole else None
+        return row[index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return section + 1
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column not in SORTABLE:
+            return
+        self.sort_column = SORTABLE[column]
+        self.descending = order == Qt.DescendingOrder
+        self.refresh()
+
+    # --- управление ---
+
+    def set_search(self, text):
+        self.search_text = text
+        self.refresh()
+
+    def refresh(self):
+        metrics.inc('model_refresh_total')
+        self.beginResetModel()
+        self.generation += 1
+        self.cancel_stale()
+        self.row_count = 0
+        self.counted = False
+        self.first_sent = False
+        self.pages.clear()
+        self.loading.clear()
+        self.boundaries.clear()
+        self.ranked_ids = None
+        self.endResetModel()
+
+        if self.search_text:
+            # Результаты поиска вставляются в модель по мере получения
+            self.ranked_ids = []
+            self.start_query('search', self.search_query())
+        else:
+            # Подсчёт строк и первая страница запрашиваются одновременно
+            self.start_query('count', self.count_query())
+            self.request_page(0)
+
+    def row_at(self, row):
+        page = row // PAGE_SIZE
+        rows = self.pages.get(page)
+        if rows is None:
+            self.request_page(page)
+            return None
+        self.pages.move_to_end(page)
+        offset = row % PAGE_SIZE
+        return rows[offset] if offset < len(rows) else None
+
+    def post_id(self, row):
+        data = self.row_at(row)
+        return data[0] if data is not None else None
+
+    def loaded_row(self, row):
+        # Строка из кэша страниц; в отличие от row_at, загрузку не запрашивает
+        rows = self.pages.get(row // PAGE_SIZE)
+        offset = row % PAGE_SIZE
+        return rows[offset] if rows is not None and offset < len(rows) else None
+
+    def sort_key(self, row):
+        return row[COLUMNS.index(self.sort_column)], row[0]
+
+    def precedes(self, key, other):
+        # Строка с ключом key стоит в текущем порядке раньше строки с ключом other
+        return key > other if self.descending else key < other
+
+    # --- точечные изменения после добавления/удаления ---
+    # Меняются только затронутые страницы кэша, модель не перечитывается целиком
+
+    def insert_posts(self, conn, rows):
+        # rows - уже сохранённые в БД строки (id, userId, title, body)
+        if not self.counted:
+            self.refresh()
+            return
+        for row in rows:
+            position = self.position_for(conn, row)
+            if position is None:
+                continue
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.row_count += 1
+            if self.ranked_ids is not None:
+                self.ranked_ids.insert(position, row[0])
+            page, offset = divmod(position, PAGE_SIZE)
+            self.invalidate_after(page)
+            cached = self.pages.get(page)
+            if cached is not None:
+                cached.insert(offset, row)
+                del cached[PAGE_SIZE:]
+                self.remember_boundary(page, cached)
+            else:
+                self.boundaries.pop(page, None)
+            self.endInsertRows()
+        self.count_changed.emit(self.row_count)
+
+    def remove_rows(self, positions):
+        # Удаление уже выполнено в БД; смежные строки снимаются одним диапазоном
+        ranges = []
+        for position in sorted(set(positions)):
+            if ranges and ranges[-1][1] == position - 1:
+                ranges[-1][1] = position
+            else:
+                ranges.append([position, position])
+        self.remove_ranges(ranges)
+
+    def remove_ranges(self, ranges):
+        # ranges - непересекающиеся диапазоны строк [(first, last)], уже удалённые в БД
+        if not self.counted:
+            self.refresh()
+            return
+        for first, last in sorted(ranges, reverse=True):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self.row_count -= last - first + 1
+            if self.ranked_ids is not None:
+                del self.ranked_ids[first:last + 1]
+            # Хвост страницы first теперь приходит со следующей: её перечитаем по ключу
+            self.invalidate_after(first // PAGE_SIZE - 1)
+            self.endRemoveRows()
+        self.count_changed.emit(self.row_count)
+
+    def position_for(self, conn, row):
+        if self.ranked_ids is not None:
+            # В режиме поиска новая подходящая запись показывается первой
+            match_query = build_match_query(self.search_text)
+            if match_query is None:
+                return None
+            match = conn.execute(
+                'SELECT 1 FROM posts_fts WHERE posts_fts MATCH ? AND rowid = ?', (match_query, row[0])
+            ).fetchone()
+            return 0 if match else None
+        if self.sort_column == 'id':
+            # Новый id всегда наибольший
+            return 0 if self.descending else self.row_count
+        return self.loaded_position(row)
+
+    def loaded_position(self, row):
+        # Позиция по ключам загруженных страниц, без COUNT в GUI-потоке:
+        # - ключ внутри загруженной страницы или сразу за ней - точная позиция;
+        # - ключ в незагруженном промежутке - начало промежутка. Страницы после
+        #   вставки сбрасываются и читаются из БД уже с новой строкой на её месте,
+        #   так что модель остаётся согласованной с таблицей
+        key = self.sort_key(row)
+        before = [page for page, rows in self.pages.items()
+                  if rows and self.precedes(self.sort_key(rows[0]), key)]
+        if not before:
+            return 0
+        page = max(before)
+        rows = self.pages[page]
+        offset = next((i for i, other in enumerate(rows) if self.precedes(key, self.sort_key(other))), len(rows))
+        return page * PAGE_SIZE + offset
+
+    def rows_condition(self, ranges):
+        # SQL-условие для строк в диапазонах [(first, last)] без загрузки страниц:
+        # диапазон задаётся ключами его крайних строк - строки таблицы между ними
+        # и есть строки модели между ними. None - крайние строки не загружены
+        # (их загрузка запрашивается, можно повторить позже)
+        if self.ranked_ids is not None:
+            ids = [post_id for first, last in ranges for post_id in self.ranked_ids[first:last + 1]]
+            return 'id IN (SELECT value FROM json_each(?))', (json.dumps(ids),)
+        parts = []
+        params = []
+        missing = False
+        for first, last in ranges:
+            ends = [self.loaded_row(first), self.loaded_row(last)]
+            if None in ends:
+                missing = True
+                for position, row in zip((first, last), ends):
+                    if row is None:
+                        self.request_page(position // PAGE_SIZE)
+                continue
+            low, high = sorted(self.sort_key(row) for row in ends)
+            if self.sort_column == 'id':
+                parts.append('id BETWEEN ? AND ?')
+                params += [low[1], high[1]]
+            else:
+                column = self.sort_column
+                parts.append(f'(({column}, id) >= (?, ?) AND ({column}, id) <= (?, ?))')
+                params += [*low, *high]
+        if missing or not parts:
+            return None
+        return ' OR '.join(parts), tuple(params)
+
+    def invalidate_after(self, page):
+        # Страницы после page сдвинулись: выбрасываем их и их ключи,
+        # незавершённые загрузки отменяем сменой поколения
+        for key in [p for p in self.pages if p > page]:
+            del self.pages[key]
+        for key in [p for p in self.boundaries if p > page]:
+            del self.boundaries[key]
+        self.generation += 1
+        self.cancel_stale()
+        self.loading.clear()
+
+    def remember_boundary(self, page, rows):
+        if rows:
+            sort_index = COLUMNS.index(self.sort_column)
+            self.boundaries[page] = (rows[-1][sort_index], rows[-1][0])
+
+    # --- фоновые запросы ---
+
+    def start_query(self, kind, query):
+        task = QueryTask(self.db_path, self.generation, kind, query, self.signals)
+        self.tasks.add(task)
+        self.pool.start(task)
+
+    def cancel_stale(self):
+        # Ещё не начатые задачи снимаются из очереди, выполняющиеся прерываются
+        for task in list(self.tasks):
+            if task.generation == self.generation or task.cancelled:
+                continue
+            if self.pool.tryTake(task):
+                self.tasks.discard(task)
+            task.cancel()
+            self.cancelled_queries += 1
+
+    def cancel_all(self):
+        self.generation += 1
+        self.cancel_stale()
+
+    def on_task_done(self, task):
+        self.tasks.discard(task)
+
+    def count_query(self):
+        def query(conn):
+            return conn.execute('SELECT count(*) FROM posts').fetchone()[0]
+        return query
+
+    def search_query(self):
+        text = self.search_text
+
+        def query(conn):
+            return iter_search_posts(conn, text, SEARCH_LIMIT, PAGE_SIZE)
+        return query
+
+    def request_page(self, page):
+        if page in self.loading or page in self.pages:
+            return
+        self.loading.add(page)
+        self.start_query('page', self.page_query(page))
+
+    def page_query(self, page):
+        if self.ranked_ids is not None:
+            ids = self.ranked_ids[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+            def query(conn):
+                placeholders = ', '.join('?' * len(ids))
+                rows = {row[0]: row for row in conn.execute(
+                    f'{SELECT_COLUMNS} WHERE id IN ({placeholders})', ids
+                )}
+                return page, [rows[i] for i in ids if i in rows]
+            return query
+
+        column = self.sort_column
+        direction = 'DESC' if self.descending else 'ASC'
+        compare = '<' if self.descending else '>'
+        order = f'ORDER BY {column} {direction}' if column == 'id' else \
+            f'ORDER BY {column} {direction}, id {direction}'
+        boundary = self.boundaries.get(page - 1) if page > 0 else None
+
+        if page == 0:
+            sql, params = f'{SELECT_COLUMNS} {order} LIMIT ?', (PAGE_SIZE,)
+        elif boundary is not None:
+            if column == 'id':
+                sql = f'{SELECT_COLUMNS} WHERE id {compare} ? {order} LIMIT ?'
+                params = (boundary[1], PAGE_SIZE)
+            else:
+                sql = f'{SELECT_COLUMNS} WHERE ({column}, id) {compare} (?, ?) {order} LIMIT ?'
+                params = (boundary[0], boundary[1], PAGE_SIZE)
+        else:
+            sql, params = f'{SELECT_COLUMNS} {order} LIMIT ? OFFSET ?', (PAGE_SIZE, page * PAGE_SIZE)
+
+        def query(conn):
+            return page, conn.execute(sql, params).fetchall()
+        return query
+
+    def on_query_finished(self, task, kind, result):
+        if task.generation != self.generation:
+            return  # ответ на устаревший запрос (сменились поиск или сортировка)
+        if kind == 'count':
+            if result:
+                self.beginInsertRows(QModelIndex(), 0, result - 1)
+                self.row_count = result
+                self.endInsertRows()
+            self.counted = True
+            self.count_changed.emit(result)
+            return
+        if kind == 'chunk':
+            # Очередная порция результатов поиска - это ровно одна страница
+            first = self.row_count
+            self.beginInsertRows(QModelIndex(), first, first + len(result) - 1)
+            self.ranked_ids.extend(row[0] for row in result)
+            self.pages[first // PAGE_SIZE] = result
+            self.row_count += len(result)
+            self.endInsertRows()
+            self.count_changed.emit(self.row_count)
+            self.notify_first_results()
+            return
+        if kind == 'search':
+            self.counted = True
+            self.count_changed.emit(self.row_count)
+            self.notify_first_results()
+            return
+
+        page, rows = result
+        self.loading.discard(page)
+        self.pages[page] = rows
+        self.remember_boundary(page, rows)
+        while len(self.pages) > MAX_PAGES:
+            self.pages.popitem(last=False)
+        first = page * PAGE_SIZE
+        last = min(first + len(rows), self.row_count) - 1
+        if last >= first:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(COLUMNS) - 1))
+        if page == 0:
+            self.notify_first_results()
+
+    def notify_first_results(self):
+        if not self.first_sent:
+            self.first_sent = True
+            self.first_results.emit()
+
+    def on_query_failed(self, task, message):
+        if task.generation == self.generation:
+            self.query_failed.emit(message)
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import signal
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.metrics import start_metrics
+from common.post_loader import PostLoader, add_loader_arguments, loader_options
+
+# Загрузчик постов без GUI: тот же движок, что у окна main.py, но без PyQt5.
+#   python loader.py --once                  - один цикл и выход
+#   python loader.py --interval 30           - демон, опрос каждые 30 с
+#   python loader.py --metrics-port 9108     - метрики: curl localhost:9108/metrics
+
+
+def log_event(kind, payload):
+    if kind == 'saved':
+        print(f"[Loader] Сохранено: добавлено {payload['inserted']}, обновлено {payload['updated']}, "
+              f"без изменений {payload['unchanged']}", flush=True)
+    elif kind == 'not_modified':
+        print("[Loader] Данные не изменились", flush=True)
+    elif kind == 'error':
+        print(f"[Loader] Ошибка: {payload}", file=sys.stderr, flush=True)
+
+
+def main():
+    parser = add_loader_arguments(argparse.ArgumentParser(description="Загрузка постов в SQLite без GUI"))
+    parser.add_argument('--once', action='store_true', help="выполнить один цикл и выйти")
+    parser.add_argument('--stats', action='store_true', help="при выходе напечатать метрики в JSON")
+    args = parser.parse_args()
+
+    export = start_metrics(args)
+    loader = PostLoader(**loader_options(args), on_event=log_event)
+    code = 0
+    try:
+        if args.once:
+            kind, _ = loader.run_once()
+            code = 1 if kind == 'error' else 0
+        else:
+            stop = threading.Event()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+            print(f"[Loader] Опрос {', '.join(loader.pipeline.paths)} каждые {args.interval:g} с, "
+                  f"БД {args.db}", flush=True)
+            loader.start(delay=0)
+            stop.wait()
+            print("[Loader] Остановка...", flush=True)
+    finally:
+        loader.close()
+        if export is not None:
+            export.close()
+    if args.stats:
+        print(json.dumps(loader.stats()))
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+import sys
+import argparse
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.columnar_cache import open_cached
+
+# Аналитика по sample_data.csv (Date, Category, Value1, Value2, BooleanFlag):
+# файл читается в столбцовые массивы NumPy, все расчёты векторные, без цикла по строкам.
+
+CSV_DTYPE = np.dtype([
+    ('Date', 'M8[D]'),
+    ('Category', 'U16'),
+    ('Value1', 'f8'),
+    ('Value2', 'f8'),
+    ('BooleanFlag', 'U5'),
+])
+# Строк на одно чтение: временный структурированный массив не растёт с размером файла
+CHUNK_ROWS = 250_000
+VALUE_COLUMNS = ('Value1', 'Value2')
+
+
+class SampleData:
+    # Столбцы таблицы; Category хранится кодами (словарное кодирование):
+    # categories[codes[i]] - категория строки i
+
+    def __init__(self, dates, codes, categories, value1, value2, flags):
+        self.dates = dates
+        self.codes = codes
+        self.categories = categories
+        self.value1 = value1
+        self.value2 = value2
+        self.flags = flags
+
+    def __len__(self):
+        return len(self.dates)
+
+    def values(self, column):
+        return self.value1 if column == 'Value1' else self.value2
+
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.dates, self.codes, self.value1, self.value2, self.flags))
+
+
+def encode_categories(chunk, index):
+    # Коды категорий чанка в общем словаре index (категория -> код).
+    # Известные категории ищутся двоичным поиском по их отсортированному списку;
+    # сортировка строк (np.unique) нужна только для строк с новыми категориями
+    names = sorted(index)
+    if names:
+        sorted_names = np.array(names, dtype=chunk.dtype)
+        positions = np.minimum(np.searchsorted(sorted_names, chunk), len(names) - 1)
+        known = sorted_names[positions] == chunk
+        if known.all():
+            return np.array([index[name] for name in names], dtype=np.int32)[positions]
+        chunk_new = chunk[~known]
+    else:
+        chunk_new = chunk
+    for name in np.unique(chunk_new):
+        index.setdefault(str(name), len(index))
+    return encode_categories(chunk, index)
+
+
+def load_sample_data(path, chunk_rows=CHUNK_ROWS):
+    index = {}
+    columns = {name: [] for name in ('dates', 'codes', 'value1', 'value2', 'flags')}
+    with open(path, encoding='utf-8') as f:
+        header = f.readline().strip().split(',')
+        if header != list(CSV_DTYPE.names):
+            raise ValueError(f"Неожиданные колонки: {', '.join(header)}")
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)  # пустой последний чанк
+            while True:
+                chunk = np.loadtxt(f, delimiter=',', dtype=CSV_DTYPE, max_rows=chunk_rows, ndmin=1)
+                if len(chunk) == 0:
+                    break
+                columns['dates'].append(chunk['Date'])
+                columns['codes'].append(encode_categories(chunk['Category'], index))
+                columns['value1'].append(chunk['Value1'])
+                columns['value2'].append(chunk['Value2'])
+                columns['flags'].append(chunk['BooleanFlag'] == 'True')
+    empty = {'dates': 'M8[D]', 'codes': np.int32, 'value1': 'f8', 'value2': 'f8', 'flags': bool}
+    arrays = {
+        name: np.concatenate(parts) if parts else np.empty(0, dtype=empty[name])
+        for name, parts in columns.items()
+    }
+    categories = np.array(sorted(index, key=index.get))
+    return SampleData(arrays['dates'], arrays['codes'], categories,
+                      arrays['value1'], arrays['value2'], arrays['flags'])
+
+
+def load_sample_data_cached(path, cache_path=None):
+    # Первый запуск разбирает CSV и сохраняет столбцы в двоичный кэш рядом с файлом;
+    # следующие отображают кэш в память без разбора, пока CSV не изменился
+    cached = open_cached(cache_path or path + '.columns', path, lambda: sample_columns(load_sample_data(path)))
+    return SampleData(cached.column('dates'), cached.column('codes'),
+                      np.array(cached.column('categories').tolist()), cached.column('value1'),
+                      cached.column('value2'), cached.column('flags'))
+
+
+def sample_columns(data):
+    return {
+        'dates': data.dates, 'codes': data.codes, 'categories': data.categories.tolist(),
+        'value1': data.value1, 'value2': data.value2, 'flags': data.flags,
+    }
+
+
+def group_by_category(data):
+    # Число строк, сумма/среднее/минимум/максимум значений и доля флага по категориям
+    groups = len(data.categories)
+    counts = np.bincount(data.codes, minlength=groups)
+    safe = np.maximum(counts, 1)
+    result = {
+        'category': data.categories,
+        'count': counts,
+        'flag_share': np.bincount(data.codes, weights=data.flags, minlength=groups) / safe,
+    }
+    for column in VALUE_COLUMNS:
+        values = data.values(column)
+        sums = np.bincount(data.codes, weights=values, minlength=groups)
+        mins = np.full(groups, np.inf)
+        maxs = np.full(groups, -np.inf)
+        np.minimum.at(mins, data.codes, values)
+        np.maximum.at(maxs, data.codes, values)
+        result[f'{column}_sum'] = sums
+        result[f'{column}_mean'] = sums / safe
+        result[f'{column}_min'] = mins
+        result[f'{column}_max'] = maxs
+    return result
+
+
+def rolling_by_date(data, window_days=7, column='Value1'):
+    # Скользящее окно по календарным дням (пропущенные даты учитываются как пустые):
+    # суммы по дням через bincount, окно - разность накопленных сумм
+    if not len(data):
+        return {'date': np.empty(0, dtype='M8[D]'), 'count': np.empty(0), 'mean': np.empty(0)}
+    start = data.dates.min()
+    days = (data.dates - start).astype(np.int64)
+    total_days = int(days.max()) + 1
+    daily_count = np.bincount(days, minlength=total_days)
+    daily_sum = np.bincount(days, weights=data.values(column), minlength=total_days)
+
+    def window(daily):
+        cumulative = np.concatenate(([0], np.cumsum(daily)))
+        lagged = cumulative[np.maximum(np.arange(1, total_days + 1) - window_days, 0)]
+        return cumulative[1:] - lagged
+
+    counts = window(daily_count)
+    sums = window(daily_sum)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return {'date': start + np.arange(total_days), 'count': counts, 'mean': means}
+
+
+def flag_stats(data, flag=True):
+    # Статистика по строкам с BooleanFlag == flag
+    mask = data.flags == flag
+    result = {'flag': flag, 'count': int(mask.sum()), 'share': float(mask.mean()) if len(data) else 0.0}
+    for column in VALUE_COLUMNS:
+        values = data.values(column)[mask]
+        result[f'{column}_mean'] = float(values.mean()) if len(values) else float('nan')
+        result[f'{column}_std'] = float(values.std()) if len(values) else float('nan')
+        result[f'{column}_median'] = float(np.median(values)) if len(values) else float('nan')
+    return result
+
+
+def format_groups(groups):
+    lines = [f"{'Категория':<10} {'строк':>8} {'Value1 ср.':>11} {'мин':>8} {'макс':>8} "
+             f"{'Value2 ср.':>11} {'доля флага':>11}"]
+    for i, name in enumerate(groups['category']):
+        lines.append(f"{name:<10} {groups['count'][i]:>8} {groups['Value1_mean'][i]:>11.2f} "
+                     f"{groups['Value1_min'][i]:>8.0f} {groups['Value1_max'][i]:>8.0f} "
+                     f"{groups['Value2_mean'][i]:>11.2f} {groups['flag_share'][i]:>11.1%}")
+    return lines
+
+
+def format_report(data, window_days=7, last_days=10):
+    lines = [f"Строк: {len(data)}, категорий: {len(data.categories)}, "
+             f"период: {data.dates.min() if len(data) else '-'} - {data.dates.max() if len(data) else '-'}", ""]
+    lines.extend(format_groups(group_by_category(data)))
+    lines.append("")
+    for flag in (True, False):
+        stats = flag_stats(data, flag)
+        lines.append(f"BooleanFlag={flag}: строк {stats['count']} ({stats['share']:.1%}), "
+                     f"Value1 ср. {stats['Value1_mean']:.2f} (σ {stats['Value1_std']:.2f}), "
+                     f"Value2 ср. {stats['Value2_mean']:.2f} (σ {stats['Value2_std']:.2f})")
+    lines.append("")
+    rolling = rolling_by_date(data, window_days)
+    lines.append(f"Value1, скользящее среднее за {window_days} дн. (последние {last_days} дн.):")
+    for date, count, mean in list(zip(rolling['date'], rolling['count'], rolling['mean']))[-last_days:]:
+        lines.append(f"  {date}  строк {int(count):>6}  среднее {mean:>8.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Аналитика по sample_data.csv")
+    parser.add_argument('path', nargs='?', default='sample_data.csv')
+    parser.add_argument('--window', type=int, default=7, help="окно скользящего среднего, дней")
+    parser.add_argument('--no-cache', action='store_true', help="не использовать двоичный кэш столбцов")
+    args = parser.parse_args()
+    try:
+        data = load_sample_data(args.path) if args.no_cache else load_sample_data_cached(args.path)
+    except (OSError, ValueError) as e:
+        print(f"[Analytics] Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(format_report(data, args.window))
+
+
+if __name__ == "__main__":
+    main()
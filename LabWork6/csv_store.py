@@ -0,0 +1,297 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.bulk_load import open_bulk_connection, executemany_batched
+from csv_stream import CHUNK_BYTES, iter_parsed
+
+# Импорт CSV формата sample_data.csv в SQLite (рядом с таблицей posts) и сводные таблицы:
+# по дням, неделям и категориям. Сводки обновляются в той же транзакции, что и строки,
+# поэтому запросы дашборда читают готовые суммы, а не сканируют samples.
+#   python csv_store.py sample_data.csv --db posts.db
+
+SAMPLES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS samples (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        category TEXT NOT NULL,
+        value1 REAL NOT NULL,
+        value2 REAL NOT NULL,
+        flag INTEGER NOT NULL,
+        source INTEGER NOT NULL  -- sample_imports.id
+    );
+    CREATE INDEX IF NOT EXISTS idx_samples_source ON samples (source);
+    -- Сколько байт каждого файла уже импортировано и отпечаток этой части
+    -- (размер и mtime файла, SHA-1 импортированных байт): повторный импорт того же
+    -- файла ничего не меняет, дописанный догружается с места остановки,
+    -- переписанный - импортируется заново
+    CREATE TABLE IF NOT EXISTS sample_imports (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        position INTEGER NOT NULL,
+        rows INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest TEXT NOT NULL
+    );
+'''
+
+# Сводная таблица -> ключевые столбцы
+ROLLUPS = {
+    'rollup_daily': ('date', 'category'),
+    'rollup_weekly': ('week', 'category'),
+    'rollup_category': ('category',),
+}
+AGGREGATES = ('count', 'flags', 'value1_sum', 'value1_min', 'value1_max',
+              'value2_sum', 'value2_min', 'value2_max')
+
+
+def rollup_schema(table, keys):
+    columns = ', '.join(f'{key} TEXT NOT NULL' for key in keys)
+    return f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            {columns},
+            count INTEGER NOT NULL, flags INTEGER NOT NULL,
+            value1_sum REAL NOT NULL, value1_min REAL NOT NULL, value1_max REAL NOT NULL,
+            value2_sum REAL NOT NULL, value2_min REAL NOT NULL, value2_max REAL NOT NULL,
+            PRIMARY KEY ({', '.join(keys)})
+        ) WITHOUT ROWID;
+    '''
+
+
+def rollup_upsert_sql(table, keys):
+    # Слияние пачки со сводкой: суммы складываются, минимумы/максимумы сравниваются
+    columns = keys + AGGREGATES
+
+    def merge(column):
+        if column.endswith('_min'):
+            return f'{column} = min({column}, excluded.{column})'
+        if column.endswith('_max'):
+            return f'{column} = max({column}, excluded.{column})'
+        return f'{column} = {column} + excluded.{column}'
+
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {', '.join(merge(c) for c in AGGREGATES)}")
+
+
+# Ключи сводных таблиц в SQL - для пересборки сводок из samples
+ROLLUP_KEY_SQL = {
+    'date': 'date',
+    'week': "date(date, 'weekday 0', '-6 days')",  # понедельник, как week_start
+    'category': 'category',
+}
+HASH_BLOCK = 1024 * 1024
+
+
+def ensure_samples_schema(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(sample_imports)')]
+    if columns and 'digest' not in columns:
+        # Таблицы прежнего формата без отпечатков файлов: проверить импортированное
+        # нельзя, а samples и сводки - производные от CSV данные, их импорт повторится
+        with conn:
+            for table in ('samples', 'sample_imports', *ROLLUPS):
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+    conn.executescript(SAMPLES_SCHEMA + ''.join(rollup_schema(t, k) for t, k in ROLLUPS.items()))
+
+
+def rebuild_rollups(conn):
+    # Сводки заново из samples (после удаления строк переписанного файла)
+    for table, keys in ROLLUPS.items():
+        key_sql = ', '.join(ROLLUP_KEY_SQL[key] for key in keys)
+        conn.execute(f'DELETE FROM {table}')
+        conn.execute(f'''
+            INSERT INTO {table} ({', '.join(keys + AGGREGATES)})
+            SELECT {key_sql}, count(*), sum(flag), sum(value1), min(value1), max(value1),
+                   sum(value2), min(value2), max(value2)
+            FROM samples GROUP BY {key_sql}
+        ''')
+
+
+def hash_range(hasher, f, start, end):
+    # Байты [start, end) файла - в хэш
+    f.seek(start)
+    while start < end:
+        block = f.read(min(HASH_BLOCK, end - start))
+        if not block:
+            break
+        hasher.update(block)
+        start += len(block)
+    return hasher
+
+
+def week_start(dates):
+    # Понедельник недели; 1970-01-01 - четверг
+    days = dates.astype(np.int64)
+    return (days - (days + 3) % 7).astype('M8[D]')
+
+
+def batch_rollup(key_columns, batch):
+    # Агрегаты пачки по ключу (кортеж столбцов) - строки для rollup_upsert_sql
+    keys = np.rec.fromarrays(key_columns) if len(key_columns) > 1 else key_columns[0]
+    groups, inverse = np.unique(keys, return_inverse=True)
+    count = np.bincount(inverse)
+    aggregates = [count, np.bincount(inverse, weights=batch.flags).astype(np.int64)]
+    for values in (batch.value1, batch.value2):
+        mins = np.full(len(groups), np.inf)
+        maxs = np.full(len(groups), -np.inf)
+        np.minimum.at(mins, inverse, values)
+        np.maximum.at(maxs, inverse, values)
+        aggregates += [np.bincount(inverse, weights=values), mins, maxs]
+    key_lists = [groups[name].astype(str).tolist() for name in groups.dtype.names] \
+        if len(key_columns) > 1 else [groups.astype(str).tolist()]
+    return zip(*key_lists, *(a.tolist() for a in aggregates))
+
+
+def store_batch(conn, batch, source):
+    categories = batch.categories[batch.codes]
+    dates = batch.dates.astype(str)
+    executemany_batched(
+        conn, 'INSERT INTO samples (date, category, value1, value2, flag, source) VALUES (?, ?, ?, ?, ?, ?)',
+        zip(dates.tolist(), categories.tolist(), batch.value1.tolist(), batch.value2.tolist(),
+            batch.flags.tolist(), [source] * len(batch))
+    )
+    key_columns = {
+        'rollup_daily': (batch.dates, categories),
+        'rollup_weekly': (week_start(batch.dates), categories),
+        'rollup_category': (categories,),
+    }
+    for table, keys in ROLLUPS.items():
+        conn.executemany(rollup_upsert_sql(table, keys), batch_rollup(key_columns[table], batch))
+
+
+def import_csv(conn, path, workers=1, chunk_bytes=CHUNK_BYTES, on_progress=None):
+    # Импорт новых строк файла: каждая пачка - отдельная короткая транзакция
+    # (строки + сводки + позиция в файле и отпечаток), прерванный импорт продолжается
+    # с места остановки. Если уже импортированное начало файла изменилось, строки
+    # этого файла удаляются, сводки пересобираются и файл импортируется с начала
+    ensure_samples_schema(conn)
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    row = conn.execute(
+        'SELECT id, position, rows, size, mtime_ns, digest FROM sample_imports WHERE path = ?', (path,)
+    ).fetchone()
+    if row is None:
+        with conn:
+            source = conn.execute(
+                "INSERT INTO sample_imports (path, position, rows, size, mtime_ns, digest) "
+                "VALUES (?, 0, 0, 0, 0, '')", (path,)
+            ).lastrowid
+        offset = total = 0
+        digest = ''
+    else:
+        source, offset, total, size, mtime_ns, digest = row
+        if offset == size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+            return {'imported': 0, 'rows': total, 'reset': False}  # файл не менялся: без чтения
+    with open(path, 'rb') as f:
+        hasher = hash_range(hashlib.sha1(), f, 0, offset) if offset <= stat.st_size else None
+        reset = hasher is None or hasher.hexdigest() != digest if offset else False
+        if reset:
+            with conn:
+                conn.execute('DELETE FROM samples WHERE source = ?', (source,))
+                rebuild_rollups(conn)
+                conn.execute("UPDATE sample_imports SET position = 0, rows = 0, digest = '' WHERE id = ?",
+                             (source,))
+            offset = total = 0
+            hasher = hashlib.sha1()
+        imported = 0
+        position = offset
+        for end, batch in iter_parsed(path, workers, chunk_bytes, offset):
+            hash_range(hasher, f, position, end)
+            position = end
+            with conn:
+                store_batch(conn, batch, source)
+                imported += len(batch)
+                conn.execute(
+                    'UPDATE sample_imports SET position = ?, rows = ?, size = ?, mtime_ns = ?, digest = ? '
+                    'WHERE id = ?',
+                    (end, total + imported, stat.st_size, stat.st_mtime_ns, hasher.hexdigest(), source)
+                )
+            if on_progress:
+                on_progress(total + imported)
+    if not imported:
+        # Содержимое то же (например, файл только «тронули»): запомнить новый mtime,
+        # чтобы следующий импорт снова обошёлся без чтения
+        with conn:
+            conn.execute('UPDATE sample_imports SET size = ?, mtime_ns = ? WHERE id = ?',
+                         (stat.st_size, stat.st_mtime_ns, source))
+    return {'imported': imported, 'rows': total + imported, 'reset': reset}
+
+
+def _where_category(category):
+    return ('WHERE category = ?', (category,)) if category is not None else ('', ())
+
+
+def category_summary(conn, rollup=True):
+    # Категория, строк, Value1 ср./мин/макс, Value2 ср., доля флага
+    if rollup:
+        sql = '''SELECT category, count, value1_sum / count, value1_min, value1_max,
+                        value2_sum / count, 1.0 * flags / count
+                 FROM rollup_category ORDER BY category'''
+    else:
+        sql = '''SELECT category, count(*), avg(value1), min(value1), max(value1), avg(value2), avg(flag)
+                 FROM samples GROUP BY category ORDER BY category'''
+    return conn.execute(sql).fetchall()
+
+
+def daily_series(conn, category=None, rollup=True):
+    # Дата, строк, Value1 ср. - по всем категориям или по одной
+    where, params = _where_category(category)
+    if rollup:
+        sql = f'''SELECT date, sum(count), sum(value1_sum) / sum(count) FROM rollup_daily {where}
+                  GROUP BY date ORDER BY date'''
+    else:
+        sql = f'SELECT date, count(*), avg(value1) FROM samples {where} GROUP BY date ORDER BY date'
+    return conn.execute(sql, params).fetchall()
+
+
+def weekly_series(conn, category=None, rollup=True):
+    # Понедельник недели, строк, Value1 ср., Value2 мин/макс
+    where, params = _where_category(category)
+    if rollup:
+        sql = f'''SELECT week, sum(count), sum(value1_sum) / sum(count), min(value2_min), max(value2_max)
+                  FROM rollup_weekly {where} GROUP BY week ORDER BY week'''
+    else:
+        sql = f'''SELECT date(date, 'weekday 0', '-6 days') AS week, count(*), avg(value1),
+                         min(value2), max(value2)
+                  FROM samples {where} GROUP BY week ORDER BY week'''
+    return conn.execute(sql, params).fetchall()
+
+
+def format_summary(rows):
+    lines = [f"{'Категория':<10} {'строк':>8} {'Value1 ср.':>11} {'мин':>8} {'макс':>8} "
+             f"{'Value2 ср.':>11} {'доля флага':>11}"]
+    for category, count, mean1, min1, max1, mean2, share in rows:
+        lines.append(f"{category:<10} {count:>8} {mean1:>11.2f} {min1:>8.0f} {max1:>8.0f} "
+                     f"{mean2:>11.2f} {share:>11.1%}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт CSV формата sample_data.csv в SQLite со сводными таблицами")
+    parser.add_argument('path')
+    parser.add_argument('--db', default='posts.db')
+    parser.add_argument('--workers', type=int, default=1, help="процессов разбора CSV")
+    args = parser.parse_args()
+    conn = open_bulk_connection(args.db)
+    try:
+        start = time.perf_counter()
+        result = import_csv(conn, args.path, args.workers)
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError) as e:
+        print(f"[Import] Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    if result['reset']:
+        print("[Import] Файл изменился с прошлого импорта: его строки загружены заново")
+    print(f"[Import] Добавлено строк: {result['imported']} за {elapsed:.2f} с, всего в БД: {result['rows']}")
+    print('\n'.join(format_summary(category_summary(conn))))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import os
+import sys
+import mmap
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from analytics import CSV_DTYPE, VALUE_COLUMNS, SampleData, encode_categories, format_groups
+
+# Потоковое чтение больших CSV формата sample_data.csv: файл отображается в память (mmap)
+# и режется на куски по границам строк; куски разбираются в пуле процессов и выдаются
+# по порядку пачками столбцов (SampleData). В памяти одновременно не больше
+# 2 * workers кусков, поэтому расход памяти не зависит от размера файла.
+#   python csv_stream.py big.csv --workers 4
+
+CHUNK_BYTES = 4 * 2 ** 20
+
+# Отображение файла в процессе-обработчике: открывается один раз на процесс
+_source = None
+
+
+def open_mapped(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Пустой файл: {path}")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _open_source(path):
+    global _source
+    _source = open_mapped(path)
+
+
+def chunk_ranges(mapped, chunk_bytes=CHUNK_BYTES, offset=0):
+    # Границы кусков (start, end): каждый кусок кончается переводом строки.
+    # Заголовок пропускается и проверяется; offset - начало строки, с которой продолжить
+    header_end = mapped.find(b'\n')
+    size = len(mapped)
+    header = mapped[:size if header_end == -1 else header_end].decode('utf-8').strip().split(',')
+    if header != list(CSV_DTYPE.names):
+        raise ValueError(f"Неожиданные колонки: {', '.join(header)}")
+    start = max(size if header_end == -1 else header_end + 1, offset)
+    while start < size:
+        end = mapped.find(b'\n', min(start + chunk_bytes, size) - 1)
+        end = size if end == -1 else end + 1
+        yield start, end
+        start = end
+
+
+def parse_range(start, end, mapped=None):
+    # Разбор одного куска в столбцы; категории кодируются по локальному словарю куска
+    mapped = _source if mapped is None else mapped
+    lines = mapped[start:end].decode('utf-8').splitlines()
+    # Прочитанные страницы отображения больше не нужны: без этого они остаются
+    # в RSS процесса и память растёт вместе с размером файла.
+    # На Windows madvise нет: там страницы вытесняет сама система
+    if hasattr(mmap, 'MADV_DONTNEED'):
+        page_start = start - start % mmap.PAGESIZE
+        mapped.madvise(mmap.MADV_DONTNEED, page_start, end - page_start)
+    chunk = np.loadtxt(lines, delimiter=',', dtype=CSV_DTYPE, ndmin=1)
+    index = {}
+    codes = encode_categories(chunk['Category'], index)
+    return SampleData(
+        np.ascontiguousarray(chunk['Date']), codes, np.array(sorted(index, key=index.get)),
+        np.ascontiguousarray(chunk['Value1']), np.ascontiguousarray(chunk['Value2']),
+        chunk['BooleanFlag'] == 'True',
+    )
+
+
+def iter_batches(path, workers=None, chunk_bytes=CHUNK_BYTES):
+    # Пачки столбцов в порядке следования в файле. Коды категорий переводятся
+    # в общий словарь: batch.categories - все категории, встреченные к этой пачке
+    for _, batch in iter_parsed(path, workers, chunk_bytes):
+        yield batch
+
+
+def iter_parsed(path, workers=None, chunk_bytes=CHUNK_BYTES, offset=0):
+    # То же, что iter_batches, но с концом куска в байтах: (end, batch).
+    # Чтение можно продолжить с end через offset (дозагрузка дописанного файла)
+    workers = workers or os.cpu_count() or 1
+    mapped = open_mapped(path)
+    index = {}
+    try:
+        ranges = chunk_ranges(mapped, chunk_bytes, offset)
+        if workers == 1:
+            for start, end in ranges:
+                yield end, _to_global(parse_range(start, end, mapped), index)
+            return
+        with ProcessPoolExecutor(workers, initializer=_open_source, initargs=(path,)) as pool:
+            pending = deque()
+            try:
+                for start, end in ranges:
+                    pending.append((end, pool.submit(parse_range, start, end)))
+                    if len(pending) >= 2 * workers:
+                        end, future = pending.popleft()
+                        yield end, _to_global(future.result(), index)
+                while pending:
+                    end, future = pending.popleft()
+                    yield end, _to_global(future.result(), index)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+    finally:
+        mapped.close()
+
+
+def _to_global(batch, index):
+    mapping = np.array([index.setdefault(str(name), len(index)) for name in batch.categories], dtype=np.int32)
+    batch.codes = mapping[batch.codes] if len(mapping) else batch.codes
+    batch.categories = np.array(sorted(index, key=index.get))
+    return batch
+
+
+class CategoryTotals:
+    # Агрегаты по категориям, накапливаемые по пачкам; result() - в формате group_by_category
+
+    def __init__(self):
+        self.rows = 0
+        self.categories = np.empty(0, dtype=str)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.flags = np.zeros(0, dtype=np.int64)
+        self.sums = {column: np.zeros(0) for column in VALUE_COLUMNS}
+        self.mins = {column: np.zeros(0) for column in VALUE_COLUMNS}
+        self.maxs = {column: np.zeros(0) for column in VALUE_COLUMNS}
+
+    def _grow(self, groups):
+        extra = groups - len(self.counts)
+        if extra <= 0:
+            return
+        self.counts = np.concatenate((self.counts, np.zeros(extra, dtype=np.int64)))
+        self.flags = np.concatenate((self.flags, np.zeros(extra, dtype=np.int64)))
+        for column in VALUE_COLUMNS:
+            self.sums[column] = np.concatenate((self.sums[column], np.zeros(extra)))
+            self.mins[column] = np.concatenate((self.mins[column], np.full(extra, np.inf)))
+            self.maxs[column] = np.concatenate((self.maxs[column], np.full(extra, -np.inf)))
+
+    def add(self, batch):
+        groups = len(batch.categories)
+        self._grow(groups)
+        self.categories = batch.categories
+        self.rows += len(batch)
+        self.counts += np.bincount(batch.codes, minlength=groups)
+        self.flags += np.bincount(batch.codes[batch.flags], minlength=groups)
+        for column in VALUE_COLUMNS:
+            values = batch.values(column)
+            self.sums[column] += np.bincount(batch.codes, weights=values, minlength=groups)
+            np.minimum.at(self.mins[column], batch.codes, values)
+            np.maximum.at(self.maxs[column], batch.codes, values)
+
+    def result(self):
+        safe = np.maximum(self.counts, 1)
+        result = {'category': self.categories, 'count': self.counts, 'flag_share': self.flags / safe}
+        for column in VALUE_COLUMNS:
+            result[f'{column}_sum'] = self.sums[column]
+            result[f'{column}_mean'] = self.sums[column] / safe
+            result[f'{column}_min'] = self.mins[column]
+            result[f'{column}_max'] = self.maxs[column]
+        return result
+
+
+def stream_totals(path, workers=None, chunk_bytes=CHUNK_BYTES):
+    totals = CategoryTotals()
+    for batch in iter_batches(path, workers, chunk_bytes):
+        totals.add(batch)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковые агрегаты по большому CSV формата sample_data.csv")
+    parser.add_argument('path')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="процессов разбора")
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_BYTES / 2 ** 20, help="размер куска, МБ")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        totals = stream_totals(args.path, args.workers, int(args.chunk_mb * 2 ** 20))
+    except (OSError, ValueError) as e:
+        print(f"[CSV] Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print('\n'.join(format_groups(totals.result())))
+    size = os.path.getsize(args.path) / 2 ** 20
+    print(f"\nСтрок: {totals.rows}, {size:.1f} МБ за {elapsed:.2f} с ({size / elapsed:.1f} МБ/с, "
+          f"процессов: {args.workers})")
+
+
+if __name__ == "__main__":
+    main()
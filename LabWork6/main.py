@@ -1,130 +1,100 @@
+import os
 import sys
-import time
-import json
-import sqlite3
-import requests
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QTextEdit, QProgressBar, QLabel
-from PyQt5.QtCore import QThread, pyqtSignal, QTimer
-
-class FetchWorker(QThread):
-    data_fetched = pyqtSignal(list)  
-    error_occurred = pyqtSignal(str)  
-
-    def run(self):
-        try:
-            time.sleep(2)  # Задержка
-            response = requests.get('https://jsonplaceholder.typicode.com/posts')
-            response.raise_for_status()
-            data = response.json()
-            self.data_fetched.emit(data)
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-
-class SaveWorker(QThread):
-    data_saved = pyqtSignal()  
-    error_occurred = pyqtSignal(str)  
-
-    def __init__(self, data, db_name='posts.db'):
-        super().__init__()
-        self.data = data
-        self.db_name = db_name
-
-    def run(self):
-        try:
-            time.sleep(2)  # Задержка
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS posts (
-                    id INTEGER PRIMARY KEY,
-                    userId INTEGER,
-                    title TEXT,
-                    body TEXT
-                )
-            ''')
-            for post in self.data:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO posts (id, userId, title, body)
-                    VALUES (?, ?, ?, ?)
-                ''', (post['id'], post['userId'], post['title'], post['body']))
-            conn.commit()
-            conn.close()
-            self.data_saved.emit()
-        except Exception as e:
-            self.error_occurred.emit(str(e))
-
-class MainWindow(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle('Data Loader')
-        self.layout = QVBoxLayout()
-
-        self.load_button = QPushButton('Загрузить данные')
-        self.load_button.clicked.connect(self.start_fetch)
-        self.layout.addWidget(self.load_button)
-
-        self.status_label = QLabel('Статус: Готов')
-        self.layout.addWidget(self.status_label)
-
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 0)  
-        self.progress_bar.hide()
-        self.layout.addWidget(self.progress_bar)
-
-        self.text_edit = QTextEdit()
-        self.layout.addWidget(self.text_edit)
-
-        self.setLayout(self.layout)
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.start_fetch)
-        self.timer.start(10000)  
-
-        self.db_name = 'posts.db'
-
-    def start_fetch(self):
-        self.status_label.setText('Статус: Загрузка данных...')
-        self.progress_bar.show()
-        self.load_button.setEnabled(False)
-        self.fetch_worker = FetchWorker()
-        self.fetch_worker.data_fetched.connect(self.on_data_fetched)
-        self.fetch_worker.error_occurred.connect(self.on_error)
-        self.fetch_worker.start()
-
-    def on_data_fetched(self, data):
-        self.status_label.setText('Статус: Сохранение данных...')
-        self.save_worker = SaveWorker(data, self.db_name)
-        self.save_worker.data_saved.connect(self.on_data_saved)
-        self.save_worker.error_occurred.connect(self.on_error)
-        self.save_worker.start()
-
-    def on_data_saved(self):
-        self.status_label.setText('Статус: Данные сохранены')
-        self.progress_bar.hide()
-        self.load_button.setEnabled(True)
-        self.update_display()
-
-    def on_error(self, error_msg):
-        self.status_label.setText(f'Статус: Ошибка - {error_msg}')
-        self.progress_bar.hide()
-        self.load_button.setEnabled(True)
-
-    def update_display(self):
-        try:
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM posts LIMIT 10')  
-            rows = cursor.fetchall()
-            conn.close()
-            display_text = ''
-            for row in rows:
-                display_text += f'ID: {row[0]}, UserID: {row[1]}, Title: {row[2]}, Body: {row[3]}\n\n'
-            self.text_edit.setText(display_text)
-        except Exception as e:
-            self.status_label.setText(f'Статус: Ошибка при отображении - {str(e)}')
+import threading
+from PyQt5.QtWidgets import QPushButton, QTextEdit
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QFontDatabase
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.loader_window import LoaderWindow, run_window
+
+SAMPLE_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data.csv')
+
+class AnalyticsSignals(QObject):
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+class MainWindow(LoaderWindow):
+    # Окно загрузчика постов (common/loader_window.py) плюс аналитика и импорт sample_data.csv
+
+    def init_extra_widgets(self):
+        # Слоты - через lambda: clicked(bool) иначе передал бы флаг вместо path
+        self.analytics_button = QPushButton('Аналитика sample_data.csv')
+        self.analytics_button.clicked.connect(lambda: self.run_analytics())
+        self.layout.addWidget(self.analytics_button)
+
+        self.import_button = QPushButton('Импорт sample_data.csv в SQLite')
+        self.import_button.clicked.connect(lambda: self.run_import())
+        self.layout.addWidget(self.import_button)
+
+        self.analytics_view = QTextEdit()
+        self.analytics_view.setReadOnly(True)
+        self.analytics_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.analytics_view.hide()
+        self.layout.addWidget(self.analytics_view)
+
+        self.analytics_signals = AnalyticsSignals()
+        self.analytics_signals.finished.connect(self.on_analytics_finished)
+        self.analytics_signals.failed.connect(self.on_analytics_failed)
+
+    def run_analytics(self, path=SAMPLE_DATA):
+        # Чтение CSV и расчёты - в отдельном потоке, окно не блокируется.
+        # NumPy (~80 мс импорта) загружается при первом использовании, а не при запуске
+        self.status_bar.showMessage(f"Аналитика: чтение {os.path.basename(path)}...")
+
+        def work():
+            from analytics import load_sample_data_cached, format_report
+            return format_report(load_sample_data_cached(path))
+
+        self.run_in_background(work)
+
+    def run_import(self, path=SAMPLE_DATA):
+        # Импорт новых строк в ту же БД, что и посты; сводка читается из rollup-таблиц
+        self.status_bar.showMessage(f"Импорт: {os.path.basename(path)} -> {self.db_name}...")
+
+        def work():
+            from common.bulk_load import open_bulk_connection
+            from csv_store import import_csv, category_summary, format_summary
+            conn = open_bulk_connection(self.db_name)
+            try:
+                result = import_csv(conn, path)
+                summary = format_summary(category_summary(conn))
+            finally:
+                conn.close()
+            header = [f"Импортировано строк: {result['imported']}, всего в БД: {result['rows']}", '']
+            if result['reset']:
+                header.insert(0, "Файл изменился с прошлого импорта: строки загружены заново")
+            return '\n'.join(header + summary)
+
+        self.run_in_background(work)
+
+    def run_in_background(self, work):
+        self.analytics_button.setEnabled(False)
+        self.import_button.setEnabled(False)
+
+        def target():
+            # Любая ошибка (в том числе NumPy на испорченных данных) должна вернуть кнопки
+            try:
+                report = work()
+            except Exception as e:
+                self.analytics_signals.failed.emit(f"{type(e).__name__}: {e}")
+            else:
+                self.analytics_signals.finished.emit(report)
+
+        threading.Thread(target=target, daemon=True).start()
+
+    def on_analytics_finished(self, report):
+        self.analytics_view.setPlainText(report)
+        self.analytics_view.show()
+        self.analytics_button.setEnabled(True)
+        self.import_button.setEnabled(True)
+        self.status_bar.showMessage("Аналитика: готово")
+
+    def on_analytics_failed(self, error_msg):
+        self.analytics_button.setEnabled(True)
+        self.import_button.setEnabled(True)
+        self.status_bar.showMessage(f"Аналитика: ошибка - {error_msg}")
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec_())
+    run_window(MainWindow)
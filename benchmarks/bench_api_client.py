@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import argparse
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.api_client import ApiClient, AsyncApiClient, fetch_many
+from common.stub_server import start_stub_server
+
+
+def bench_sequential(base_url, paths):
+    # Как сейчас: отдельный requests.get (новое соединение) на каждый запрос
+    for path in paths:
+        requests.get(f"{base_url}{path}").raise_for_status()
+
+
+def bench_pooled(base_url, paths):
+    with ApiClient(base_url) as client:
+        for path in paths:
+            client.get_json(path)
+
+
+def bench_async(base_url, paths, concurrency):
+    results = fetch_many(paths, base_url, concurrency)
+    assert len(results) == len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Последовательные запросы vs пул соединений vs async")
+    parser.add_argument('-n', '--posts', type=int, default=200, help="число запросов /posts/{id}")
+    parser.add_argument('--latency', type=float, default=0.005, help="задержка заглушки, с")
+    parser.add_argument('-c', '--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(posts=args.posts, latency=args.latency)
+    paths = [f"/posts/{i}" for i in range(1, args.posts + 1)] + ['/users', '/comments']
+    try:
+        print(f"[API Bench] {len(paths)} запросов, задержка сервера {args.latency * 1000:.0f} мс")
+        for name, run in (
+            ("последовательно", lambda: bench_sequential(base_url, paths)),
+            ("пул соединений", lambda: bench_pooled(base_url, paths)),
+            (f"async x{args.concurrency}", lambda: bench_async(base_url, paths, args.concurrency)),
+        ):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<20} {elapsed:>8.3f} с {len(paths) / elapsed:>10.0f} запросов/с")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
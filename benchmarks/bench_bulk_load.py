@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.bulk_load import open_bulk_connection, bulk_insert_posts
+from benchmarks.synthetic import synthetic_posts
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS posts (
+        id INTEGER PRIMARY KEY,
+        userId INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        body TEXT NOT NULL
+    )
+'''
+INDEX = 'CREATE INDEX IF NOT EXISTS idx_posts_userId ON posts (userId)'
+
+
+def load_per_row(db_path, count):
+    # Как раньше: соединение по умолчанию, execute на каждый пост
+    conn = sqlite3.connect(db_path)
+    conn.execute(SCHEMA)
+    conn.execute(INDEX)
+    cursor = conn.cursor()
+    for post in synthetic_posts(count):
+        cursor.execute('''
+            INSERT OR REPLACE INTO posts (id, userId, title, body)
+            VALUES (?, ?, ?, ?)
+        ''', (post['id'], post['userId'], post['title'], post['body']))
+    conn.commit()
+    conn.close()
+
+
+def load_bulk(db_path, count, batch_size):
+    conn = open_bulk_connection(db_path)
+    conn.execute(SCHEMA)
+    conn.execute(INDEX)
+    bulk_insert_posts(conn, synthetic_posts(count), batch_size, defer_indexes=True)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка постов: execute на строку vs executemany + WAL")
+    parser.add_argument('--sizes', default='100000,1000000', help="числа постов через запятую")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'постов':>10} {'способ':<12} {'время, с':>10} {'строк/с':>12}")
+        for count in (int(s) for s in args.sizes.split(',')):
+            for name, load in (
+                ("по строке", lambda path: load_per_row(path, count)),
+                ("пачками", lambda path: load_bulk(path, count, args.batch_size)),
+            ):
+                path = os.path.join(tmp, f"{name}_{count}.db")
+                start = time.perf_counter()
+                load(path)
+                elapsed = time.perf_counter() - start
+                print(f"{count:>10} {name:<12} {elapsed:>10.2f} {count / elapsed:>12.0f}")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork6'))
+
+from benchmarks.synthetic import synthetic_posts, write_sample_csv
+
+# Каждая загрузка - в новом процессе (как при запуске программы); файлы уже
+# в страничном кэше ОС, так что сравнивается разбор, а не чтение с диска.
+# Время - от начала загрузки до готовых данных, без импорта модулей.
+
+LOADS = {
+    'posts: json.load': '''
+with open(PATH, 'rb') as f:
+    posts = json.load(f)
+checksum = sum(post['id'] for post in posts)
+''',
+    'posts: кэш, ids': '''
+posts = load_posts_json(PATH)
+checksum = int(posts.ids.sum())
+''',
+    'posts: кэш, все строки': '''
+posts = load_posts_json(PATH)
+checksum = sum(post['id'] for post in posts if post['title'])
+''',
+    'csv: разбор': '''
+data = load_sample_data(PATH)
+checksum = int(group_by_category(data)['count'].sum())
+''',
+    'csv: кэш': '''
+data = load_sample_data_cached(PATH)
+checksum = int(group_by_category(data)['count'].sum())
+''',
+}
+
+CHILD = '''
+import sys, json, time
+sys.path[:0] = {paths!r}
+from common.post_columns import load_posts_json
+from analytics import load_sample_data, load_sample_data_cached, group_by_category
+PATH = {path!r}
+start = time.perf_counter()
+{code}
+print(json.dumps({{'seconds': time.perf_counter() - start, 'checksum': checksum}}))
+'''
+
+
+def run_load(name, path):
+    code = CHILD.format(paths=[ROOT, os.path.join(ROOT, 'LabWork6')], path=path, code=LOADS[name])
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def report(size_label, names, path):
+    results = {name: run_load(name, path) for name in names}
+    assert len({r['checksum'] for r in results.values()}) == 1, "Результаты загрузок не совпадают"
+    base = results[names[0]]['seconds']
+    for name, result in results.items():
+        print(f"{size_label:>10} {name:<24} {result['seconds'] * 1000:>10.1f} {base / result['seconds']:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Холодная загрузка: разбор JSON/CSV vs двоичный столбцовый кэш")
+    parser.add_argument('--posts', default='100000,500000')
+    parser.add_argument('--rows', default='1000000,5000000')
+    args = parser.parse_args()
+
+    print(f"{'размер':>10} {'загрузка':<24} {'время, мс':>10} {'ускорение':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.posts.split(',')):
+            path = os.path.join(tmp, f"posts_{count}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(list(synthetic_posts(count)), f)
+            run_load('posts: кэш, ids', path)  # первый запуск строит кэш
+            report(count, ['posts: json.load', 'posts: кэш, ids', 'posts: кэш, все строки'], path)
+            print(f"{'':>10} JSON {os.path.getsize(path) / 2 ** 20:.1f} МБ, "
+                  f"кэш {os.path.getsize(path + '.columns') / 2 ** 20:.1f} МБ")
+        for count in (int(s) for s in args.rows.split(',')):
+            path = os.path.join(tmp, f"sample_{count}.csv")
+            write_sample_csv(path, count)
+            run_load('csv: кэш', path)
+            report(count, ['csv: разбор', 'csv: кэш'], path)
+            print(f"{'':>10} CSV {os.path.getsize(path) / 2 ** 20:.1f} МБ, "
+                  f"кэш {os.path.getsize(path + '.columns') / 2 ** 20:.1f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import sys
+import csv
+import math
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+from datetime import date, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork6'))
+
+from analytics import load_sample_data, group_by_category, rolling_by_date, flag_stats
+from benchmarks.synthetic import write_sample_csv
+
+
+def python_analytics(path, window_days=7):
+    # Те же расчёты обычным циклом по csv.reader: эталон для сравнения
+    groups = defaultdict(lambda: {'count': 0, 'flags': 0, 'sum1': 0.0, 'sum2': 0.0,
+                                  'min1': math.inf, 'max1': -math.inf})
+    flagged = {True: [0, 0.0], False: [0, 0.0]}
+    daily = defaultdict(lambda: [0, 0.0])
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for day, category, value1, value2, flag in reader:
+            value1 = float(value1)
+            value2 = float(value2)
+            flag = flag == 'True'
+            group = groups[category]
+            group['count'] += 1
+            group['flags'] += flag
+            group['sum1'] += value1
+            group['sum2'] += value2
+            group['min1'] = min(group['min1'], value1)
+            group['max1'] = max(group['max1'], value1)
+            flagged[flag][0] += 1
+            flagged[flag][1] += value1
+            daily[day][0] += 1
+            daily[day][1] += value1
+
+    first = date.fromisoformat(min(daily))
+    last = date.fromisoformat(max(daily))
+    rolling = []
+    window_count, window_sum = 0, 0.0
+    days = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+    for i, day in enumerate(days):
+        count, total = daily.get(day, (0, 0.0))
+        window_count += count
+        window_sum += total
+        if i >= window_days:
+            old_count, old_total = daily.get(days[i - window_days], (0, 0.0))
+            window_count -= old_count
+            window_sum -= old_total
+        rolling.append(window_sum / window_count if window_count else math.nan)
+    return groups, flagged, rolling
+
+
+def numpy_analytics(path, window_days=7):
+    data = load_sample_data(path)
+    return data, group_by_category(data), flag_stats(data, True), rolling_by_date(data, window_days)
+
+
+def check(python_result, numpy_result):
+    groups, flagged, rolling = python_result
+    data, numpy_groups, numpy_flags, numpy_rolling = numpy_result
+    for i, name in enumerate(numpy_groups['category']):
+        assert groups[name]['count'] == numpy_groups['count'][i]
+        assert math.isclose(groups[name]['sum1'], numpy_groups['Value1_sum'][i], rel_tol=1e-9)
+        assert groups[name]['max1'] == numpy_groups['Value1_max'][i]
+    assert flagged[True][0] == numpy_flags['count']
+    assert len(rolling) == len(numpy_rolling['mean'])
+    assert math.isclose(rolling[-1], numpy_rolling['mean'][-1], rel_tol=1e-9)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Аналитика CSV: цикл по csv.reader vs столбцы NumPy")
+    parser.add_argument('--sizes', default='100000,1000000,10000000')
+    args = parser.parse_args()
+
+    print(f"{'строк':>10} {'csv, с':>10} {'NumPy, с':>10} {'загрузка':>10} {'расчёт':>10} "
+          f"{'ускорение':>10} {'столбцы, МБ':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            path = os.path.join(tmp, f"sample_{count}.csv")
+            write_sample_csv(path, count)
+
+            start = time.perf_counter()
+            python_result = python_analytics(path)
+            python_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            data = load_sample_data(path)
+            load_seconds = time.perf_counter() - start
+            group_by_category(data)
+            flag_stats(data, True)
+            rolling_by_date(data)
+            numpy_seconds = time.perf_counter() - start
+
+            check(python_result, numpy_analytics(path))
+            print(f"{count:>10} {python_seconds:>10.2f} {numpy_seconds:>10.2f} {load_seconds:>10.2f} "
+                  f"{numpy_seconds - load_seconds:>10.3f} {python_seconds / numpy_seconds:>9.1f}x "
+                  f"{data.nbytes() / 2 ** 20:>12.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import math
+import time
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork6'))
+
+from common.bulk_load import open_bulk_connection
+from benchmarks.synthetic import write_sample_csv
+from csv_store import import_csv, category_summary, daily_series, weekly_series
+
+QUERIES = {
+    'по категориям': lambda conn, rollup: category_summary(conn, rollup),
+    'по дням': lambda conn, rollup: daily_series(conn, None, rollup),
+    'по дням, C': lambda conn, rollup: daily_series(conn, 'C', rollup),
+    'по неделям': lambda conn, rollup: weekly_series(conn, None, rollup),
+}
+
+
+def timed(query, conn, rollup, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = query(conn, rollup)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), rows
+
+
+def same_rows(raw, rollup):
+    return len(raw) == len(rollup) and all(
+        a == b or (isinstance(a, float) and math.isclose(a, b, rel_tol=1e-9))
+        for raw_row, rollup_row in zip(raw, rollup) for a, b in zip(raw_row, rollup_row)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запросы дашборда: сканирование samples vs rollup-таблицы")
+    parser.add_argument('--sizes', default='1000000,3000000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            csv_path = os.path.join(tmp, f"sample_{count}.csv")
+            write_sample_csv(csv_path, count)
+            conn = open_bulk_connection(os.path.join(tmp, f"samples_{count}.db"))
+            start = time.perf_counter()
+            import_csv(conn, csv_path)
+            elapsed = time.perf_counter() - start
+            print(f"[SQLite] {count} строк: импорт {elapsed:.1f} с ({count / elapsed:,.0f} строк/с)")
+            print(f"{'запрос':<16} {'samples, мс':>12} {'rollup, мс':>12} {'ускорение':>10} {'строк':>7}")
+            for name, query in QUERIES.items():
+                raw_seconds, raw = timed(query, conn, False, args.repeat)
+                rollup_seconds, rollup = timed(query, conn, True, args.repeat)
+                assert same_rows(raw, rollup), f"Результаты не совпадают: {name}"
+                print(f"{name:<16} {raw_seconds * 1000:>12.1f} {rollup_seconds * 1000:>12.2f} "
+                      f"{raw_seconds / rollup_seconds:>9.0f}x {len(rollup):>7}")
+            print()
+            conn.close()
+            os.remove(csv_path)
+
+
+if __name__ == "__main__":
+    main()
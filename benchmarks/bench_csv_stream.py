@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork6'))
+
+from benchmarks.synthetic import write_sample_csv
+
+
+def child(path, workers):
+    from csv_stream import stream_totals
+    start = time.perf_counter()
+    totals = stream_totals(path, workers)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'rows': totals.rows, 'seconds': elapsed, 'total': float(totals.result()['Value1_sum'].sum())}))
+
+
+def measure(path, workers):
+    # Каждый прогон - в отдельном процессе; wait4 даёт пик памяти самого
+    # большого процесса в дереве (главного или обработчика пула)
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', path, str(workers)],
+                               stdout=subprocess.PIPE, text=True)
+    output = process.stdout.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"Прогон с {workers} процессами завершился с ошибкой")
+    return json.loads(output), usage.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковое чтение CSV: МБ/с и память при 1/2/4/8 процессах")
+    parser.add_argument('--sizes', default='2000000,8000000', help="строк в файлах")
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'WORKERS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"[CSV] Ядер: {os.cpu_count()}")
+    print(f"{'строк':>10} {'МБ':>8} {'процессов':>10} {'время, с':>10} {'МБ/с':>8} {'пик RSS, МБ':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            path = os.path.join(tmp, f"sample_{count}.csv")
+            write_sample_csv(path, count)
+            size = os.path.getsize(path) / 2 ** 20
+            totals = set()
+            for workers in (int(s) for s in args.workers.split(',')):
+                result, rss = measure(path, workers)
+                assert result['rows'] == count
+                totals.add(round(result['total'], 6))
+                print(f"{count:>10} {size:>8.1f} {workers:>10} {result['seconds']:>10.2f} "
+                      f"{size / result['seconds']:>8.1f} {rss:>12.1f}")
+            assert len(totals) == 1, "Результаты при разном числе процессов не совпадают"
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+LOADER = os.path.join(ROOT, 'LabWork5', 'loader.py')
+STUB_SERVER = os.path.join(ROOT, 'common', 'stub_server.py')
+
+
+def gui_child(base_url, db_path):
+    # Окно LabWork5 без дисплея: один цикл загрузки и выход
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    sys.path.insert(0, os.path.join(ROOT, 'LabWork5'))
+    from PyQt5.QtWidgets import QApplication
+    import main
+    app = QApplication([])
+    window = main.MainWindow({'base_url': base_url, 'db_path': db_path, 'cache_dir': '', 'interval': 3600})
+    window.signals.data_saved.connect(app.quit)
+    window.signals.error_occurred.connect(lambda message: app.exit(1))
+    window.request_fetch()
+    code = app.exec_()
+    window.close()
+    sys.exit(code)
+
+
+def measure(command):
+    # Время до выхода процесса и его пиковая память (wait4 - только этот процесс)
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"Процесс завершился с ошибкой: {' '.join(command)}")
+    return elapsed, usage.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запуск загрузчика: консольный режим vs окно PyQt5")
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--gui-child', nargs=2, metavar=('URL', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.gui_child:
+        gui_child(*args.gui_child)
+        return
+
+    stub = subprocess.Popen(
+        [sys.executable, '-u', STUB_SERVER, '--port', '0', '--posts', str(args.posts)],
+        stdout=subprocess.PIPE, text=True
+    )
+    base_url = stub.stdout.readline().split()[-1]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            modes = {
+                'python': lambda db: [sys.executable, '-c', 'pass'],
+                'loader.py': lambda db: [sys.executable, LOADER, '--once', '--base-url', base_url,
+                                         '--db', db, '--cache-dir', ''],
+                'GUI': lambda db: [sys.executable, os.path.abspath(__file__), '--gui-child', base_url, db],
+            }
+            print(f"[Startup] Один цикл загрузки {args.posts} постов, медиана из {args.repeat}")
+            print(f"{'режим':<12} {'время, с':>10} {'память, МБ':>12}")
+            for name, command in modes.items():
+                results = [measure(command(os.path.join(tmp, f"{name}_{i}.db"))) for i in range(args.repeat)]
+                elapsed = statistics.median(r[0] for r in results)
+                rss = statistics.median(r[1] for r in results)
+                print(f"{name:<12} {elapsed:>10.3f} {rss:>12.1f}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
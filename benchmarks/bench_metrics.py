@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import synthetic_posts
+from common import metrics
+from common.post_sync import sync_posts
+from common.posts_repository import PostsRepository
+
+# Цена точек замера: отдельный вызов (нс на операцию) и реальный путь -
+# запросы постов пользователя с метриками выключенными и включёнными.
+
+
+def per_call(action, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        action()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def timed_block():
+    with metrics.timer('bench_seconds'):
+        pass
+
+
+def calls_table(calls):
+    actions = {
+        'inc': lambda: metrics.inc('bench_total'),
+        'inc с метками': lambda: metrics.inc('bench_total', 1, {'result': 'ok'}),
+        'observe': lambda: metrics.observe('bench_value', 0.003),
+        'with timer': timed_block,
+    }
+    empty = per_call(lambda: None, calls)  # цена самого вызова лямбды
+    print(f"{'вызов':<16} {'выкл, нс':>9} {'вкл, нс':>9}")
+    for name, action in actions.items():
+        metrics.enable(False)
+        off = per_call(action, calls) - empty
+        metrics.enable(True)
+        on = per_call(action, calls) - empty
+        print(f"{name:<16} {off:>9.0f} {on:>9.0f}")
+    metrics.enable(False)
+    metrics.REGISTRY.reset()
+
+
+def query_path(posts, users, queries, rounds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'posts.db')
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE posts (id INTEGER PRIMARY KEY, userId INTEGER, title TEXT, body TEXT)')
+        sync_posts(conn, list(synthetic_posts(posts, users=users)))
+        conn.close()
+        user_ids = [random.Random(1).randint(1, users) for _ in range(queries)]
+
+        with PostsRepository(path) as repository:
+            def run():
+                start = time.perf_counter()
+                for user_id in user_ids:
+                    repository.get_posts_by_user(user_id)
+                return (time.perf_counter() - start) / queries * 1e6
+
+            run()  # прогрев страничного кэша и кэша выражений
+            best = {}
+            # Чередование режимов, лучший из rounds: шум одинаково влияет на оба
+            for _ in range(rounds):
+                for enabled in (False, True):
+                    metrics.enable(enabled)
+                    best[enabled] = min(best.get(enabled, float('inf')), run())
+            metrics.enable(False)
+
+    histogram = metrics.snapshot()['histograms']['query_seconds{query=posts_by_user}']
+    print(f"\nget_posts_by_user, {posts} постов, {queries} запросов, лучший из {rounds}:")
+    print(f"  метрики выкл: {best[False]:.1f} мкс/запрос")
+    print(f"  метрики вкл:  {best[True]:.1f} мкс/запрос ({(best[True] / best[False] - 1) * 100:+.1f}%)")
+    print(f"  гистограмма: p50 {histogram['p50'] * 1e6:.0f} мкс, p99 {histogram['p99'] * 1e6:.0f} мкс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Накладные расходы метрик: выключены vs включены")
+    parser.add_argument('--calls', type=int, default=1000000)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    calls_table(args.calls)
+    query_path(args.posts, args.users, args.queries, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
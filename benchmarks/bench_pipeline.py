@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.api_client import ApiClient
+from common.bulk_load import open_bulk_connection
+from common.post_pipeline import PostPipeline, POSTS_SCHEMA
+from common.post_sync import sync_posts
+
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common', 'stub_server.py')
+
+
+def start_stub_process(posts):
+    # Заглушка в отдельном процессе: дочерние процессы замера не наследуют
+    # пик памяти родителя, который держит все посты заглушки
+    process = subprocess.Popen(
+        [sys.executable, '-u', STUB_SERVER, '--port', '0', '--posts', str(posts)],
+        stdout=subprocess.PIPE, text=True
+    )
+    base_url = process.stdout.readline().split()[-1]
+    return process, base_url
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_whole(base_url, db_path):
+    # Как было: весь ответ разбирается в список, затем сохраняется целиком
+    with ApiClient(base_url) as client:
+        data = client.get_json('/posts')
+    conn = open_bulk_connection(db_path)
+    conn.execute(POSTS_SCHEMA)
+    conn.commit()
+    sync_posts(conn, data, delete_missing=False)
+    conn.close()
+
+
+def run_pipeline(base_url, db_path):
+    done = threading.Event()
+    errors = []
+
+    def on_event(kind, payload):
+        if kind == 'error':
+            errors.append(payload)
+        if kind in ('saved', 'error', 'not_modified'):
+            done.set()
+
+    with ApiClient(base_url) as client:
+        pipeline = PostPipeline(client, db_path, on_event=on_event)
+        pipeline.trigger()
+        done.wait()
+        pipeline.close()
+    if errors:
+        raise RuntimeError(errors[0])
+
+
+def child(mode, base_url, db_path):
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    (run_whole if mode == 'whole' else run_pipeline)(base_url, db_path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'rss_mb': peak_rss_mb() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Загрузка /posts: разбор целиком vs потоковый конвейер")
+    parser.add_argument('--sizes', default='10000,50000,200000', help="число постов в ответе")
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'URL', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'постов':>10} {'режим':<10} {'время, с':>10} {'память, МБ':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            server, base_url = start_stub_process(count)
+            try:
+                for mode in ('whole', 'pipeline'):
+                    db_path = os.path.join(tmp, f"{mode}_{count}.db")
+                    output = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '--child', mode, base_url, db_path],
+                        capture_output=True, text=True, check=True
+                    ).stdout
+                    result = json.loads(output.strip().splitlines()[-1])
+                    rows = sqlite3.connect(db_path).execute('SELECT count(*) FROM posts').fetchone()[0]
+                    assert rows == count
+                    print(f"{count:>10} {mode:<10} {result['seconds']:>10.3f} {result['rss_mb']:>12.1f}")
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
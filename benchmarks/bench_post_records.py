@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import synthetic_posts
+
+# Пиковая память и время пути "ответ API -> посты в памяти -> SQLite":
+# список словарей из json.load против PostBatch, собранного потоковым разбором.
+# Каждый режим - в отдельном процессе; память - прирост пика после импортов.
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_posts_json(path, count):
+    # Потоком: пик памяти родителя наследуется дочерним процессом в ru_maxrss
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, post in enumerate(synthetic_posts(count)):
+            f.write(',' if i else '')
+            f.write(json.dumps(post))
+        f.write(']')
+
+
+def load_dicts(path):
+    with open(path, 'rb') as f:
+        return json.load(f)
+
+
+def load_batch(path):
+    from common.json_stream import iter_json_array
+    from common.post_records import PostBatch
+
+    def chunks():
+        with open(path, 'rb') as f:
+            while chunk := f.read(64 * 1024):
+                yield chunk
+
+    return PostBatch.from_posts(iter_json_array(chunks()))
+
+
+def child(mode, json_path, db_path):
+    import sqlite3
+    from common.post_sync import sync_posts
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    posts = (load_dicts if mode == 'dicts' else load_batch)(json_path)
+    load_seconds = time.perf_counter() - start
+    load_rss = peak_rss_mb() - baseline
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE posts (id INTEGER PRIMARY KEY, userId INTEGER, title TEXT, body TEXT)')
+    start = time.perf_counter()
+    counts = sync_posts(conn, posts)
+    conn.close()
+    print(json.dumps({'load_seconds': load_seconds, 'load_rss_mb': load_rss,
+                      'sync_seconds': time.perf_counter() - start, 'rss_mb': peak_rss_mb() - baseline,
+                      'inserted': counts['inserted']}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Посты в памяти: список словарей vs PostBatch")
+    parser.add_argument('--sizes', default='100000,1000000')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'JSON', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'постов':>9} {'режим':<7} {'разбор, с':>10} {'память после разбора, МБ':>25} "
+          f"{'запись, с':>10} {'пик, МБ':>8} {'МБ на 10^6':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            json_path = os.path.join(tmp, f"posts_{count}.json")
+            write_posts_json(json_path, count)
+            for mode in ('dicts', 'batch'):
+                db_path = os.path.join(tmp, f"{mode}_{count}.db")
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', mode, json_path, db_path],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                assert result['inserted'] == count
+                print(f"{count:>9} {mode:<7} {result['load_seconds']:>10.2f} {result['load_rss_mb']:>25.1f} "
+                      f"{result['sync_seconds']:>10.2f} {result['rss_mb']:>8.1f} "
+                      f"{result['load_rss_mb'] / count * 1e6:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.bulk_load import open_bulk_connection, bulk_insert_posts
+from common.posts_repository import PostsRepository
+from benchmarks.synthetic import synthetic_posts
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS posts (
+        id INTEGER PRIMARY KEY,
+        userId INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        body TEXT NOT NULL
+    )
+'''
+
+
+def build_db(path, count, users):
+    conn = open_bulk_connection(path)
+    conn.execute(SCHEMA)
+    bulk_insert_posts(conn, synthetic_posts(count, users=users))
+    conn.close()
+
+
+def lookup_old(path, user_ids):
+    # Как раньше: новое соединение на каждый вызов, индекса нет
+    for user_id in user_ids:
+        conn = sqlite3.connect(path)
+        conn.execute('SELECT id, title, body FROM posts WHERE userId = ?', (user_id,)).fetchall()
+        conn.close()
+
+
+def lookup_repository(repository, user_ids):
+    for user_id in user_ids:
+        repository.get_posts_by_user(user_id)
+
+
+def lookup_batched(repository, user_ids, batch):
+    for i in range(0, len(user_ids), batch):
+        repository.get_posts_by_users(user_ids[i:i + batch])
+
+
+def measure(run, lookups):
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Задержка выборки постов пользователя с индексами и без")
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--lookups', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=50, help="пользователей в одном пакетном запросе")
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    user_ids = [rnd.randint(1, args.users) for _ in range(args.lookups)]
+    print(f"{'постов':>10} {'без индекса':>14} {'без индекса*':>14} {'индекс':>10} {'пакетом':>10}  (мкс на пользователя)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            path = os.path.join(tmp, f"posts_{count}.db")
+            build_db(path, count, args.users)
+
+            old = measure(lambda: lookup_old(path, user_ids), len(user_ids))
+            with PostsRepository(path, create_indexes=False) as repository:
+                no_index = measure(lambda: lookup_repository(repository, user_ids), len(user_ids))
+            with PostsRepository(path) as repository:
+                indexed = measure(lambda: lookup_repository(repository, user_ids), len(user_ids))
+                batched = measure(lambda: lookup_batched(repository, user_ids, args.batch), len(user_ids))
+            print(f"{count:>10} {old:>14.1f} {no_index:>14.1f} {indexed:>10.1f} {batched:>10.1f}")
+    print("* без индекса, но на одном соединении с кэшем запросов")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.bulk_load import open_bulk_connection, bulk_insert_posts
+from common.posts_search import ensure_fts, search_posts
+from benchmarks.synthetic import synthetic_posts
+from benchmarks.bench_posts_query import SCHEMA
+
+
+def selective_queries(count):
+    # Номер поста входит в заголовок: запросы, совпадающие с единицами строк
+    return [str(count // 3), f"{count // 7}", f"{count // 11} ", str(count // 2 + 1)]
+
+
+# Частое слово: совпадает почти с каждой строкой, худший случай для ранжирования
+COMMON_QUERY = 'lorem'
+
+
+def measure(run, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск: подстрока по всей таблице vs FTS5 со страницей результатов")
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--page', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'постов':>10} {'LIKE, мс':>10} {'FTS5, мс':>10} {'LIKE част.':>11} {'FTS5 част.':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            conn = open_bulk_connection(os.path.join(tmp, f"posts_{count}.db"))
+            conn.execute(SCHEMA)
+            ensure_fts(conn)  # триггеры наполняют индекс во время загрузки
+            bulk_insert_posts(conn, synthetic_posts(count))
+
+            def like(queries):
+                # Как фильтр прокси-модели: все строки, подстрока в заголовке
+                for q in queries:
+                    conn.execute("SELECT id, userId, title, body FROM posts WHERE title LIKE ?",
+                                 (f"%{q.strip()}%",)).fetchall()
+
+            def fts(queries):
+                for q in queries:
+                    search_posts(conn, q, args.page)
+
+            queries = selective_queries(count)
+            results = [
+                measure(lambda: like(queries), args.repeat) / len(queries),
+                measure(lambda: fts(queries), args.repeat) / len(queries),
+                measure(lambda: like([COMMON_QUERY]), args.repeat),
+                measure(lambda: fts([COMMON_QUERY]), args.repeat),
+            ]
+            print(f"{count:>10} {results[0]:>10.2f} {results[1]:>10.2f} {results[2]:>11.2f} {results[3]:>11.2f}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork4'))
+
+from benchmarks.bench_ui_model import build_db
+
+
+def type_query(app, window, text, interval_ms):
+    # Набор текста по символу с заданной паузой; параллельно "пульс" каждые 5 мс
+    # показывает, насколько блокируется GUI-поток
+    from PyQt5.QtCore import QTimer
+    ticks = []
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    heartbeat.start(5)
+
+    window.search_input.clear()
+    window.search_timer.stop()
+    window.model.set_search('')
+    while not window.model.counted:
+        app.processEvents()
+    window.last_keystroke = None
+    window.search_latency_ms = None
+    window.skipped_keystrokes = 0
+    window.model.cancelled_queries = 0
+    started = [0]
+    original_refresh = window.model.refresh
+
+    def counting_refresh():
+        started[0] += 1
+        original_refresh()
+    window.model.refresh = counting_refresh
+
+    for i in range(1, len(text) + 1):
+        deadline = time.perf_counter() + interval_ms / 1000
+        window.search_input.setText(text[:i])
+        while time.perf_counter() < deadline:
+            app.processEvents()
+    while window.search_latency_ms is None or not window.model.counted:
+        app.processEvents()
+
+    heartbeat.stop()
+    window.model.refresh = original_refresh
+    stall = max((b - a for a, b in zip(ticks, ticks[1:])), default=0) * 1000
+    return {
+        'latency_ms': window.search_latency_ms,
+        'queries': started[0],
+        'skipped': window.skipped_keystrokes,
+        'cancelled': window.model.cancelled_queries,
+        'stall_ms': stall,
+        'rows': window.model.rowCount(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск во время набора: задержка, отменённые запросы, блокировка GUI")
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--text', default='dolor magna')
+    parser.add_argument('--interval', type=int, default=80, help="пауза между нажатиями, мс")
+    parser.add_argument('--delays', default='0,250', help="задержки запуска поиска, мс")
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_db(os.path.join(tmp, 'posts.db'), args.size)
+        cwd = os.getcwd()
+        os.chdir(tmp)  # окно открывает posts.db из текущего каталога
+        try:
+            import Main
+            window = Main.MainWindow()
+            print(f"{'задержка, мс':>12} {'запросов':>9} {'пропущено':>10} {'отменено':>9} "
+                  f"{'поиск, мс':>10} {'GUI макс. пауза, мс':>20}")
+            for delay in (int(d) for d in args.delays.split(',')):
+                window.search_timer.setInterval(delay)
+                r = type_query(app, window, args.text, args.interval)
+                print(f"{delay:>12} {r['queries']:>9} {r['skipped']:>10} {r['cancelled']:>9} "
+                      f"{r['latency_ms']:>10.1f} {r['stall_ms']:>20.1f}")
+            window.close()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import synthetic_posts
+from common.post_shards import ShardedPosts
+
+
+def timed(action):
+    start = time.perf_counter()
+    result = action()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Шарды posts по userId: запись и запросы при 1/2/4/8 файлах")
+    parser.add_argument('--posts', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--shards', default='1,2,4,8')
+    parser.add_argument('--batch-size', type=int, default=5000, help="постов в пачке потоковой записи")
+    args = parser.parse_args()
+
+    posts = list(synthetic_posts(args.posts, users=args.users))
+    users = random.Random(1).sample(range(1, args.users + 1), 50)
+    print(f"[Shards] {args.posts} постов, {args.users} пользователей, ядер: {os.cpu_count()}")
+    print(f"{'шардов':>7} {'пул':>9} {'полная, пост/с':>15} {'пачками, пост/с':>16} "
+          f"{'повтор, пост/с':>15} {'50 польз., мс':>14} {'скан, мс':>9}")
+    expected = None
+    for processes in (False, True):
+        for shards in (int(s) for s in args.shards.split(',')):
+            with tempfile.TemporaryDirectory() as tmp, \
+                    ShardedPosts(os.path.join(tmp, 'posts.db'), shards, processes=processes) as storage:
+                full_seconds, counts = timed(lambda: storage.sync_posts(posts))
+                assert counts['inserted'] == len(posts)
+
+                # Потоковая запись пачками (как в PostPipeline) в новые файлы
+                # и повтор тех же пачек - установившийся режим, когда почти всё без изменений
+                batched = ShardedPosts(os.path.join(tmp, 'batched.db'), shards, processes=processes)
+                with batched:
+                    def sync_batches():
+                        for i in range(0, len(posts), args.batch_size):
+                            batched.sync_batch(posts[i:i + args.batch_size])
+                    batch_seconds, _ = timed(sync_batches)
+                    repeat_seconds, _ = timed(sync_batches)
+
+                users_seconds, by_user = timed(lambda: storage.get_posts_by_users(users))
+                scan_seconds, rows = timed(storage.all_posts)
+                result = (sum(len(v) for v in by_user.values()), [row[0] for row in rows])
+                assert result[1] == [post['id'] for post in posts]
+                if expected is None:
+                    expected = result
+                assert result == expected, "Результаты при разном числе шардов не совпадают"
+                print(f"{shards:>7} {'процессы' if processes else 'потоки':>9} "
+                      f"{len(posts) / full_seconds:>15,.0f} {len(posts) / batch_seconds:>16,.0f} "
+                      f"{len(posts) / repeat_seconds:>15,.0f} "
+                      f"{users_seconds * 1000:>14.1f} {scan_seconds * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Запуск окон LabWork4/5/6 без дисплея: время до первой отрисовки и до готовности
+# (БД открыта / загрузчик создан), плюс самые дорогие импорты по -X importtime.
+#   python benchmarks/bench_startup.py --budget-ms 400   - код 1, если первая отрисовка дольше
+# Время считается от запуска процесса интерпретатора (родитель передаёт time.time()).
+
+APPS = {
+    'LabWork4': ('Main', lambda module, db: module.MainWindow()),  # posts.db в текущем каталоге
+    'LabWork5': ('main', lambda module, db: module.MainWindow({'db_path': db, 'cache_dir': '',
+                                                                'base_url': 'http://127.0.0.1:9',
+                                                                'interval': 3600})),
+    'LabWork6': ('main', lambda module, db: module.MainWindow({'db_path': db, 'cache_dir': '',
+                                                                'base_url': 'http://127.0.0.1:9',
+                                                                'interval': 3600})),
+}
+
+
+def child(app_name, db_path, spawned_at):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    os.chdir(os.path.dirname(db_path))
+    sys.path.insert(0, os.path.join(ROOT, app_name))
+    module_name, make_window = APPS[app_name]
+    import importlib
+    module = importlib.import_module(module_name)
+    imported_at = time.time()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([])
+    window = make_window(module, db_path)
+    window.show()
+    window.repaint()  # синхронная отрисовка: окно на экране
+    painted_at = time.time()
+    deadline = painted_at + 30
+    # Готовность: отложенная инициализация в цикле событий завершилась
+    while getattr(window, 'model', None) is None and getattr(window, 'loader', None) is None:
+        app.processEvents()
+        if time.time() > deadline:
+            raise RuntimeError("Окно не стало готовым за 30 с")
+    ready_at = time.time()
+    window.close()
+    print(json.dumps({'import_ms': (imported_at - spawned_at) * 1000,
+                      'first_paint_ms': (painted_at - spawned_at) * 1000,
+                      'ready_ms': (ready_at - spawned_at) * 1000}))
+
+
+def parse_importtime(stderr):
+    # Строки "import time: self | cumulative | имя"; верхний уровень - без отступа в имени
+    top = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            top.append((int(cumulative) / 1000, name.strip()))
+    return sorted(top, reverse=True)
+
+
+def run_app(app_name, db_path, importtime):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [
+        os.path.abspath(__file__), '--child', app_name, db_path, repr(time.time())]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время запуска окон: импорты, первая отрисовка, готовность")
+    parser.add_argument('--apps', default=','.join(APPS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=100000, help="постов в posts.db для LabWork4")
+    parser.add_argument('--top', type=int, default=8, help="сколько самых дорогих импортов показать")
+    parser.add_argument('--budget-ms', type=float, help="допустимое время до первой отрисовки, мс")
+    parser.add_argument('--child', nargs=3, metavar=('APP', 'DB', 'TIME'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], float(args.child[2]))
+        return
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.generate import write_posts_db
+    over_budget = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'posts.db')
+        write_posts_db(db_path, args.rows, fts=True)
+        print(f"{'окно':<9} {'импорт, мс':>11} {'отрисовка, мс':>14} {'готово, мс':>11}   (медиана из {args.repeat})")
+        for app_name in args.apps.split(','):
+            run_app(app_name, db_path, False)  # прогрев: .pyc и кэш схемы
+            runs = [run_app(app_name, db_path, False)[0] for _ in range(args.repeat)]
+            median = {key: sorted(run[key] for run in runs)[len(runs) // 2] for key in runs[0]}
+            print(f"{app_name:<9} {median['import_ms']:>11.0f} {median['first_paint_ms']:>14.0f} "
+                  f"{median['ready_ms']:>11.0f}")
+            _, imports = run_app(app_name, db_path, True)
+            # Включая отложенные импорты, выполненные до готовности окна
+            print('          ' + ', '.join(f"{name} {ms:.0f}" for ms, name in imports[:args.top]))
+            if args.budget_ms is not None and median['first_paint_ms'] > args.budget_ms:
+                over_budget.append(app_name)
+    if over_budget:
+        print(f"Превышен бюджет {args.budget_ms:g} мс: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
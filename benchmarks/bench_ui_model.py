@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import resource
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork4'))
+
+from common.bulk_load import open_bulk_connection, bulk_insert_posts
+from common.posts_repository import INDEXES
+from common.posts_search import ensure_fts
+from benchmarks.synthetic import synthetic_posts
+from benchmarks.bench_posts_query import SCHEMA
+
+
+def build_db(path, count):
+    conn = open_bulk_connection(path)
+    conn.execute(SCHEMA)
+    ensure_fts(conn)
+    conn.executescript(INDEXES)
+    bulk_insert_posts(conn, synthetic_posts(count), defer_indexes=True)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def insert_post(conn):
+    with conn:
+        cursor = conn.execute("INSERT INTO posts (userId, title, body) VALUES (1, 'new', 'post')")
+    return cursor.lastrowid
+
+
+def delete_post(conn, post_id):
+    with conn:
+        conn.execute('DELETE FROM posts WHERE id = ?', (post_id,))
+
+
+def run_old(app, db_path):
+    # Как было: QSqlTableModel + fetchMore до конца таблицы,
+    # после добавления/удаления - select() заново
+    from PyQt5.QtSql import QSqlDatabase, QSqlTableModel
+    db = QSqlDatabase.addDatabase("QSQLITE")
+    db.setDatabaseName(db_path)
+    db.open()
+    start = time.perf_counter()
+    model = QSqlTableModel(None, db)
+    model.setTable("posts")
+    model.select()
+    while model.canFetchMore():
+        model.fetchMore()
+    elapsed = time.perf_counter() - start
+
+    def reselect():
+        model.select()
+        while model.canFetchMore():
+            model.fetchMore()
+
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    post_id = insert_post(conn)
+    reselect()
+    delete_post(conn, post_id)
+    reselect()
+    edit = (time.perf_counter() - start) / 2
+    return elapsed, model.rowCount(), edit
+
+
+def run_paged(app, db_path):
+    from posts_model import PagedPostsModel
+    start = time.perf_counter()
+    model = PagedPostsModel(db_path)
+    model.refresh()
+    while model.rowCount() == 0 or model.row_at(0) is None:
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    # Добавление в конец и удаление видимой строки: меняются только затронутые страницы
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    post_id = insert_post(conn)
+    model.insert_posts(conn, [(post_id, 1, 'new', 'post')])
+    delete_post(conn, model.post_id(0))
+    model.remove_rows([0])
+    while model.row_at(0) is None:
+        app.processEvents()
+    edit = (time.perf_counter() - start) / 2
+    model.pool.waitForDone()
+    return elapsed, model.rowCount(), edit
+
+
+def child(mode, db_path):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication([])
+    baseline = peak_rss_mb()
+    elapsed, rows, edit = (run_old if mode == 'old' else run_paged)(app, db_path)
+    print(json.dumps({'seconds': elapsed, 'rows': rows, 'edit_ms': edit * 1000,
+                      'rss_mb': peak_rss_mb() - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время до первого экрана, правки и память: QSqlTableModel vs постраничная модель")
+    parser.add_argument('--sizes', default='100000,1000000')
+    parser.add_argument('--skip-old-above', type=int, default=2000000,
+                        help="не запускать старую модель на таблицах больше этого размера")
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'строк':>10} {'модель':<10} {'время, с':>10} {'правка, мс':>12} {'память, МБ':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(s) for s in args.sizes.split(',')):
+            path = os.path.join(tmp, f"posts_{count}.db")
+            build_db(path, count)
+            for mode in ('old', 'paged'):
+                if mode == 'old' and count > args.skip_old_above:
+                    continue
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', mode, path],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{count:>10} {mode:<10} {result['seconds']:>10.3f} "
+                      f"{result['edit_ms']:>12.2f} {result['rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
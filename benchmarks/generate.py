@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import synthetic_posts, write_sample_csv
+from common.bulk_load import open_bulk_connection, bulk_insert_posts
+from common.posts_repository import INDEXES
+from common.posts_search import ensure_fts
+
+# Синтетические входные данные в форматах проекта, от 10^3 до 10^7 строк:
+#   python benchmarks/generate.py posts-db posts.db --rows 1e6 --fts   - как после LabWork3/LabWork5
+#   python benchmarks/generate.py csv sample_data.csv --rows 1e7       - как LabWork6/sample_data.csv
+# Данные детерминированы (--seed): одни и те же файлы на любой машине и в любом коммите.
+
+POSTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS posts (
+        id INTEGER PRIMARY KEY,
+        userId INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        body TEXT NOT NULL
+    )
+'''
+
+
+def write_posts_db(path, rows, users=1000, seed=42, fts=False):
+    # Новый файл: индексы (и FTS) строятся один раз после вставки всех строк
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    conn = open_bulk_connection(path)
+    conn.execute(POSTS_SCHEMA)
+    conn.executescript(INDEXES)
+    if fts:
+        ensure_fts(conn)
+    bulk_insert_posts(conn, synthetic_posts(rows, users=users, seed=seed), defer_indexes=True)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+
+
+def parse_rows(text):
+    # 1000, 1e6, 10_000_000
+    return int(float(text.replace('_', '')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация posts.db и sample_data.csv заданного размера")
+    parser.add_argument('kind', choices=['posts-db', 'csv'])
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=parse_rows, default=100000, help="число строк, например 1e6")
+    parser.add_argument('--users', type=int, default=1000, help="posts-db: число разных userId")
+    parser.add_argument('--fts', action='store_true', help="posts-db: заполнить полнотекстовый индекс")
+    parser.add_argument('--rows-per-day', type=int, default=1000, help="csv: строк на одну дату")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.kind == 'posts-db':
+        write_posts_db(args.path, args.rows, args.users, args.seed, args.fts)
+    else:
+        write_sample_csv(args.path, args.rows, args.rows_per_day, args.seed)
+    print(f"[Generate] {args.path}: {args.rows} строк, {os.path.getsize(args.path) / 2 ** 20:.1f} МБ "
+          f"за {time.perf_counter() - start:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
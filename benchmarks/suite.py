@@ -0,0 +1,287 @@
+import os
+import sys
+import json
+import time
+import random
+import socket
+import sqlite3
+import argparse
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'LabWork2'))
+
+from benchmarks.generate import write_posts_db
+from common.posts_repository import PostsRepository
+
+# Набор сценариев без сети: API заменяет common/stub_server.py, данные - benchmarks/generate.py.
+#   python benchmarks/suite.py --sizes 1e3,1e5                    - результаты в benchmarks/results/<коммит>.json
+#   python benchmarks/suite.py --compare results/a.json results/b.json
+# Сравнение печатает изменения по каждой величине и завершается с кодом 1,
+# если что-то ухудшилось больше --threshold процентов.
+
+LOADER = os.path.join(ROOT, 'LabWork5', 'loader.py')
+STUB_SERVER = os.path.join(ROOT, 'common', 'stub_server.py')
+UI_BENCH = os.path.join(ROOT, 'benchmarks', 'bench_ui_model.py')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+SCENARIOS = ('ingest', 'query', 'ui_model', 'socket_echo')
+
+
+def parse_sizes(text):
+    return [int(float(s)) for s in text.split(',')]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_measured(command):
+    # Время до выхода процесса и его пиковая память (wait4 - только этот процесс).
+    # stderr - во временный файл, а не в канал: процесс, написавший в stderr больше
+    # буфера канала, иначе ждал бы читателя, а мы - его выхода. wait4 есть не везде
+    # (нет на Windows): тогда память не измеряется - None, в отчёте "n/a"
+    start = time.perf_counter()
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=stderr)
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss - в КБ, на macOS - в байтах
+            rss_mb = usage.ru_maxrss / (2 ** 20 if sys.platform == 'darwin' else 1024)
+        else:
+            process.wait()
+            rss_mb = None
+        elapsed = time.perf_counter() - start
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"{' '.join(command)}: {stderr.read().decode(errors='replace')}")
+    return elapsed, rss_mb
+
+
+def format_value(value):
+    return 'n/a' if value is None else f"{value:.4g}"
+
+
+class Workspace:
+    # Временный каталог со сгенерированными posts.db: каждый размер строится один раз
+
+    def __init__(self, path):
+        self.path = path
+        self.databases = {}
+
+    def posts_db(self, rows):
+        if rows not in self.databases:
+            path = os.path.join(self.path, f"posts_{rows}.db")
+            write_posts_db(path, rows, fts=True)
+            self.databases[rows] = path
+        return self.databases[rows]
+
+
+def scenario_ingest(workspace, rows, args):
+    # Консольный загрузчик против заглушки: первая загрузка целиком,
+    # повтор с HTTP-кэшем (304) и загрузка страницами ?_page=N&_limit=M
+    stub = subprocess.Popen(
+        [sys.executable, '-u', STUB_SERVER, '--port', '0', '--posts', str(rows),
+         '--latency', str(args.latency)] + (['--body-size', str(args.body_size)] if args.body_size else []),
+        stdout=subprocess.PIPE, text=True
+    )
+    base_url = stub.stdout.readline().split()[-1]
+    try:
+        db_path = os.path.join(workspace.path, f"ingest_{rows}.db")
+        cache_dir = os.path.join(workspace.path, f"ingest_{rows}.cache")
+        loader = [sys.executable, LOADER, '--once', '--base-url', base_url, '--cache-dir', cache_dir]
+        seconds, rss_mb = run_measured(loader + ['--db', db_path])
+        repeat_seconds, _ = run_measured(loader + ['--db', db_path])
+
+        paged_db_path = os.path.join(workspace.path, f"ingest_paged_{rows}.db")
+        pages = -(-rows // args.page_size)
+        paths = [arg for page in range(1, pages + 1)
+                 for arg in ('--path', f"/posts?_page={page}&_limit={args.page_size}")]
+        paged_seconds, _ = run_measured(
+            [sys.executable, LOADER, '--once', '--base-url', base_url, '--cache-dir', '',
+             '--db', paged_db_path, '--concurrency', '4'] + paths
+        )
+    finally:
+        stub.terminate()
+        stub.wait()
+    for path in (db_path, paged_db_path):
+        conn = sqlite3.connect(path)
+        assert conn.execute('SELECT count(*) FROM posts').fetchone()[0] == rows, path
+        conn.close()
+    return {
+        'seconds': seconds,
+        'posts_per_s': rows / seconds,
+        'rss_mb': rss_mb,
+        'repeat_seconds': repeat_seconds,
+        'paged_seconds': paged_seconds,
+    }
+
+
+def scenario_query(workspace, rows, args):
+    path = workspace.posts_db(rows)
+    rnd = random.Random(1)
+    user_ids = [rnd.randint(1, 1000) for _ in range(args.queries)]
+    with PostsRepository(path) as repository:
+        repository.search('lorem', 10)  # прогрев: FTS и кэш страниц
+        by_user = []
+        for user_id in user_ids:
+            start = time.perf_counter()
+            repository.get_posts_by_user(user_id)
+            by_user.append(time.perf_counter() - start)
+        search = []
+        for word in ('lorem', 'dolor sit', 'magna', 'veniam quis') * 25:
+            start = time.perf_counter()
+            repository.search(word, 100)
+            search.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        after_id = 0
+        while True:
+            page = repository.get_titles(1000, after_id)
+            if not page:
+                break
+            after_id = page[-1][0]
+        scan_seconds = time.perf_counter() - start
+    return {
+        'by_user_p50_us': percentile(by_user, 0.5) * 1e6,
+        'by_user_p99_us': percentile(by_user, 0.99) * 1e6,
+        'search_p50_us': percentile(search, 0.5) * 1e6,
+        'search_p99_us': percentile(search, 0.99) * 1e6,
+        'titles_scan_seconds': scan_seconds,
+    }
+
+
+def scenario_ui_model(workspace, rows, args):
+    # Постраничная модель LabWork4 без дисплея (bench_ui_model.py --child)
+    output = subprocess.run([sys.executable, UI_BENCH, '--child', 'paged', workspace.posts_db(rows)],
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return {'first_page_seconds': result['seconds'], 'edit_ms': result['edit_ms'], 'rss_mb': result['rss_mb']}
+
+
+def scenario_socket_echo(workspace, rows, args):
+    # Эхо-сервер LabWork2 в режиме кадров: задержка одиночного запроса и поток
+    # конвейером; rows - число сообщений
+    from tcp_bench import start_server
+    from tcp_client import HOST, FramedClient
+    port = free_port()
+    server = start_server('framed', port)
+    try:
+        client = FramedClient(HOST, port)
+        payload = os.urandom(args.payload)
+        latencies = []
+        for _ in range(min(rows, 10000)):
+            start = time.perf_counter()
+            client.request(payload)
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        responses = client.pipeline([payload] * rows)
+        pipeline_seconds = time.perf_counter() - start
+        assert len(responses) == rows and responses[-1] == payload
+        client.close()
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        'rtt_p50_us': percentile(latencies, 0.5) * 1e6,
+        'rtt_p99_us': percentile(latencies, 0.99) * 1e6,
+        'pipeline_msgs_per_s': rows / pipeline_seconds,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Workspace(tmp)
+        for name in args.scenarios.split(','):
+            scenario = globals()[f"scenario_{name}"]
+            for rows in parse_sizes(args.sizes):
+                key = f"{name}/{rows}"
+                print(f"[Suite] {key}...", flush=True)
+                results[key] = scenario(workspace, rows, args)
+                print('        ' + ', '.join(f"{k}={format_value(v)}" for k, v in results[key].items()),
+                      flush=True)
+    return {
+        'commit': git_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'options': vars(args),
+        'results': results,
+    }
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_s')
+
+
+def compare(old_path, new_path, threshold):
+    # Изменение каждой величины в процентах; "хуже" учитывает направление
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+    print(f"{'сценарий':<22} {'величина':<22} {'было':>12} {'стало':>12} {'изменение':>10}")
+    regressions = 0
+    for key in sorted(set(old['results']) & set(new['results'])):
+        for metric, before in old['results'][key].items():
+            after = new['results'][key].get(metric)
+            if after is None or not before:
+                continue
+            change = (after / before - 1) * 100
+            worse = -change if higher_is_better(metric) else change
+            mark = ' ХУЖЕ' if worse > threshold else ''
+            regressions += bool(mark)
+            print(f"{key:<22} {metric:<22} {before:>12.4g} {after:>12.4g} {change:>+9.1f}%{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарки: загрузка, запросы, модель UI, эхо-сокет")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--sizes', default='1e3,1e5', help="размеры через запятую, от 1e3 до 1e7")
+    parser.add_argument('--latency', type=float, default=0.0, help="ingest: задержка заглушки, с")
+    parser.add_argument('--body-size', type=int, help="ingest: длина тела поста в ответе заглушки")
+    parser.add_argument('--page-size', type=int, default=10000, help="ingest: постов на страницу")
+    parser.add_argument('--queries', type=int, default=1000, help="query: запросов по пользователю")
+    parser.add_argument('--payload', type=int, default=256, help="socket_echo: байт в сообщении")
+    parser.add_argument('--output', help="файл результатов (по умолчанию results/<коммит>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="сравнить два файла результатов")
+    parser.add_argument('--threshold', type=float, default=10.0, help="допустимое ухудшение, %%")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    unknown = set(args.scenarios.split(',')) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+    report = run_suite(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"[Suite] Результаты: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import random
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud"
+).split()
+POOL_SIZE = 4096
+
+
+def text_pool(seed, size, min_words, max_words):
+    rnd = random.Random(seed)
+    return [' '.join(rnd.choices(WORDS, k=rnd.randint(min_words, max_words))) for _ in range(size)]
+
+
+def synthetic_posts(count, users=1000, seed=42, start_id=1):
+    # Генератор: посты не хранятся в памяти целиком.
+    # Тексты берутся из заранее собранного пула, чтобы генерация не была узким местом.
+    titles = text_pool(seed, POOL_SIZE, 3, 8)
+    bodies = text_pool(seed + 1, POOL_SIZE, 15, 40)
+    for post_id in range(start_id, start_id + count):
+        mixed = post_id * 2654435761 + seed
+        yield {
+            'userId': mixed % users + 1,
+            'id': post_id,
+            'title': f"{titles[(mixed >> 8) % POOL_SIZE]} {post_id}",
+            'body': bodies[(mixed >> 16) % POOL_SIZE],
+        }
+
+
+CSV_HEADER = 'Date,Category,Value1,Value2,BooleanFlag\n'
+CSV_CATEGORIES = ('A', 'B', 'C', 'D', 'E', 'F', 'G', 'H')
+
+
+def write_sample_csv(path, rows, rows_per_day=1000, seed=42, chunk_rows=100000):
+    # CSV в формате LabWork6/sample_data.csv; столбцы генерируются NumPy
+    # порциями, так что файл на десятки миллионов строк пишется без роста памяти
+    import numpy as np
+    rnd = np.random.default_rng(seed)
+    start = np.datetime64('2023-01-01')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(CSV_HEADER)
+        for first in range(0, rows, chunk_rows):
+            count = min(chunk_rows, rows - first)
+            dates = (start + (np.arange(first, first + count) // rows_per_day)).astype(str)
+            categories = rnd.integers(0, len(CSV_CATEGORIES), count)
+            value1 = rnd.integers(1, 500, count)
+            value2 = rnd.uniform(10, 60, count)
+            flags = rnd.random(count) < 0.45
+            f.writelines(
+                f"{d},{CSV_CATEGORIES[c]},{v1},{v2:.2f},{flag}\n"
+                for d, c, v1, v2, flag in zip(dates, categories.tolist(), value1.tolist(),
+                                              value2.tolist(), flags.tolist())
+            )
@@ -0,0 +1,201 @@
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common import metrics
+from common.json_stream import iter_json_array
+
+
+def _import_aiohttp():
+    # aiohttp нужен только асинхронному клиенту: его импорт (~0.2 с) не платят
+    # синхронные пользователи модуля, например консольный загрузчик
+    try:
+        import aiohttp
+    except ImportError:  # асинхронный режим работает и без aiohttp, через пул потоков
+        return None
+    return aiohttp
+
+
+# POSTS_API_URL=http://127.0.0.1:8000 - все программы ходят в локальную
+# заглушку (common/stub_server.py) вместо настоящего API: для работы без сети и бенчмарков
+BASE_URL = os.environ.get('POSTS_API_URL', "https://jsonplaceholder.typicode.com")
+
+
+def _count_bytes(chunks):
+    for chunk in chunks:
+        metrics.inc('http_response_bytes_total', len(chunk))
+        yield chunk
+
+
+class ApiClient:
+    # Одна сессия requests на всё время работы: TCP/TLS соединения
+    # переиспользуются между запросами (keep-alive)
+
+    def __init__(self, base_url=BASE_URL, pool_size=10, timeout=10.0, retries=2, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, path, **kwargs):
+        # Для потоковых ответов (stream=True) - время до заголовков
+        kwargs.setdefault('timeout', self.timeout)
+        with metrics.timer('http_request_seconds', {'method': method}):
+            response = self.session.request(method, self.url(path), **kwargs)
+        metrics.inc('http_responses_total', 1, {'status': response.status_code})
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, json=None, **kwargs):
+        return self.request('POST', path, json=json, **kwargs)
+
+    def put(self, path, json=None, **kwargs):
+        return self.request('PUT', path, json=json, **kwargs)
+
+    def get_json(self, path, **kwargs):
+        response = self.get(path, **kwargs)
+        response.raise_for_status()
+        metrics.inc('http_response_bytes_total', len(response.content))
+        return response.json()
+
+    def get_posts(self):
+        return self.get_json('/posts')
+
+    def get_json_if_modified(self, path):
+        # None - данные не изменились с прошлого раза (свежая запись в кэше или 304):
+        # вызывающему не нужно ни разбирать JSON, ни сохранять его
+        if self.cache is None:
+            return self.get_json(path)
+        url = self.url(path)
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.record_hit(entry)
+            return None
+
+        response = self.get(path, headers=self.cache.conditional_headers(entry))
+        if response.status_code == 304 and entry is not None:
+            self.cache.record_not_modified(url, response)
+            return None
+        response.raise_for_status()
+        self.cache.store(url, response)
+        metrics.inc('http_response_bytes_total', len(response.content))
+        return response.json()
+
+    def iter_json_if_modified(self, path, chunk_size=64 * 1024):
+        # Как get_json_if_modified, но ответ (JSON-массив) читается потоком
+        # и элементы отдаются по одному: весь ответ в памяти не собирается
+        url = self.url(path)
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            if entry is not None and self.cache.is_fresh(entry):
+                self.cache.record_hit(entry)
+                return None
+
+        headers = self.cache.conditional_headers(entry) if self.cache is not None else {}
+        response = self.get(path, headers=headers, stream=True)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.record_not_modified(url, response)
+            return None
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        chunks = response.iter_content(chunk_size)
+        if metrics.enabled():
+            chunks = _count_bytes(chunks)
+        if self.cache is not None:
+            chunks = self.cache.store_chunks(url, response, chunks)
+        return self._stream_items(response, chunks)
+
+    def invalidate(self, path):
+        # Забыть закэшированный ответ path: данные из него не дошли до хранилища
+        if self.cache is not None:
+            self.cache.invalidate(self.url(path))
+
+    @staticmethod
+    def _stream_items(response, chunks):
+        try:
+            yield from iter_json_array(chunks, response.encoding or 'utf-8')
+            for _ in chunks:
+                pass  # дочитываем хвост после ']': ответ целиком попадает в кэш
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncApiClient:
+    # Параллельная выборка многих ресурсов с ограничением числа
+    # одновременных запросов (semaphore + размер пула соединений)
+
+    def __init__(self, base_url=BASE_URL, concurrency=20, timeout=10.0):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = None
+        self.sync_client = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        import asyncio
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        aiohttp = _import_aiohttp()
+        if aiohttp is not None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        else:
+            self.sync_client = ApiClient(self.base_url, pool_size=self.concurrency,
+                                         timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.session is not None:
+            await self.session.close()
+        if self.sync_client is not None:
+            self.sync_client.close()
+
+    async def get_json(self, path):
+        import asyncio
+        async with self.semaphore:
+            if self.session is None:
+                return await asyncio.to_thread(self.sync_client.get_json, path)
+            async with self.session.get(f"{self.base_url}/{path.lstrip('/')}") as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    async def fetch_many(self, paths, return_exceptions=False):
+        # Результаты возвращаются в порядке paths
+        import asyncio
+        return await asyncio.gather(*(self.get_json(path) for path in paths),
+                                    return_exceptions=return_exceptions)
+
+
+def fetch_many(paths, base_url=BASE_URL, concurrency=20, return_exceptions=False):
+    # asyncio (~50 мс импорта) нужен только асинхронной выборке, как и aiohttp
+    import asyncio
+
+    async def run():
+        async with AsyncApiClient(base_url, concurrency) as client:
+            return await client.fetch_many(paths, return_exceptions)
+    return asyncio.run(run())
@@ -0,0 +1,78 @@
+import sqlite3
+from itertools import islice
+from contextlib import contextmanager
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Upsert, а не INSERT OR REPLACE: замена строки удаляет её без триггеров DELETE
+# (recursive_triggers выключен), и внешний индекс posts_fts хранил бы старые слова
+INSERT_POST_SQL = '''
+    INSERT INTO posts (id, userId, title, body) VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET userId = excluded.userId, title = excluded.title, body = excluded.body
+'''
+
+
+def tune_connection(conn, synchronous='NORMAL', cache_size_kb=64 * 1024, temp_store='MEMORY'):
+    # WAL: читатели не блокируют писателя; synchronous=NORMAL в WAL безопасен
+    # для целостности БД и не делает fsync на каждый коммит
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f'PRAGMA synchronous={synchronous}')
+    conn.execute(f'PRAGMA cache_size=-{int(cache_size_kb)}')
+    conn.execute(f'PRAGMA temp_store={temp_store}')
+    return conn
+
+
+def open_bulk_connection(db_path, **pragmas):
+    return tune_connection(sqlite3.connect(db_path), **pragmas)
+
+
+def batched(rows, batch_size=DEFAULT_BATCH_SIZE):
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def executemany_batched(conn, sql, rows, batch_size=DEFAULT_BATCH_SIZE):
+    # Строки читаются из итератора пачками: в памяти не больше batch_size строк
+    count = 0
+    for batch in batched(rows, batch_size):
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def post_rows(posts):
+    # Кортежи (id, userId, title, body): у PostBatch и PostColumns - их собственные
+    # rows() без словарей, у списка словарей из JSON - по ключам
+    rows = getattr(posts, 'rows', None)
+    if rows is not None:
+        return rows()
+    return ((post['id'], post['userId'], post['title'], post['body']) for post in posts)
+
+
+@contextmanager
+def deferred_indexes(conn, table='posts'):
+    # Вторичные индексы удаляются на время загрузки и строятся заново один раз в конце
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,)
+    ).fetchall()
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+    try:
+        yield
+    finally:
+        for _, sql in indexes:
+            conn.execute(sql)
+
+
+def bulk_insert_posts(conn, posts, batch_size=DEFAULT_BATCH_SIZE, defer_indexes=False):
+    # posts - любой итерируемый источник словарей, в том числе генератор
+    with conn:
+        if defer_indexes:
+            with deferred_indexes(conn):
+                return executemany_batched(conn, INSERT_POST_SQL, post_rows(posts), batch_size)
+        return executemany_batched(conn, INSERT_POST_SQL, post_rows(posts), batch_size)
@@ -0,0 +1,180 @@
+import os
+import json
+import mmap
+import struct
+import hashlib
+
+import numpy as np
+
+# Двоичный столбцовый кэш: данные, один раз разобранные из текста (JSON, CSV),
+# сохраняются как есть и при следующем запуске отображаются в память без разбора.
+#
+#   MAGIC | длина заголовка (u64) | заголовок JSON | столбцы (каждый выровнен на ALIGN)
+#
+# Числовой столбец - массив фиксированной ширины, читается np.frombuffer прямо
+# из отображения (без копии). Строковый столбец - смещения (int64, rows + 1)
+# и общая "куча" байт UTF-8: строка i = heap[offsets[i]:offsets[i + 1]].
+# В заголовке записан отпечаток исходного файла (размер, mtime, по желанию хэш):
+# кэш от другой версии источника не используется.
+
+MAGIC = b'COLCACHE'
+VERSION = 1
+ALIGN = 64
+_LENGTH = struct.Struct('<Q')
+
+
+def source_signature(path, with_hash=False):
+    stat = os.stat(path)
+    signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        signature['hash'] = digest.hexdigest()
+    return signature
+
+
+def _pad(f):
+    f.write(b'\0' * (-f.tell() % ALIGN))
+    return f.tell()
+
+
+def write_columns(path, columns, source=None):
+    # columns: имя -> массив NumPy (числовой) или список строк; длины столбцов
+    # могут различаться (например, словарь категорий рядом с кодами строк).
+    # Пишется во временный файл и подменяется целиком: читатель не увидит половину кэша
+    header = {'version': VERSION, 'source': source, 'columns': []}
+    blobs = []
+    for name, values in columns.items():
+        if isinstance(values, np.ndarray) and values.dtype.kind not in 'US':
+            data = np.ascontiguousarray(values)
+            header['columns'].append({'name': name, 'kind': 'array', 'rows': len(data),
+                                      'dtype': data.dtype.str})
+            blobs.append((data,))
+        else:
+            encoded = [str(value).encode('utf-8') for value in values]
+            offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            header['columns'].append({'name': name, 'kind': 'strings', 'rows': len(encoded)})
+            blobs.append((offsets, b''.join(encoded)))
+
+    # Смещения частей - от начала области данных (первая граница ALIGN после заголовка)
+    position = 0
+    for column, parts in zip(header['columns'], blobs):
+        column['parts'] = []
+        for part in parts:
+            position += -position % ALIGN
+            size = part.nbytes if isinstance(part, np.ndarray) else len(part)
+            column['parts'].append([position, size])
+            position += size
+    encoded_header = json.dumps(header).encode('utf-8')
+
+    part_path = path + '.part'
+    with open(part_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(encoded_header)))
+        f.write(encoded_header)
+        data_start = _pad(f)
+        for column, parts in zip(header['columns'], blobs):
+            for (offset, _), part in zip(column['parts'], parts):
+                f.write(b'\0' * (data_start + offset - f.tell()))
+                f.write(part.view(np.uint8).data if isinstance(part, np.ndarray) else part)
+    os.replace(part_path, path)
+
+
+class StringColumn:
+    # Строки по требованию: декодируется только то, к чему обращаются
+
+    def __init__(self, buffer, offsets, heap_offset):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.heap_offset = heap_offset
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        start = self.heap_offset + int(self.offsets[i])
+        end = self.heap_offset + int(self.offsets[i + 1])
+        return str(self.buffer[start:end], 'utf-8')
+
+    def __iter__(self):
+        buffer = self.buffer
+        base = self.heap_offset
+        bounds = self.offsets.tolist()
+        for start, end in zip(bounds, bounds[1:]):
+            yield str(buffer[base + start:base + end], 'utf-8')
+
+    def tolist(self):
+        return list(self)
+
+
+class ColumnarFile:
+    # Открытый кэш: column(name) - массив NumPy поверх отображения или StringColumn
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self.buffer[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"Не файл столбцового кэша: {path}")
+            (length,) = _LENGTH.unpack_from(self.buffer, len(MAGIC))
+            start = len(MAGIC) + _LENGTH.size
+            self.header = json.loads(self.buffer[start:start + length])
+            self.data_start = start + length + -(start + length) % ALIGN
+            if self.header.get('version') != VERSION:
+                raise ValueError(f"Другая версия формата кэша: {path}")
+        except BaseException:
+            self.buffer.close()
+            raise
+        self.source = self.header['source']
+        self.columns = {column['name']: column for column in self.header['columns']}
+
+    def column(self, name):
+        column = self.columns[name]
+        if column['kind'] == 'array':
+            offset, _ = column['parts'][0]
+            return np.frombuffer(self.buffer, dtype=column['dtype'], count=column['rows'],
+                                 offset=self.data_start + offset)
+        (offsets_at, _), (heap_at, _) = column['parts']
+        offsets = np.frombuffer(self.buffer, dtype='<i8', count=column['rows'] + 1,
+                                offset=self.data_start + offsets_at)
+        return StringColumn(self.buffer, offsets, self.data_start + heap_at)
+
+    def close(self):
+        try:
+            self.buffer.close()
+        except BufferError:
+            pass  # на отображение ещё ссылаются массивы; оно закроется вместе с ними
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_cached(cache_path, source_path, build, with_hash=False):
+    # Кэш для source_path: открывается, если отпечаток источника совпал,
+    # иначе build() разбирает источник заново (-> столбцы) и кэш перезаписывается.
+    # При with_hash источник, у которого изменилось только mtime, не разбирается повторно
+    signature = source_signature(source_path)
+    try:
+        cached = ColumnarFile(cache_path)
+    except (OSError, ValueError):
+        cached = None
+    if cached is not None:
+        stored = cached.source or {}
+        if stored.get('size') == signature['size'] and (
+            stored.get('mtime_ns') == signature['mtime_ns']
+            or with_hash and stored.get('hash') == source_signature(source_path, True)['hash']
+        ):
+            return cached
+        cached.close()
+    if with_hash:
+        signature = source_signature(source_path, True)
+    write_columns(cache_path, build(), signature)
+    return ColumnarFile(cache_path)
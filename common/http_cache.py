@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class HttpCache:
+    # Кэш ответов в памяти и на диске:
+    # - в пределах ttl ответ отдаётся без обращения к серверу;
+    # - после ttl выполняется условный запрос (If-None-Match / If-Modified-Since),
+    #   ответ 304 продлевает запись без повторной загрузки тела;
+    # - размер ограничен, вытесняются давно не использованные записи (LRU).
+
+    def __init__(self, cache_dir=None, ttl=5.0, max_memory_bytes=32 * 1024 * 1024,
+                 max_disk_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.lock = threading.Lock()
+        # url -> метаданные; порядок = порядок использования (последний - самый свежий)
+        self.index = OrderedDict()
+        self.bodies = {}
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._load_index()
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, url):
+        base = os.path.join(self.cache_dir, self._key(url))
+        return base + '.meta', base + '.body'
+
+    def body_path(self, url):
+        # Файл с телом ответа, если запись хранится на диске
+        with self.lock:
+            entry = self.index.get(url)
+            return self._paths(url)[1] if entry is not None and entry['on_disk'] else None
+
+    def columns_path(self, url):
+        # Разобранное тело в столбцовом формате (common.columnar_cache);
+        # удаляется вместе с записью
+        return os.path.join(self.cache_dir, self._key(url) + '.columns')
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.meta'):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), encoding='utf-8') as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        for entry in sorted(entries, key=lambda e: e['used_at']):
+            entry['on_disk'] = True
+            self.index[entry['url']] = entry
+            self.disk_bytes += entry['size']
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is not None:
+                self.index.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def body(self, url):
+        with self.lock:
+            body = self.bodies.get(url)
+            entry = self.index.get(url)
+        if body is not None or entry is None or not self.cache_dir:
+            return body
+        try:
+            with open(self._paths(url)[1], 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        with self.lock:
+            self._keep_in_memory(url, body)
+        return body
+
+    def record_hit(self, entry):
+        with self.lock:
+            self.hits += 1
+            self.bytes_saved += entry['size']
+            entry['used_at'] = time.time()
+
+    def record_not_modified(self, url, response):
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is None:
+                return
+            self.revalidated += 1
+            self.bytes_saved += entry['size']
+            entry['stored_at'] = entry['used_at'] = time.time()
+            entry['etag'] = response.headers.get('ETag') or entry.get('etag')
+            entry['last_modified'] = response.headers.get('Last-Modified') or entry.get('last_modified')
+            self._write_meta(entry)
+
+    def store(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self.lock:
+            self.misses += 1
+            if not etag and not last_modified and not self.ttl:
+                return  # нечем проверять актуальность - хранить бессмысленно
+            self._remove(url)
+            body = response.content
+            now = time.time()
+            entry = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'stored_at': now,
+                'used_at': now,
+                'size': len(body),
+                'on_disk': False,
+            }
+            self.index[url] = entry
+            if self.cache_dir and entry['size'] <= self.max_disk_bytes:
+                with open(self._paths(url)[1], 'wb') as f:
+                    f.write(body)
+                entry['on_disk'] = True
+                self.disk_bytes += entry['size']
+                self._write_meta(entry)
+            self._keep_in_memory(url, body)
+            self._evict()
+
+    def store_chunks(self, url, response, chunks):
+        # То же, что store, для ответа, читаемого потоком: порции пропускаются
+        # дальше и по пути пишутся на диск, целиком тело в памяти не собирается
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self.lock:
+            self.misses += 1
+        if not etag and not last_modified and not self.ttl:
+            yield from chunks
+            return
+
+        size = 0
+        parts = []  # без каталога кэша тело держим в памяти, пока оно в пределах лимита
+        part_path = self._paths(url)[1] + '.part' if self.cache_dir else None
+        out = open(part_path, 'wb') if part_path else None
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                if out is not None:
+                    out.write(chunk)
+                elif parts is not None:
+                    parts.append(chunk)
+                    if size > self.max_memory_bytes:
+                        parts = None
+                yield chunk
+        except BaseException:
+            if out is not None:
+                out.close()
+                os.remove(part_path)
+            raise
+        if out is not None:
+            out.close()
+
+        with self.lock:
+            self._remove(url)
+            now = time.time()
+            entry = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'stored_at': now,
+                'used_at': now,
+                'size': size,
+                'on_disk': False,
+            }
+            self.index[url] = entry
+            if out is not None and size <= self.max_disk_bytes:
+                os.replace(part_path, self._paths(url)[1])
+                entry['on_disk'] = True
+                self.disk_bytes += size
+                self._write_meta(entry)
+            elif out is not None:
+                os.remove(part_path)
+            if parts is not None and out is None:
+                self._keep_in_memory(url, b''.join(parts))
+            self._evict()
+
+    def invalidate(self, url):
+        # Запись удаляется целиком (метаданные, тело, столбцовый кэш): следующий
+        # запрос будет безусловным. Нужно, если полученное тело не удалось сохранить
+        # у себя - иначе 304 навсегда скроет от вызывающего эти данные
+        with self.lock:
+            self._remove(url)
+
+    def _keep_in_memory(self, url, body):
+        if url in self.bodies or len(body) > self.max_memory_bytes:
+            return
+        self.bodies[url] = body
+        self.memory_bytes += len(body)
+        self._evict()
+
+    def _write_meta(self, entry):
+        if not self.cache_dir or not entry.get('on_disk'):
+            return
+        meta = {k: v for k, v in entry.items() if k != 'on_disk'}
+        with open(self._paths(entry['url'])[0], 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def _evict(self):
+        # Самые старые по использованию записи - в начале index
+        for url in list(self.index):
+            if self.memory_bytes <= self.max_memory_bytes:
+                break
+            body = self.bodies.pop(url, None)
+            if body is not None:
+                self.memory_bytes -= len(body)
+        for url in list(self.index):
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            self._remove(url)
+        # Записи, которых нет ни в памяти, ни на диске, не нужны
+        for url in [u for u, e in self.index.items() if not e['on_disk'] and u not in self.bodies]:
+            del self.index[url]
+
+    def _remove(self, url):
+        entry = self.index.pop(url, None)
+        if entry is None:
+            return
+        body = self.bodies.pop(url, None)
+        if body is not None:
+            self.memory_bytes -= len(body)
+        if entry['on_disk']:
+            self.disk_bytes -= entry['size']
+            for path in self._paths(url) + (self.columns_path(url),):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'bytes_saved': self.bytes_saved,
+                'entries': len(self.index),
+                'memory_bytes': self.memory_bytes,
+                'disk_bytes': self.disk_bytes,
+            }
@@ -0,0 +1,43 @@
+import re
+import json
+import codecs
+
+# Потоковый разбор JSON-массива верхнего уровня: элементы отдаются по мере
+# поступления байтов, в памяти только ещё не разобранный хвост, а не весь документ.
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_SEPARATOR = re.compile(r'[ \t\n\r,]*')
+
+
+def iter_json_array(chunks, encoding='utf-8'):
+    decode = codecs.getincrementaldecoder(encoding)().decode
+    buffer = ''
+    pos = 0
+    started = False
+    for chunk in chunks:
+        buffer = buffer[pos:] + decode(chunk)
+        pos = 0
+        if not started:
+            pos = _WHITESPACE.match(buffer).end()
+            if pos == len(buffer):
+                continue
+            if buffer[pos] != '[':
+                raise ValueError("Ожидался JSON-массив")
+            started = True
+            pos += 1
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # элемент пришёл не целиком - ждём следующую порцию
+            if end == len(buffer):
+                break  # число на границе порции может продолжиться
+            yield item
+            pos = end
+    raise ValueError("JSON-массив оборван")
@@ -0,0 +1,172 @@
+import sys
+import argparse
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QPushButton, QTextEdit, QProgressBar, QLabel, QStatusBar
+)
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from common.metrics import start_metrics
+from common.post_loader import PostLoader, add_loader_arguments, loader_options
+
+# Окно тонкого клиента PostLoader, общее для LabWork5 и LabWork6:
+# загрузка, запись и расписание - в движке (как в LabWork5/loader.py),
+# окно только показывает события. Свои виджеты подкласс добавляет
+# в init_extra_widgets - они встают между постами и строкой состояния.
+
+
+class LoaderSignals(QObject):
+    # События загрузчика приходят из его потоков; сигналы доставляют их в GUI-поток
+    cycle_started = pyqtSignal()
+    not_modified = pyqtSignal()
+    progress = pyqtSignal(dict)
+    data_saved = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+
+    def emit_event(self, kind, payload):
+        if kind == 'cycle_started':
+            self.cycle_started.emit()
+        elif kind == 'not_modified':
+            self.not_modified.emit()
+        elif kind == 'progress':
+            self.progress.emit(payload)
+        elif kind == 'saved':
+            self.data_saved.emit(payload)
+        else:
+            self.error_occurred.emit(payload)
+
+
+class LoaderWindow(QWidget):
+
+    def __init__(self, options=None):
+        super().__init__()
+        self.setWindowTitle('Data Loader')
+        self.layout = QVBoxLayout()
+
+        self.load_button = QPushButton('Загрузить данные')
+        self.load_button.clicked.connect(self.request_fetch)
+        self.layout.addWidget(self.load_button)
+
+        self.status_label = QLabel('Статус: Готов')
+        self.layout.addWidget(self.status_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.hide()
+        self.layout.addWidget(self.progress_bar)
+
+        self.text_edit = QTextEdit()
+        self.layout.addWidget(self.text_edit)
+
+        self.init_extra_widgets()
+
+        self.status_bar = QStatusBar()
+        self.layout.addWidget(self.status_bar)
+
+        self.setLayout(self.layout)
+
+        self.signals = LoaderSignals()
+        self.signals.cycle_started.connect(self.on_cycle_started)
+        self.signals.not_modified.connect(self.on_not_modified)
+        self.signals.progress.connect(self.on_progress)
+        self.signals.data_saved.connect(self.on_data_saved)
+        self.signals.error_occurred.connect(self.on_error)
+        # Движок (requests, SQLite, потоки) создаётся после показа окна,
+        # в первой итерации цикла событий: первая отрисовка его не ждёт
+        self.options = options or {}
+        self.db_name = self.options.get('db_path', 'posts.db')
+        self.loader = None
+        self.fetch_requested = False
+        QTimer.singleShot(0, self.start_loader)
+
+    def init_extra_widgets(self):
+        pass
+
+    def start_loader(self):
+        # Опрос раз в 10 с: не больше одного цикла одновременно, отступ после ошибок,
+        # реже - пока данные не меняются
+        self.loader = PostLoader(**self.options, on_event=self.signals.emit_event)
+        self.loader.start()
+        if self.fetch_requested:
+            self.loader.trigger_now()
+
+    def request_fetch(self):
+        # Нажатие во время идущего цикла сливается в один повтор после него
+        if self.loader is None:
+            self.fetch_requested = True
+            return
+        self.loader.trigger_now()
+
+    def on_cycle_started(self):
+        self.status_label.setText('Статус: Загрузка данных...')
+        self.progress_bar.show()
+        self.load_button.setEnabled(False)
+
+    def finish_cycle(self):
+        self.progress_bar.hide()
+        self.load_button.setEnabled(True)
+        self.status_bar.showMessage(self.pipeline_summary())
+
+    def on_progress(self, stats):
+        self.status_label.setText(f"Статус: Загрузка и сохранение... ({stats['stored']} записей)")
+        self.status_bar.showMessage(self.pipeline_summary(stats))
+
+    def pipeline_summary(self, stats=None):
+        stats = stats or self.loader.pipeline.snapshot()
+        schedule = self.loader.scheduler.snapshot()
+        return (f"загрузка: {stats['fetch_rate']:.0f} зап/с, запись: {stats['store_rate']:.0f} зап/с, "
+                f"в очереди: {stats['backlog']} (макс. {stats['max_backlog']}) | "
+                f"цикл: {schedule['last_duration']:.2f} с, пропущено тиков: {schedule['skipped_ticks']}, "
+                f"ошибок подряд: {schedule['consecutive_errors']}, "
+                f"следующий через {schedule['next_in']:.0f} с")
+
+    def on_not_modified(self):
+        self.status_label.setText(f'Статус: Данные не изменились ({self.cache_summary()})')
+        self.finish_cycle()
+
+    def cache_summary(self):
+        stats = self.loader.stats()['cache']
+        if stats is None:
+            return "без кэша"
+        return (f"кэш: попаданий {stats['hits']}, 304: {stats['revalidated']}, "
+                f"промахов {stats['misses']}, сэкономлено {stats['bytes_saved'] // 1024} КБ")
+
+    def on_data_saved(self, counts):
+        self.status_label.setText(
+            f"Статус: Данные сохранены: добавлено {counts['inserted']}, обновлено {counts['updated']}, "
+            f"без изменений {counts['unchanged']} ({self.cache_summary()})"
+        )
+        self.finish_cycle()
+        self.update_display()
+
+    def on_error(self, error_msg):
+        self.status_label.setText(f'Статус: Ошибка - {error_msg}')
+        self.finish_cycle()
+
+    def update_display(self):
+        try:
+            rows = self.loader.first_posts(10)
+            display_text = ''
+            for row in rows:
+                display_text += f'ID: {row[0]}, UserID: {row[1]}, Title: {row[2]}, Body: {row[3]}\n\n'
+            self.text_edit.setText(display_text)
+        except Exception as e:
+            self.status_label.setText(f'Статус: Ошибка при отображении - {str(e)}')
+
+    def closeEvent(self, event):
+        if self.loader is not None:
+            self.loader.close()
+        super().closeEvent(event)
+
+
+def run_window(window_class):
+    # Те же параметры движка, что у loader.py; остальные аргументы - для Qt
+    parser = add_loader_arguments(argparse.ArgumentParser(description="Загрузчик постов (GUI)"))
+    args, qt_args = parser.parse_known_args()
+    export = start_metrics(args)
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = window_class(loader_options(args))
+    window.show()
+    code = app.exec_()
+    if export is not None:
+        export.close()
+    sys.exit(code)
@@ -0,0 +1,351 @@
+import os
+import sys
+import json
+import math
+import time
+import signal
+import bisect
+import threading
+from collections import Counter
+
+# Метрики процесса: счётчики, значения (gauge) и гистограммы (задержки, размеры).
+# По умолчанию выключены: вызов inc/observe/timer тогда сводится к проверке флага,
+# так что расставленные по коду точки замера ничего не стоят.
+# Включаются enable() или флагами --metrics-port / --metrics-dump (add_metrics_arguments).
+#
+#   with metrics.timer('fetch_seconds'):          # задержка + fetch_errors_total при исключении
+#       ...
+#   metrics.inc('fetch_items_total', len(batch))
+#
+# Снимок отдаётся в формате Prometheus (/metrics), JSON (/metrics.json или файл),
+# стеки горячих мест - выборочным профилировщиком (/profile?seconds=5, SIGUSR2).
+
+# Границы корзин гистограммы задержек, секунды
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Границы для размеров (строк в пачке, байт в сообщении)
+SIZE_BUCKETS = tuple(4 ** i for i in range(12))
+PERCENTILES = (0.5, 0.9, 0.99)
+# Пределы /profile: не дольше минуты и не чаще раза в миллисекунду - иначе
+# выборка стеков сама загрузит профилируемый процесс
+PROFILE_MAX_SECONDS = 60.0
+PROFILE_MIN_INTERVAL = 0.001
+
+
+class Histogram:
+    # Счётчики по корзинам; перцентили оцениваются интерполяцией внутри корзины
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def snapshot(self):
+        result = {'count': self.count, 'sum': self.sum, 'max': self.max,
+                  'mean': self.sum / self.count if self.count else 0.0}
+        for q in PERCENTILES:
+            result[f'p{int(q * 100)}'] = self.percentile(q)
+        return result
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+        if exc_type is not None:
+            base = self.name[:-len('_seconds')] if self.name.endswith('_seconds') else self.name
+            self.registry.inc(f'{base}_errors_total', 1, self.labels)
+        return False
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+class Registry:
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, labels=None):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, name, labels=None):
+        return _Timer(self, name, labels) if self.enabled else _NULL_TIMER
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'time': time.time(),
+                'counters': {_flat(k): v for k, v in self.counters.items()},
+                'gauges': {_flat(k): v for k, v in self.gauges.items()},
+                'histograms': {_flat(k): h.snapshot() for k, h in self.histograms.items()},
+            }
+
+    def to_prometheus(self):
+        lines = []
+        with self.lock:
+            for kind, values in (('counter', self.counters), ('gauge', self.gauges)):
+                for name in sorted({key[0] for key in values}):
+                    lines.append(f'# TYPE {name} {kind}')
+                    lines.extend(f'{name}{_prom_labels(labels)} {value}'
+                                 for (n, labels), value in values.items() if n == name)
+            for name in sorted({key[0] for key in self.histograms}):
+                lines.append(f'# TYPE {name} histogram')
+                for (n, labels), histogram in self.histograms.items():
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_prom_labels(labels + (("le", bound),))} {cumulative}')
+                    lines.append(f'{name}_sum{_prom_labels(labels)} {histogram.sum}')
+                    lines.append(f'{name}_count{_prom_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _flat(key):
+    name, labels = key
+    return f"{name}{{{','.join(f'{k}={v}' for k, v in labels)}}}" if labels else name
+
+
+def _prom_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+set_value = REGISTRY.set
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+snapshot = REGISTRY.snapshot
+to_prometheus = REGISTRY.to_prometheus
+
+
+def enable(enabled=True):
+    REGISTRY.enabled = enabled
+
+
+def enabled():
+    return REGISTRY.enabled
+
+
+def sample_stacks(seconds=5.0, interval=0.005):
+    # Выборочный профилировщик: раз в interval снимаются стеки всех потоков,
+    # кроме собственного. Результат - Counter {стек "модуль:функция:строка;...": число выборок}
+    # (формат collapsed stacks, из него строится flame graph)
+    own = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            parts = []
+            while frame is not None:
+                code = frame.f_code
+                parts.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+                frame = frame.f_back
+            stacks[';'.join(reversed(parts))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def format_stacks(stacks):
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def install_profile_signal(path='profile.stacks', seconds=5.0, signum=getattr(signal, 'SIGUSR2', None)):
+    # kill -USR2 <pid> - записать стеки за следующие seconds секунд в path
+    if signum is None:
+        return
+
+    def on_signal(*_):
+        def work():
+            stacks = format_stacks(sample_stacks(seconds))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(stacks)
+        threading.Thread(target=work, name='metrics-profile', daemon=True).start()
+
+    signal.signal(signum, on_signal)
+
+
+def _handler_class():
+    # http.server нужен только при выгрузке по HTTP: не импортируется при старте программ
+    from urllib.parse import urlparse, parse_qs
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/metrics':
+                self._reply(to_prometheus(), 'text/plain; version=0.0.4')
+            elif url.path == '/metrics.json':
+                self._reply(json.dumps(snapshot()), 'application/json')
+            elif url.path == '/profile':
+                query = parse_qs(url.query)
+                try:
+                    seconds = float(query.get('seconds', ['5'])[0])
+                    interval = float(query.get('interval', ['0.005'])[0])
+                except ValueError:
+                    seconds = interval = math.nan
+                if not (math.isfinite(seconds) and math.isfinite(interval)):
+                    self.send_error(400, "seconds and interval must be finite numbers")
+                    return
+                seconds = min(max(seconds, 0.0), PROFILE_MAX_SECONDS)
+                interval = max(interval, PROFILE_MIN_INTERVAL)
+                self._reply(format_stacks(sample_stacks(seconds, interval)), 'text/plain')
+            else:
+                self.send_error(404)
+
+        def _reply(self, text, content_type):
+            body = text.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsExport:
+    # HTTP-эндпоинт и/или периодический JSON-снимок; close() останавливает оба
+
+    def __init__(self, port=None, dump_path=None, interval=10.0, host='127.0.0.1'):
+        self.server = None
+        self.dump_path = dump_path
+        self.interval = interval
+        self.stopping = threading.Event()
+        self.dump_thread = None
+        if port is not None:
+            from http.server import ThreadingHTTPServer
+            self.server = ThreadingHTTPServer((host, port), _handler_class())
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+        if dump_path:
+            self.dump_thread = threading.Thread(target=self._dump_loop, name='metrics-dump', daemon=True)
+            self.dump_thread.start()
+
+    @property
+    def port(self):
+        return self.server.server_address[1] if self.server else None
+
+    def dump(self):
+        part_path = self.dump_path + '.part'
+        with open(part_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot(), f)
+        os.replace(part_path, self.dump_path)
+
+    def _dump_loop(self):
+        while not self.stopping.wait(self.interval):
+            self.dump()
+
+    def close(self):
+        self.stopping.set()
+        if self.dump_thread is not None:
+            self.dump_thread.join()
+            self.dump()  # последний снимок при выходе
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics-port', type=int, help="HTTP-порт: /metrics (Prometheus), /metrics.json, /profile")
+    parser.add_argument('--metrics-dump', help="файл для периодического снимка метрик в JSON")
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help="период снимка, с")
+    return parser
+
+
+def start_metrics(args):
+    # Метрики включаются, только если задан способ их выгрузки; None - выключены
+    if args.metrics_port is None and not args.metrics_dump:
+        return None
+    enable()
+    install_profile_signal()
+    return MetricsExport(args.metrics_port, args.metrics_dump, args.metrics_interval)
@@ -0,0 +1,134 @@
+import time
+import random
+import threading
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+
+
+class PollScheduler:
+    # Периодический запуск циклов опроса в отдельном потоке:
+    # - одновременно идёт не больше одного цикла; тики, пришедшиеся на идущий
+    #   цикл, пропускаются (считаются) и сливаются в один запуск сразу после него;
+    # - ручные запросы во время цикла тоже сливаются в один повтор;
+    # - после ошибок пауза растёт экспоненциально до max_backoff, со случайным разбросом,
+    #   чтобы несколько клиентов не повторяли запросы одновременно;
+    # - пока данные не меняются, интервал растёт до max_interval, при изменении
+    #   возвращается к базовому;
+    # - stop() прерывает ожидание и дожидается потока.
+    # start_cycle() только запускает цикл; о его завершении сообщают
+    # вызовом finished(outcome) с CHANGED, UNCHANGED или ERROR (из любого потока).
+
+    def __init__(self, start_cycle, interval=10.0, max_interval=None, growth=1.5,
+                 max_backoff=300.0, jitter=0.1):
+        self.start_cycle = start_cycle
+        self.interval = interval
+        self.max_interval = max_interval if max_interval is not None else interval * 6
+        self.growth = growth
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopping = False
+        self.in_flight = False
+        self.pending = False
+        self.current_interval = interval
+        self.next_due = 0.0
+        self.cycle_start = 0.0
+
+        self.cycles = 0
+        self.completed = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.skipped_ticks = 0
+        self.coalesced_triggers = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+
+    def start(self, delay=None):
+        with self.cond:
+            self.next_due = time.monotonic() + (self.interval if delay is None else delay)
+        self.thread = threading.Thread(target=self._run, name='poll-scheduler', daemon=True)
+        self.thread.start()
+
+    def trigger_now(self):
+        with self.cond:
+            if self.in_flight or self.pending:
+                self.coalesced_triggers += 1
+            self.pending = True
+            self.cond.notify()
+
+    def stop(self, timeout=None):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def finished(self, outcome):
+        with self.cond:
+            if not self.in_flight:
+                return
+            now = time.monotonic()
+            self.in_flight = False
+            self.completed += 1
+            self.last_duration = now - self.cycle_start
+            self.total_duration += self.last_duration
+
+            if outcome == ERROR:
+                self.errors += 1
+                self.consecutive_errors += 1
+                backoff = min(self.max_backoff, self.interval * 2 ** self.consecutive_errors)
+                # Пауза случайна в пределах [backoff/2, backoff]: повторы клиентов расходятся во времени
+                self.next_due = now + random.uniform(backoff / 2, backoff)
+            else:
+                self.consecutive_errors = 0
+                if outcome == CHANGED:
+                    self.current_interval = self.interval
+                else:
+                    self.current_interval = min(self.max_interval, self.current_interval * self.growth)
+                self.next_due = self.cycle_start + self._jittered(self.current_interval)
+                if self.next_due < now:
+                    # Цикл длиннее интервала: пропущенные тики не копятся, а дают один запуск
+                    self.skipped_ticks += int((now - self.next_due) / self.current_interval) + 1
+                    self.next_due = now
+            self.cond.notify()
+
+    def _jittered(self, delay):
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def snapshot(self):
+        with self.cond:
+            return {
+                'cycles': self.cycles,
+                'errors': self.errors,
+                'consecutive_errors': self.consecutive_errors,
+                'skipped_ticks': self.skipped_ticks,
+                'coalesced_triggers': self.coalesced_triggers,
+                'in_flight': self.in_flight,
+                'interval': self.current_interval,
+                'last_duration': self.last_duration,
+                'avg_duration': self.total_duration / self.completed if self.completed else 0.0,
+                'next_in': max(0.0, self.next_due - time.monotonic()),
+            }
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.stopping:
+                    if not self.in_flight and (self.pending or time.monotonic() >= self.next_due):
+                        break
+                    timeout = None if self.in_flight else self.next_due - time.monotonic()
+                    self.cond.wait(timeout)
+                if self.stopping:
+                    return
+                self.pending = False
+                self.in_flight = True
+                self.cycle_start = time.monotonic()
+                self.cycles += 1
+            try:
+                self.start_cycle()
+            except Exception:
+                self.finished(ERROR)
@@ -0,0 +1,80 @@
+import os
+import json
+
+import numpy as np
+
+from common.columnar_cache import open_cached, source_signature, write_columns
+from common.post_records import PostBatch
+
+# Посты в столбцовом кэше (common.columnar_cache): повторный запуск не разбирает
+# JSON заново, а отображает в память уже разобранные столбцы.
+
+
+def posts_columns(posts):
+    if isinstance(posts, PostBatch):
+        # Столбцы пачки уже в нужном виде: массивы NumPy поверх буферов array('q') без копии
+        return {'id': np.frombuffer(posts.ids, dtype=np.int64),
+                'userId': np.frombuffer(posts.user_ids, dtype=np.int64),
+                'title': posts.titles, 'body': posts.bodies}
+    return {
+        'id': np.fromiter((post['id'] for post in posts), dtype=np.int64, count=len(posts)),
+        'userId': np.fromiter((post['userId'] for post in posts), dtype=np.int64, count=len(posts)),
+        'title': [post['title'] for post in posts],
+        'body': [post['body'] for post in posts],
+    }
+
+
+class PostColumns:
+    # Последовательность постов-словарей поверх столбцов: подходит везде, где
+    # ожидается список из ApiClient.get_posts (например, sync_posts).
+    # Числовые столбцы (ids, user_ids) доступны как массивы NumPy без копирования
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.ids = columns.column('id')
+        self.user_ids = columns.column('userId')
+        self.titles = columns.column('title')
+        self.bodies = columns.column('body')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return {'userId': int(self.user_ids[i]), 'id': int(self.ids[i]),
+                'title': self.titles[i], 'body': self.bodies[i]}
+
+    def __iter__(self):
+        for post_id, user_id, title, body in self.rows():
+            yield {'userId': user_id, 'id': post_id, 'title': title, 'body': body}
+
+    def rows(self):
+        # Кортежи (id, userId, title, body) для записи в SQLite (common.bulk_load.post_rows)
+        return zip(self.ids.tolist(), self.user_ids.tolist(), self.titles, self.bodies)
+
+
+def load_posts_json(json_path, cache_path=None):
+    # Посты из JSON-файла (например, тела ответа в HttpCache) через столбцовый кэш
+    def build():
+        with open(json_path, 'rb') as f:
+            return posts_columns(json.load(f))
+
+    return PostColumns(open_cached(cache_path or json_path + '.columns', json_path, build))
+
+
+def fetch_posts_cached(client, path='/posts'):
+    # Посты с сервера с учётом HttpCache клиента (нужен кэш на диске):
+    # - ответ изменился - JSON разбирается потоком в PostBatch, столбцы сразу пишутся
+    #   рядом с телом ответа;
+    # - не изменился (свежая запись или 304) - посты читаются из столбцов без разбора JSON
+    url = client.url(path)
+    items = client.iter_json_if_modified(path)
+    cache = client.cache
+    body_path = cache.body_path(url) if cache is not None and cache.cache_dir else None
+    if items is not None:
+        posts = PostBatch.from_posts(items)  # тело ответа записано в кэш целиком
+        if body_path is not None and os.path.exists(body_path):
+            write_columns(cache.columns_path(url), posts_columns(posts), source_signature(body_path))
+        return posts
+    if body_path is None:
+        return PostBatch.from_posts(client.get_json(path))
+    return load_posts_json(body_path, cache.columns_path(url))
@@ -0,0 +1,119 @@
+import os
+import hashlib
+import threading
+
+from common import metrics
+
+# Движок загрузчика постов без GUI: HTTP-клиент с кэшем, конвейер
+# загрузки/записи и планировщик опроса. Используется и окном LabWork5
+# (тонкий клиент), и консольным loader.py - PyQt5 здесь не импортируется.
+# requests, sqlite3 и остальной движок импортируются при создании PostLoader:
+# разбор аргументов и показ окна их не ждут.
+
+
+def add_loader_arguments(parser):
+    parser.add_argument('--db', default='posts.db', help="файл SQLite")
+    parser.add_argument('--base-url', help="адрес API (по умолчанию POSTS_API_URL или jsonplaceholder)")
+    parser.add_argument('--path', action='append', dest='paths',
+                        help="путь для загрузки, можно несколько (по умолчанию /posts)")
+    parser.add_argument('--interval', type=float, default=10.0, help="интервал опроса, с")
+    parser.add_argument('--batch-size', type=int, default=500, help="постов в пачке записи")
+    parser.add_argument('--concurrency', type=int, default=1, help="параллельных загрузок путей")
+    parser.add_argument('--cache-dir', default='.http_cache', help="каталог HTTP-кэша ('' - без кэша)")
+    parser.add_argument('--shards', type=int, default=1, help="число файлов-шардов БД (по хэшу userId)")
+    return metrics.add_metrics_arguments(parser)
+
+
+def loader_options(args):
+    return {
+        'db_path': args.db,
+        'base_url': args.base_url,
+        'paths': args.paths or ['/posts'],
+        'interval': args.interval,
+        'batch_size': args.batch_size,
+        'concurrency': args.concurrency,
+        'cache_dir': args.cache_dir,
+        'shards': args.shards,
+    }
+
+
+def cache_scope(db_path, shards):
+    # Подкаталог HTTP-кэша для хранилища назначения: свежая запись и 304 значат
+    # «эти данные уже записаны», а это верно только для той БД, куда их записали
+    destination = f"{os.path.abspath(db_path)}|{shards}"
+    return hashlib.sha1(destination.encode('utf-8')).hexdigest()[:16]
+
+
+class PostLoader:
+    # События передаются в on_event(kind, payload) из рабочих потоков:
+    # 'cycle_started' и события конвейера ('not_modified', 'progress', 'saved', 'error')
+
+    def __init__(self, db_path='posts.db', base_url=None, paths=('/posts',), interval=10.0,
+                 batch_size=500, concurrency=1, queue_size=4, cache_dir='.http_cache', cache_ttl=5.0,
+                 shards=1, on_event=None):
+        from common.api_client import ApiClient, BASE_URL
+        from common.http_cache import HttpCache
+        from common.poll_scheduler import PollScheduler
+        from common.post_pipeline import PostPipeline
+        base_url = base_url or BASE_URL
+        self.db_path = db_path
+        self.shards = shards
+        self.on_event = on_event or (lambda kind, payload: None)
+        self.http_cache = None
+        if cache_dir:
+            self.http_cache = HttpCache(os.path.join(cache_dir, cache_scope(db_path, shards)), ttl=cache_ttl)
+        self.client = ApiClient(base_url, pool_size=max(10, concurrency), cache=self.http_cache)
+        self.pipeline = PostPipeline(self.client, db_path, paths, batch_size, queue_size, concurrency,
+                                     on_event=self._on_pipeline_event, shards=shards)
+        self.scheduler = PollScheduler(self._start_cycle, interval=interval)
+        self.cycle_done = threading.Event()
+        self.last_result = None
+
+    def start(self, delay=None):
+        self.scheduler.start(delay)
+
+    def trigger_now(self):
+        self.scheduler.trigger_now()
+
+    def run_once(self, timeout=None):
+        # Один цикл без планировщика: (событие, данные) итога цикла
+        self.cycle_done.clear()
+        self.on_event('cycle_started', None)
+        self.pipeline.trigger()
+        if not self.cycle_done.wait(timeout):
+            return 'error', "Цикл не завершился вовремя"
+        return self.last_result
+
+    def first_posts(self, limit=10):
+        # Первые посты по id: из posts.db или слиянием шардов
+        from common.post_shards import ShardedPosts
+        with ShardedPosts(self.db_path, self.shards) as storage:
+            return storage.all_posts(limit)
+
+    def stats(self):
+        return {
+            'pipeline': self.pipeline.snapshot(),
+            'scheduler': self.scheduler.snapshot(),
+            'cache': self.http_cache.stats() if self.http_cache is not None else None,
+            'metrics': metrics.snapshot() if metrics.enabled() else None,
+        }
+
+    def close(self, timeout=5.0):
+        self.scheduler.stop(timeout)
+        self.pipeline.close(timeout)
+        self.client.close()
+
+    def _start_cycle(self):
+        # Вызывается из потока планировщика
+        self.on_event('cycle_started', None)
+        self.pipeline.trigger()
+
+    def _on_pipeline_event(self, kind, payload):
+        # Событие уходит подписчику раньше, чем планировщик сможет запустить следующий цикл
+        from common.post_pipeline import cycle_outcome
+        self.on_event(kind, payload)
+        outcome = cycle_outcome(kind, payload)
+        if outcome is not None:
+            self.last_result = (kind, payload)
+            self.cycle_done.set()
+            self.scheduler.finished(outcome)
@@ -0,0 +1,296 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from common import metrics
+from common.bulk_load import open_bulk_connection
+from common.poll_scheduler import CHANGED, UNCHANGED, ERROR
+from common.post_records import PostBatch
+from common.post_sync import sync_post_batch
+from common.post_shards import ShardedPosts, shard_paths
+
+POSTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS posts (
+        id INTEGER PRIMARY KEY,
+        userId INTEGER,
+        title TEXT,
+        body TEXT
+    )
+'''
+
+# Маркеры в очереди между стадиями
+_END = 'end'
+_BATCH = 'batch'
+_ERROR = 'error'
+
+
+def cycle_outcome(kind, payload):
+    # Событие конвейера -> итог цикла для планировщика (None - цикл ещё идёт)
+    if kind == 'not_modified':
+        return UNCHANGED
+    if kind == 'saved':
+        changed = payload['inserted'] or payload['updated'] or payload['deleted']
+        return CHANGED if changed else UNCHANGED
+    if kind == 'error':
+        return ERROR
+    return None
+
+
+class PipelineStats:
+    # Счётчики стадий: пишутся из потоков конвейера, читаются снимком snapshot()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cycles = 0
+        self.parsed = 0
+        self.stored = 0
+        self.batches = 0
+        self.max_backlog = 0
+        # Время стадии загрузки включает ожидание сети и разбор, но не ожидание очереди
+        self.parse_seconds = 0.0
+        self.store_seconds = 0.0
+        self.last_cycle_seconds = 0.0
+
+    def add(self, **values):
+        with self.lock:
+            for name, value in values.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self, backlog):
+        with self.lock:
+            self.max_backlog = max(self.max_backlog, backlog)
+            return {
+                'cycles': self.cycles,
+                'parsed': self.parsed,
+                'stored': self.stored,
+                'batches': self.batches,
+                'backlog': backlog,
+                'max_backlog': self.max_backlog,
+                'fetch_rate': self.parsed / self.parse_seconds if self.parse_seconds else 0.0,
+                'store_rate': self.stored / self.store_seconds if self.store_seconds else 0.0,
+                'last_cycle_seconds': self.last_cycle_seconds,
+            }
+
+
+class PostPipeline:
+    # Постоянный конвейер загрузки -> разбора -> записи постов:
+    # - загрузка читает ответы потоком и разбирает элементы JSON-массива
+    #   по одному, складывая их в пачки по batch_size; несколько путей
+    #   (например, /posts?userId=N) загружаются параллельно в concurrency потоков;
+    # - поток записи сохраняет пачки в своём долгоживущем соединении;
+    # - между стадиями ограниченная очередь: если запись отстаёт, загрузка ждёт,
+    #   так что в памяти не больше queue_size + 2 пачек при любом размере ответа.
+    # События передаются в on_event(kind, payload) из рабочих потоков:
+    # 'not_modified', 'progress' (stats), 'saved' (counts), 'error' (сообщение).
+    # При shards > 1 пачка раскладывается по файлам-шардам (common.post_shards),
+    # шарды пишутся параллельно.
+
+    def __init__(self, client, db_path='posts.db', paths=('/posts',), batch_size=500, queue_size=4,
+                 concurrency=1, on_event=None, shards=1):
+        self.client = client
+        self.db_path = db_path
+        self.shards = shards
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.batch_size = batch_size
+        self.executor = ThreadPoolExecutor(concurrency, thread_name_prefix='pipeline-fetch')
+        self.on_event = on_event or (lambda kind, payload: None)
+        self.stats = PipelineStats()
+        self.cycles = queue.Queue()
+        self.stopping = threading.Event()
+        self.batches = queue.Queue(maxsize=queue_size)
+        # Пути циклов, ответы которых получены, но ещё не записаны до конца:
+        # при закрытии их записи в HTTP-кэше сбрасываются
+        self.unstored = Counter()
+        self.unstored_lock = threading.Lock()
+        self.fetch_thread = threading.Thread(target=self._fetch_loop, name='pipeline-fetch', daemon=True)
+        self.store_thread = threading.Thread(target=self._store_loop, name='pipeline-store', daemon=True)
+        self.fetch_thread.start()
+        self.store_thread.start()
+
+    def trigger(self):
+        self.cycles.put(time.perf_counter())
+
+    def snapshot(self):
+        return self.stats.snapshot(self.batches.qsize())
+
+    def close(self, timeout=None):
+        # Идущий цикл прерывается между элементами, недописанные пачки отбрасываются,
+        # а ответы незавершённых циклов забываются HTTP-кэшем: после перезапуска
+        # они загрузятся заново, а не будут пропущены как неизменившиеся
+        self.stopping.set()
+        self.cycles.put(None)
+        self.fetch_thread.join(timeout)
+        self.store_thread.join(timeout)
+        with self.unstored_lock:
+            unstored = list(+self.unstored)
+            self.unstored.clear()
+        for path in unstored:
+            self.client.invalidate(path)
+
+    def _put(self, kind, payload):
+        self.batches.put((kind, payload))
+        backlog = self.batches.qsize()
+        self.stats.snapshot(backlog)
+        metrics.set_value('pipeline_backlog', backlog)
+
+    def _fetch_loop(self):
+        while True:
+            started = self.cycles.get()
+            if started is None:
+                self.executor.shutdown(wait=True)
+                self.batches.put(None)
+                return
+            if not self._target_has_posts():
+                # БД новая, удалена или пуста: свежая запись кэша или 304 скрыли бы
+                # от неё данные - пути загружаются безусловно
+                for path in self.paths:
+                    self.client.invalidate(path)
+            # Пути, ответы которых получены в этом цикле (их тела уже могут быть в HTTP-кэше)
+            fetched = []
+            futures = [self.executor.submit(self._fetch_path, path, fetched) for path in self.paths]
+            error = None
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    error = error or str(e)
+            if error is not None:
+                # Уже сохранённые пачки остаются: синхронизация идемпотентна
+                self._put(_ERROR, (error, fetched))
+            elif not fetched:
+                self.stats.add(cycles=1)
+                self.on_event('not_modified', None)
+            else:
+                self._put(_END, (started, fetched))
+
+    def _target_has_posts(self):
+        # Все файлы хранилища на месте, и в них есть хотя бы один пост
+        found = False
+        for path in shard_paths(self.db_path, self.shards):
+            if not os.path.exists(path):
+                return False
+            conn = sqlite3.connect(path)
+            try:
+                found = found or conn.execute('SELECT 1 FROM posts LIMIT 1').fetchone() is not None
+            except sqlite3.OperationalError:
+                return False  # таблицы ещё нет (или БД недоступна - запись сообщит об ошибке)
+            finally:
+                conn.close()
+        return found
+
+    def _fetch_path(self, path, fetched):
+        with metrics.timer('fetch_seconds'):
+            self._fetch_items(path, fetched)
+
+    def _fetch_items(self, path, fetched):
+        items = self.client.iter_json_if_modified(path)
+        if items is None:
+            metrics.inc('fetch_not_modified_total')  # ответ не изменился (кэш или 304)
+            return
+        fetched.append(path)
+        with self.unstored_lock:
+            self.unstored[path] += 1
+        # Словарь из разбора сразу раскладывается по столбцам пачки и освобождается
+        batch = PostBatch()
+        parse_start = time.perf_counter()
+        for item in items:
+            if self.stopping.is_set():
+                items.close()
+                raise RuntimeError("Цикл отменён")
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                self.stats.add(parsed=len(batch), parse_seconds=time.perf_counter() - parse_start)
+                metrics.inc('fetch_items_total', len(batch))
+                self._put(_BATCH, batch)
+                batch = PostBatch()
+                parse_start = time.perf_counter()
+        self.stats.add(parsed=len(batch), parse_seconds=time.perf_counter() - parse_start)
+        metrics.inc('fetch_items_total', len(batch))
+        if batch:
+            self._put(_BATCH, batch)
+
+    def _open_store(self):
+        if self.shards > 1:
+            conn = ShardedPosts(self.db_path, self.shards)
+            return conn, conn.sync_batch
+        conn = open_bulk_connection(self.db_path)
+        try:
+            conn.execute(POSTS_SCHEMA)
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        return conn, lambda posts: sync_post_batch(conn, posts)
+
+    def _store_loop(self):
+        # Соединение открывается при первой пачке и переоткрывается после неудачи
+        # открытия (например, БД заблокирована): ошибка достаётся циклу, а не потоку
+        conn = store_batch = None
+        counts = dict.fromkeys(('inserted', 'updated', 'deleted', 'unchanged'), 0)
+        error = None
+        skipped = 0
+        try:
+            while True:
+                message = self.batches.get()
+                if message is None:
+                    return
+                kind, payload = message
+                if kind == _BATCH:
+                    if error is not None or self.stopping.is_set():
+                        # Цикл уже не удался или отменён: остаток его пачек дочитывается
+                        # из очереди без записи, цикл целиком считается неудавшимся
+                        skipped += 1
+                        metrics.inc('store_batches_skipped_total')
+                        continue
+                    store_start = time.perf_counter()
+                    try:
+                        if conn is None:
+                            conn, store_batch = self._open_store()
+                        with metrics.timer('store_batch_seconds'):
+                            batch_counts = store_batch(payload)
+                    except Exception as e:
+                        error = str(e)
+                        skipped += 1
+                        metrics.inc('store_batches_skipped_total')
+                        continue
+                    for name, value in batch_counts.items():
+                        counts[name] += value
+                        metrics.inc('store_rows_total', value, {'result': name})
+                    self.stats.add(stored=len(payload), batches=1,
+                                   store_seconds=time.perf_counter() - store_start)
+                    self.on_event('progress', self.snapshot())
+                    continue
+
+                if kind == _ERROR:
+                    payload_error, fetched = payload
+                    error = error or payload_error
+                else:
+                    started, fetched = payload
+                with self.stats.lock:
+                    self.stats.cycles += 1
+                    if kind == _END:
+                        self.stats.last_cycle_seconds = time.perf_counter() - started
+                with self.unstored_lock:
+                    self.unstored.subtract(fetched)
+                if error is None and skipped:
+                    error = "Цикл отменён"  # пачки пропущены из-за закрытия конвейера
+                if error is not None and skipped:
+                    error = f"{error} (не записано пачек: {skipped})"
+                if error is None:
+                    self.on_event('saved', counts)
+                else:
+                    # HTTP-кэш уже хранит ответы цикла: без сброса следующий опрос
+                    # получит 304 и недописанные данные так и не попадут в БД
+                    for path in fetched:
+                        self.client.invalidate(path)
+                    self.on_event('error', error)
+                counts = dict.fromkeys(counts, 0)
+                error = None
+                skipped = 0
+        finally:
+            if conn is not None:
+                conn.close()
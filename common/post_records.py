@@ -0,0 +1,65 @@
+from array import array
+from collections import namedtuple
+
+# Компактное представление постов вместо списков словарей из JSON.
+# PostBatch хранит посты столбцами: id и userId - в array('q') по 8 байт,
+# title и body - списки ссылок на строки. Словарь из разбора JSON живёт только
+# до append, на пост остаётся ~32 байта плюс сами строки (словарь с двумя int - ~240).
+# rows() отдаёт кортежи (id, userId, title, body) в порядке столбцов таблицы posts:
+# они передаются в executemany как есть, без промежуточных словарей и копий строк.
+
+POST_FIELDS = ('id', 'userId', 'title', 'body')
+
+# Отдельный пост: кортеж с именованными полями (без __dict__), годится как параметры SQLite
+Post = namedtuple('Post', POST_FIELDS)
+
+
+class PostBatch:
+
+    __slots__ = ('ids', 'user_ids', 'titles', 'bodies')
+
+    def __init__(self):
+        self.ids = array('q')
+        self.user_ids = array('q')
+        self.titles = []
+        self.bodies = []
+
+    @classmethod
+    def from_posts(cls, posts):
+        # Пачка из любого источника постов (словари, PostColumns); пачка возвращается как есть
+        if isinstance(posts, cls):
+            return posts
+        batch = cls()
+        batch.extend(posts)
+        return batch
+
+    def add(self, post_id, user_id, title, body):
+        self.ids.append(post_id)
+        self.user_ids.append(user_id)
+        self.titles.append(title)
+        self.bodies.append(body)
+
+    def append(self, post):
+        # post - словарь из JSON API
+        self.add(post['id'], post['userId'], post['title'], post['body'])
+
+    def extend(self, posts):
+        rows = getattr(posts, 'rows', None)
+        if rows is not None:
+            for row in rows():
+                self.add(*row)
+        else:
+            for post in posts:
+                self.append(post)
+
+    def rows(self):
+        return zip(self.ids, self.user_ids, self.titles, self.bodies)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return Post(self.ids[i], self.user_ids[i], self.titles[i], self.bodies[i])
+
+    def __iter__(self):
+        return map(Post._make, self.rows())
@@ -0,0 +1,224 @@
+import os
+import json
+import heapq
+import sqlite3
+import threading
+from itertools import islice
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from common import metrics
+from common.bulk_load import tune_connection, post_rows
+from common.post_records import PostBatch
+from common.post_sync import sync_posts, sync_post_batch
+
+# Посты, разложенные по N файлам SQLite по хэшу userId. У каждого файла своя
+# блокировка на запись, поэтому пачки разных шардов пишутся параллельно.
+# Запросы по пользователю идут в его шард, остальные - во все шарды сразу
+# (пул потоков или процессов), результаты сливаются по id.
+
+SHARD_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS posts (
+        id INTEGER PRIMARY KEY,
+        userId INTEGER,
+        title TEXT,
+        body TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_posts_userId ON posts (userId);
+'''
+
+_COUNT_KEYS = ('inserted', 'updated', 'deleted', 'unchanged')
+
+
+def shard_paths(db_path, shards):
+    # posts.db при 4 шардах -> posts.0-of-4.db ... posts.3-of-4.db; один шард - сам db_path
+    if shards == 1:
+        return [db_path]
+    root, ext = os.path.splitext(db_path)
+    return [f"{root}.{i}-of-{shards}{ext}" for i in range(shards)]
+
+
+def shard_of(user_id, shards):
+    # Мультипликативный хэш: соседние userId попадают в разные шарды
+    return (user_id * 2654435761 & 0xFFFFFFFF) % shards
+
+
+# Соединения на запись, по одному на файл шарда в каждом процессе: пачки потоковой
+# записи не открывают файл и не разбирают схему заново. Замок - чтобы одним
+# соединением не пользовались два потока сразу. Соединение общее для всех
+# ShardedPosts процесса, поэтому закрывается, только когда закрыт последний
+# из них (_users - сколько открытых ShardedPosts пишут в файл)
+_connections = {}
+_users = {}
+_connections_lock = threading.Lock()
+
+
+@contextmanager
+def _shard_connection(path):
+    with _connections_lock:
+        entry = _connections.get(path)
+        if entry is None:
+            conn = tune_connection(sqlite3.connect(path, check_same_thread=False))
+            conn.executescript(SHARD_SCHEMA)
+            entry = _connections[path] = (conn, threading.Lock())
+    conn, lock = entry
+    with lock:
+        yield conn
+
+
+def _acquire_connections(paths):
+    with _connections_lock:
+        for path in paths:
+            _users[path] = _users.get(path, 0) + 1
+
+
+def _release_connections(paths):
+    entries = []
+    with _connections_lock:
+        for path in paths:
+            _users[path] -= 1
+            if not _users[path]:
+                del _users[path]
+                if path in _connections:
+                    entries.append(_connections.pop(path))
+    for conn, lock in entries:
+        with lock:
+            conn.close()
+
+
+def _sync_shard(path, posts, delete_missing):
+    with _shard_connection(path) as conn:
+        return sync_posts(conn, posts, delete_missing)
+
+
+def _sync_shard_batch(path, posts):
+    # Пачка постов своего шарда -> (счётчики, id впервые попавших в этот шард)
+    with _shard_connection(path) as conn:
+        ids = json.dumps(posts.ids.tolist())
+        existing = {row[0] for row in conn.execute(
+            'SELECT id FROM posts WHERE id IN (SELECT value FROM json_each(?))', (ids,)
+        )}
+        counts = sync_post_batch(conn, posts)
+        return counts, [post_id for post_id in posts.ids if post_id not in existing]
+
+
+def _delete_ids(path, ids):
+    with _shard_connection(path) as conn, conn:
+        conn.execute('DELETE FROM posts WHERE id IN (SELECT value FROM json_each(?))', (json.dumps(ids),))
+
+
+def _query_shard(path, sql, params):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'posts'").fetchone():
+            return []  # шард ещё пуст
+        raise
+    finally:
+        conn.close()
+
+
+class ShardedPosts:
+
+    def __init__(self, db_path='posts.db', shards=4, workers=None, processes=False):
+        self.shards = shards
+        self.paths = shard_paths(db_path, shards)
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.executor = executor(workers or shards)
+        self.closed = False
+        _acquire_connections(self.paths)
+
+    def partition(self, posts):
+        # Пачка PostBatch на шард: в пул процессов уходят столбцы, а не словари
+        parts = [PostBatch() for _ in self.paths]
+        for row in post_rows(posts):
+            parts[shard_of(row[1], self.shards)].add(*row)
+        return parts
+
+    def _sum_counts(self, futures):
+        counts = dict.fromkeys(_COUNT_KEYS, 0)
+        for future in futures:
+            for name, value in future.result().items():
+                counts[name] += value
+        return counts
+
+    def sync_posts(self, posts, delete_missing=True):
+        # Полная синхронизация: каждый шард получает все свои посты
+        return self._sum_counts([
+            self.executor.submit(_sync_shard, path, part, delete_missing)
+            for path, part in zip(self.paths, self.partition(posts))
+        ])
+
+    def sync_batch(self, posts):
+        # Пачка из потока постов (как sync_post_batch), без удаления отсутствующих.
+        # Пост, у которого сменился пользователь, впервые появляется в новом шарде:
+        # только такие id удаляются из остальных шардов, чтобы не было двух копий
+        parts = self.partition(posts)
+        futures = {i: self.executor.submit(_sync_shard_batch, self.paths[i], part)
+                   for i, part in enumerate(parts) if part}
+        results = {i: future.result() for i, future in futures.items()}
+        deletes = []
+        for i, path in enumerate(self.paths):
+            foreign = [post_id for j, (_, inserted) in results.items() if j != i for post_id in inserted]
+            if foreign:
+                deletes.append(self.executor.submit(_delete_ids, path, foreign))
+        for future in deletes:
+            future.result()
+        counts = dict.fromkeys(_COUNT_KEYS, 0)
+        for batch_counts, _ in results.values():
+            for name, value in batch_counts.items():
+                counts[name] += value
+        return counts
+
+    def query(self, sql, params=(), limit=None):
+        # Запрос во все шарды; sql должен возвращать строки с id первым столбцом
+        # в порядке ORDER BY id - результаты сливаются без общей сортировки
+        results = self.executor.map(_query_shard, self.paths, [sql] * self.shards, [params] * self.shards)
+        merged = heapq.merge(*results, key=lambda row: row[0])
+        return list(islice(merged, limit) if limit is not None else merged)
+
+    def get_posts_by_user(self, user_id):
+        path = self.paths[shard_of(user_id, self.shards)]
+        with metrics.timer('query_seconds', {'query': 'posts_by_user'}):
+            return _query_shard(path, 'SELECT id, title, body FROM posts WHERE userId = ? ORDER BY id',
+                                (user_id,))
+
+    def get_posts_by_users(self, user_ids):
+        # Пользователи группируются по шардам: по одному запросу на затронутый шард
+        result = {user_id: [] for user_id in user_ids}
+        by_shard = {}
+        for user_id in result:
+            by_shard.setdefault(shard_of(user_id, self.shards), []).append(user_id)
+        sql = '''SELECT userId, id, title, body FROM posts
+                 WHERE userId IN (SELECT value FROM json_each(?)) ORDER BY id'''
+        futures = [self.executor.submit(_query_shard, self.paths[shard], sql, (json.dumps(users),))
+                   for shard, users in by_shard.items()]
+        for future in futures:
+            for user_id, post_id, title, body in future.result():
+                result[user_id].append((post_id, title, body))
+        return result
+
+    def all_posts(self, limit=None):
+        # Каждый шард отдаёт не больше limit строк: после слияния нужны только первые limit
+        return self.query('SELECT id, userId, title, body FROM posts ORDER BY id LIMIT ?',
+                          (-1 if limit is None else limit,), limit)
+
+    def count(self):
+        return sum(rows[0][0] for rows in self.executor.map(
+            _query_shard, self.paths, ['SELECT count(*) FROM posts'] * self.shards, [()] * self.shards
+        ) if rows)
+
+    def close(self):
+        # В режиме процессов соединения закрываются вместе с процессами пула
+        if self.closed:
+            return
+        self.closed = True
+        self.executor.shutdown()
+        _release_connections(self.paths)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,142 @@
+import json
+import hashlib
+
+from common.bulk_load import DEFAULT_BATCH_SIZE, INSERT_POST_SQL, executemany_batched, post_rows
+
+# Инкрементальная синхронизация таблицы posts:
+# для каждой строки хранится хэш содержимого (таблица posts_sync),
+# в БД пишутся только новые, изменённые и удалённые строки.
+
+# Отдельные инструкции, а не executescript: тот фиксирует открытую транзакцию
+# вызывающего, и его незаконченная синхронизация оказалась бы записана
+SYNC_SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS posts_sync (
+        id INTEGER PRIMARY KEY,
+        hash INTEGER NOT NULL
+    )''',
+    # Любая запись в posts в обход синхронизации сбрасывает хэш строки,
+    # он будет пересчитан из самой таблицы при следующей синхронизации
+    '''CREATE TRIGGER IF NOT EXISTS posts_sync_ai AFTER INSERT ON posts BEGIN
+        DELETE FROM posts_sync WHERE id = NEW.id;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS posts_sync_au AFTER UPDATE ON posts BEGIN
+        DELETE FROM posts_sync WHERE id = OLD.id;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS posts_sync_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_sync WHERE id = OLD.id;
+    END''',
+)
+
+
+def row_hash(user_id, title, body):
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(str(user_id).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(title.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(body.encode('utf-8'))
+    return int.from_bytes(digest.digest(), 'big', signed=True)
+
+
+def ensure_sync_schema(conn):
+    for statement in SYNC_SCHEMA:
+        conn.execute(statement)
+
+
+def _stored_hashes(conn):
+    # Строки без хэша (новая БД или правки в обход синхронизации) досчитываем
+    missing = conn.execute('''
+        SELECT id, userId, title, body FROM posts
+        WHERE id NOT IN (SELECT id FROM posts_sync)
+    ''').fetchall()
+    if missing:
+        conn.executemany(
+            'INSERT OR REPLACE INTO posts_sync (id, hash) VALUES (?, ?)',
+            [(row[0], row_hash(row[1], row[2], row[3])) for row in missing]
+        )
+    return dict(conn.execute('SELECT id, hash FROM posts_sync'))
+
+
+def _batch_hashes(conn, post_ids):
+    # Хэши только для постов пачки: память и время не зависят от размера таблицы
+    ids = json.dumps(post_ids)
+    missing = conn.execute('''
+        SELECT id, userId, title, body FROM posts
+        WHERE id IN (SELECT value FROM json_each(?))
+          AND id NOT IN (SELECT id FROM posts_sync)
+    ''', (ids,)).fetchall()
+    if missing:
+        conn.executemany(
+            'INSERT OR REPLACE INTO posts_sync (id, hash) VALUES (?, ?)',
+            [(row[0], row_hash(row[1], row[2], row[3])) for row in missing]
+        )
+    return dict(conn.execute(
+        'SELECT id, hash FROM posts_sync WHERE id IN (SELECT value FROM json_each(?))', (ids,)
+    ))
+
+
+def sync_post_batch(conn, posts, batch_size=DEFAULT_BATCH_SIZE):
+    # Синхронизация одной пачки из потока постов (без удаления отсутствующих):
+    # отдельная короткая транзакция на пачку
+    rows = list(post_rows(posts))
+    ensure_sync_schema(conn)
+    with conn:
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        stored = _batch_hashes(conn, [row[0] for row in rows])
+        return _write_changes(conn, rows, stored, False, batch_size)
+
+
+def sync_posts(conn, posts, delete_missing=True, batch_size=DEFAULT_BATCH_SIZE):
+    ensure_sync_schema(conn)
+    with conn:  # одна транзакция на весь цикл синхронизации
+        if not conn.in_transaction:
+            # Блокировка на запись сразу: между чтением хэшей и записью никто не вклинится
+            conn.execute('BEGIN IMMEDIATE')
+        stored = _stored_hashes(conn)
+        return _write_changes(conn, post_rows(posts), stored, delete_missing, batch_size)
+
+
+def _write_changes(conn, rows, stored, delete_missing, batch_size):
+    # rows - кортежи (id, userId, title, body): они же параметры INSERT и UPDATE
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    # id -> строка / хэш: id, повторённый в пачке, записывается и считается один раз
+    # (действует последняя строка, как и при записи подряд)
+    inserts = {}
+    updates = {}
+    new_hashes = {}
+    seen = set()
+    for row in rows:
+        post_id, user_id, title, body = row
+        seen.add(post_id)
+        h = row_hash(user_id, title, body)
+        old = stored.get(post_id)
+        inserts.pop(post_id, None)
+        updates.pop(post_id, None)
+        if old == h:
+            new_hashes.pop(post_id, None)
+            continue
+        if old is None:
+            inserts[post_id] = row
+        else:
+            updates[post_id] = row
+        new_hashes[post_id] = h
+
+    deletes = [(post_id,) for post_id in stored.keys() - seen] if delete_missing else []
+
+    executemany_batched(conn, INSERT_POST_SQL, inserts.values(), batch_size)
+    executemany_batched(
+        conn, 'UPDATE posts SET userId = ?2, title = ?3, body = ?4 WHERE id = ?1', updates.values(),
+        batch_size
+    )
+    executemany_batched(conn, 'DELETE FROM posts WHERE id = ?', deletes, batch_size)
+    # Хэши пишем после самих строк: триггеры на posts их сбрасывают
+    executemany_batched(
+        conn, 'INSERT OR REPLACE INTO posts_sync (id, hash) VALUES (?, ?)', new_hashes.items(), batch_size
+    )
+
+    counts['inserted'] = len(inserts)
+    counts['updated'] = len(updates)
+    counts['deleted'] = len(deletes)
+    counts['unchanged'] = len(seen) - len(inserts) - len(updates)
+    return counts
@@ -0,0 +1,81 @@
+import json
+import sqlite3
+
+from common import metrics
+from common.posts_search import ensure_fts, search_posts, count_matches, RANK_CANDIDATES
+
+INDEXES = '''
+    -- Поиск постов пользователя без полного сканирования таблицы
+    CREATE INDEX IF NOT EXISTS idx_posts_userId ON posts (userId);
+    -- Покрывающий индекс для списков (id, title): читается без строк таблицы с body
+    CREATE INDEX IF NOT EXISTS idx_posts_id_title ON posts (id, title);
+'''
+
+
+class PostsRepository:
+    # Долгоживущее соединение: подготовленные запросы берутся из кэша
+    # sqlite3 (cached_statements) и не компилируются заново на каждый вызов
+
+    def __init__(self, db_path='posts.db', cached_statements=256, create_indexes=True):
+        self.conn = sqlite3.connect(db_path, cached_statements=cached_statements)
+        self.fts_ready = False
+        if create_indexes:
+            self.ensure_indexes()
+
+    def ensure_indexes(self):
+        self.conn.executescript(INDEXES)
+        self.conn.execute('PRAGMA optimize')
+
+    def get_posts_by_user(self, user_id):
+        with metrics.timer('query_seconds', {'query': 'posts_by_user'}):
+            return self.conn.execute(
+                'SELECT id, title, body FROM posts WHERE userId = ? ORDER BY id', (user_id,)
+            ).fetchall()
+
+    def get_posts_by_users(self, user_ids):
+        # Один запрос на любое число пользователей: список передаётся одним
+        # JSON-параметром, так что текст запроса не меняется и берётся из кэша
+        result = {user_id: [] for user_id in user_ids}
+        if not result:
+            return result
+        rows = self.conn.execute('''
+            SELECT userId, id, title, body FROM posts
+            WHERE userId IN (SELECT value FROM json_each(?))
+            ORDER BY userId, id
+        ''', (json.dumps(list(result)),))
+        for user_id, post_id, title, body in rows:
+            result[user_id].append((post_id, title, body))
+        return result
+
+    def get_post(self, post_id):
+        return self.conn.execute(
+            'SELECT id, userId, title, body FROM posts WHERE id = ?', (post_id,)
+        ).fetchone()
+
+    def get_titles(self, limit=100, after_id=0):
+        return self.conn.execute(
+            'SELECT id, title FROM posts WHERE id > ? ORDER BY id LIMIT ?', (after_id, limit)
+        ).fetchall()
+
+    def _ensure_fts(self):
+        if not self.fts_ready:
+            ensure_fts(self.conn)
+            self.fts_ready = True
+
+    def search(self, text, limit=100, offset=0):
+        self._ensure_fts()
+        return search_posts(self.conn, text, limit, offset)
+
+    def count_search(self, text, limit=RANK_CANDIDATES):
+        # Как и search, ограничено RANK_CANDIDATES самыми новыми совпадениями
+        self._ensure_fts()
+        return count_matches(self.conn, text, limit)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,117 @@
+import re
+
+# Полнотекстовый поиск по posts (title + body) через FTS5.
+# posts_fts - external content таблица: текст хранится только в posts,
+# индекс поддерживается триггерами.
+# Результаты - не глобальный top по bm25: ранжируются только RANK_CANDIDATES
+# самых новых совпадений (см. ниже), count_matches считает столько же.
+
+FTS_SCHEMA = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, body, content='posts', content_rowid='id'
+    );
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts (rowid, title, body) VALUES (NEW.id, NEW.title, NEW.body);
+    END;
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', OLD.id, OLD.title, OLD.body);
+    END;
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE ON posts BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, title, body) VALUES ('delete', OLD.id, OLD.title, OLD.body);
+        INSERT INTO posts_fts (rowid, title, body) VALUES (NEW.id, NEW.title, NEW.body);
+    END;
+'''
+
+# Совпадение в заголовке весит больше, чем в тексте
+RANK = 'bm25(10.0, 1.0)'
+# Ранжируются не больше стольких самых новых совпадений (наибольшие id): для частых
+# слов время поиска не растёт вместе с таблицей, для редких ранжирование точное.
+# Полное ORDER BY bm25 на 10^6 постов и частом слове - ~1.7 с против ~0.12 с.
+# Совпадения старше RANK_CANDIDATES самых новых в выдачу не попадают вовсе
+RANK_CANDIDATES = 5000
+
+# Кандидаты на ранжирование: самые новые совпадения
+CANDIDATES_SQL = '''
+    SELECT rowid, rank FROM posts_fts WHERE posts_fts MATCH ?
+    ORDER BY rowid DESC LIMIT ?
+'''
+
+
+def ensure_fts(conn):
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+    ).fetchone()
+    conn.executescript(FTS_SCHEMA)
+    if not exists:
+        # Индекс только что создан: заполняем его из уже имеющихся строк
+        with conn:
+            conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO posts_fts (posts_fts, rank) VALUES ('rank', ?)", (RANK,))
+
+
+def build_match_query(text):
+    # Пользовательский ввод -> безопасное выражение MATCH:
+    # все слова обязательны, последнее - по префиксу (поиск во время набора)
+    tokens = re.findall(r'\w+', text)
+    if not tokens:
+        return None
+    parts = [f'"{token}"' for token in tokens[:-1]]
+    parts.append(f'"{tokens[-1]}"*')
+    return ' '.join(parts)
+
+
+def search_post_ids(conn, text, limit=100, offset=0):
+    match = build_match_query(text)
+    if match is None:
+        return []
+    rows = conn.execute(
+        f'SELECT rowid FROM ({CANDIDATES_SQL}) ORDER BY rank LIMIT ? OFFSET ?',
+        (match, RANK_CANDIDATES, limit, offset)
+    )
+    return [row[0] for row in rows]
+
+
+def search_posts(conn, text, limit=100, offset=0):
+    match = build_match_query(text)
+    if match is None:
+        return []
+    return conn.execute(f'''
+        SELECT p.id, p.userId, p.title, p.body
+        FROM ({CANDIDATES_SQL}) AS f
+        JOIN posts AS p ON p.id = f.rowid
+        ORDER BY f.rank
+        LIMIT ? OFFSET ?
+    ''', (match, RANK_CANDIDATES, limit, offset)).fetchall()
+
+
+def iter_search_posts(conn, text, limit=100, chunk_size=100):
+    # Те же результаты, что search_posts, но порциями: первая порция
+    # доступна сразу после ранжирования, не дожидаясь чтения остальных строк
+    match = build_match_query(text)
+    if match is None:
+        return
+    cursor = conn.execute(f'''
+        SELECT p.id, p.userId, p.title, p.body
+        FROM ({CANDIDATES_SQL}) AS f
+        JOIN posts AS p ON p.id = f.rowid
+        ORDER BY f.rank
+        LIMIT ?
+    ''', (match, RANK_CANDIDATES, limit))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield rows
+
+
+def count_matches(conn, text, limit=RANK_CANDIDATES):
+    # Сколько результатов можно пролистать через search_posts: не больше limit
+    # (по умолчанию - порог ранжирования). limit=None - все совпадения в таблице
+    match = build_match_query(text)
+    if match is None:
+        return 0
+    if limit is None:
+        return conn.execute('SELECT count(*) FROM posts_fts WHERE posts_fts MATCH ?', (match,)).fetchone()[0]
+    return conn.execute(
+        'SELECT count(*) FROM (SELECT 1 FROM posts_fts WHERE posts_fts MATCH ? LIMIT ?)', (match, limit)
+    ).fetchone()[0]
@@ -0,0 +1,43 @@
+import os
+import json
+
+# Проверка схемы БД при запуске программы кэшируется в файле рядом с БД (<db>.schema.json).
+# SQLite увеличивает PRAGMA schema_version при любом изменении схемы (CREATE, ALTER, DROP),
+# поэтому, пока это тот же файл (inode) и номер не изменился, повторная проверка
+# столбцов и CREATE ... IF NOT EXISTS ничего не дадут и пропускаются.
+
+
+def cache_path(db_path):
+    return db_path + '.schema.json'
+
+
+def schema_key(conn, db_path):
+    return [os.stat(db_path).st_ino, conn.execute('PRAGMA schema_version').fetchone()[0]]
+
+
+def _read_cache(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def ensure_schema(conn, db_path, name, prepare):
+    # prepare(conn) проверяет и дополняет схему; исключение - схема не годится.
+    # Вызывается, только если схема изменилась после прошлой успешной проверки name.
+    # True - проверка выполнялась, False - взята из кэша
+    path = cache_path(db_path)
+    cache = _read_cache(path)
+    if cache.get(name) == schema_key(conn, db_path):
+        return False
+    prepare(conn)
+    cache[name] = schema_key(conn, db_path)  # после prepare: свои CREATE тоже меняют номер
+    part_path = path + '.part'
+    try:
+        with open(part_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(part_path, path)
+    except OSError:
+        pass  # каталог только для чтения: проверка просто повторится при следующем запуске
+    return True
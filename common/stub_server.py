@@ -0,0 +1,213 @@
+import json
+import time
+import random
+import hashlib
+from email.utils import formatdate
+import re
+import threading
+import argparse
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Локальная замена jsonplaceholder.typicode.com для проверок и бенчмарков.
+# Как у JSONPlaceholder (json-server): /posts?_page=2&_limit=50 или ?_start=100&_end=200
+# отдают срез, общее число записей - в заголовке X-Total-Count.
+# Программы проекта ходят сюда, если задать POSTS_API_URL (см. common.api_client):
+#   python common/stub_server.py --posts 1000000 --latency 0.05 --body-size 1000
+#   POSTS_API_URL=http://127.0.0.1:8000 python LabWork1/Code.py
+
+# Сколько закодированных ответов GET держать готовыми: при миллионе постов
+# json.dumps всего списка дороже самой передачи
+ENCODED_CACHE_SIZE = 64
+
+
+def make_posts(count, body_size=None):
+    # body_size - длина тела поста в символах (по умолчанию ~45, как у короткого поста)
+    posts = []
+    for i in range(count):
+        body = f"post body {i + 1}\nlorem ipsum dolor sit amet"
+        if body_size is not None:
+            body = (body + ' ' + 'lorem ipsum ' * (body_size // 12 + 1))[:body_size]
+        posts.append({'userId': i // 10 + 1, 'id': i + 1, 'title': f"post title {i + 1}", 'body': body})
+    return posts
+
+
+def page_bounds(params, total):
+    # (начало, конец) среза по параметрам json-server; None - без пагинации
+    if '_page' in params:
+        limit = int(params.get('_limit', ['10'])[0])
+        start = (int(params['_page'][0]) - 1) * limit
+        return start, start + limit
+    if '_start' in params or '_end' in params or '_limit' in params:
+        start = int(params.get('_start', ['0'])[0])
+        if '_end' in params:
+            return start, int(params['_end'][0])
+        if '_limit' in params:
+            return start, start + int(params['_limit'][0])
+        return start, total
+    return None
+
+
+def make_users(count):
+    return [
+        {'id': i + 1, 'name': f"User {i + 1}", 'username': f"user{i + 1}",
+         'email': f"user{i + 1}@example.com"}
+        for i in range(count)
+    ]
+
+
+def make_comments(posts, per_post=5):
+    return [
+        {'postId': post['id'], 'id': post['id'] * per_post + j - per_post + 1,
+         'name': f"comment {j + 1}", 'email': f"c{j}@example.com", 'body': "comment body"}
+        for post in posts for j in range(per_post)
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, чтобы пул соединений имел смысл
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, data, headers=()):
+        if status == 200 and self.command == 'GET':
+            payload, etag = self.encode(data)
+        else:
+            payload = json.dumps(data).encode('utf-8')
+            etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        if status == 200:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', formatdate(self.server.started_at, usegmt=True))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def encode(self, data):
+        # Ответы GET зависят только от пути запроса: готовые байты и ETag берутся из кэша.
+        # data уже построены вызывающим - кэш экономит только кодирование
+        cache = self.server.encoded
+        entry = cache.get(self.path)
+        if entry is None:
+            payload = json.dumps(data).encode('utf-8')
+            entry = (payload, '"' + hashlib.md5(payload).hexdigest() + '"')
+            with self.server.encoded_lock:
+                if len(cache) >= ENCODED_CACHE_SIZE:
+                    cache.pop(next(iter(cache)))
+                cache[self.path] = entry
+        return entry
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def delay(self):
+        delay = self.server.latency
+        if self.server.jitter:
+            delay += random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def do_GET(self):
+        self.delay()
+        path, _, query = self.path.partition('?')
+        path = path.rstrip('/')
+        params = parse_qs(query)
+        if path == '/posts':
+            posts = self.server.posts
+            if 'userId' in params:
+                # Как в JSONPlaceholder: /posts?userId=N - посты одного пользователя
+                user_ids = {int(value) for value in params['userId']}
+                posts = [p for p in posts if p['userId'] in user_ids]
+            try:
+                bounds = page_bounds(params, len(posts))
+            except ValueError:
+                return self.send_json(400, {})
+            if bounds is None:
+                return self.send_json(200, posts)
+            return self.send_json(200, posts[max(bounds[0], 0):max(bounds[1], 0)],
+                                  [('X-Total-Count', str(len(posts)))])
+        match = re.fullmatch(r'/posts/(\d+)', path)
+        if match:
+            post_id = int(match.group(1))
+            if 1 <= post_id <= len(self.server.posts):
+                return self.send_json(200, self.server.posts[post_id - 1])
+            return self.send_json(404, {})
+        if path == '/users':
+            return self.send_json(200, self.server.users)
+        if path == '/comments':
+            with self.server.encoded_lock:
+                if self.server.comments is None:
+                    # 5 комментариев на пост: при миллионах постов строятся только по запросу
+                    self.server.comments = make_comments(self.server.posts)
+            return self.send_json(200, self.server.comments)
+        self.send_json(404, {})
+
+    def do_POST(self):
+        self.delay()
+        if self.path.rstrip('/') != '/posts':
+            return self.send_json(404, {})
+        data = self.read_json()
+        data['id'] = len(self.server.posts) + 1
+        self.send_json(201, data)
+
+    def do_PUT(self):
+        self.delay()
+        match = re.fullmatch(r'/posts/(\d+)', self.path.rstrip('/'))
+        if not match:
+            return self.send_json(404, {})
+        data = self.read_json()
+        data['id'] = int(match.group(1))
+        self.send_json(200, data)
+
+
+def start_stub_server(host='127.0.0.1', port=0, posts=100, latency=0.0, jitter=0.0, body_size=None):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.started_at = time.time()
+    server.encoded = {}
+    server.encoded_lock = threading.Lock()
+    server.posts = make_posts(posts, body_size)
+    server.users = make_users(max(1, posts // 10))
+    server.comments = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}"
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный аналог JSONPlaceholder")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument('--jitter', type=float, default=0.0, help="случайная добавка к задержке, до N с")
+    parser.add_argument('--body-size', type=int, help="длина тела поста, символов")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.posts, args.latency,
+                                         args.jitter, args.body_size)
+    print(f"[Stub] Сервер запущен: {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()